@@ -1,5 +1,23 @@
-import maya.cmds as cmd
+import concurrent.futures
+import contextlib
+import hashlib
+import heapq
+import json
+import os
+import pickle
+import re
+import subprocess
+import time
 import traceback
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Mapping
+from types import MappingProxyType
+from typing import NamedTuple
+
+try:
+    import numpy
+except ImportError: # value transforms fall back to plain Python, see FieldTransform.applyBatch
+    numpy = None
 
 # This conversion script has been written by Ronald Sendula
 # For bug and other reports or questions open an issue on github:
@@ -47,13 +65,1473 @@ class NodeField:
         #self.fieldValue = fieldValue
         #self.fieldType = fieldType
 
+class FieldTransform:
+    '''
+    Value transform of a NodeField (or TargetField), declared in the conversion tables as [name, *arguments], e.g.: ["addBelow", 0.1, 1].
+    The name is one of the static methods below, each of which has a <name>Array counterpart that does the same to a NumPy array
+    (see applyBatch). Compound values (as cmd.getAttr returns them: [(x, y, z)]) are transformed per component.
+    Transforms can be chained (see then), they are applied one after the other.
+    Unlike lambdas, these can be pickled, see loadConversionTable.
+    '''
+    def __init__(self, name: str, *args):
+        if name not in FieldTransform.NAMES:
+            raise ValueError(f"Unknown transform: {name}. Known transforms: {', '.join(FieldTransform.NAMES)}")
+        self.steps: tuple[tuple[str, tuple], ...] = ((name, args),)
+        # ^ (name, arguments) of every transform of the chain, in order
+
+    def __call__(self, value):
+        if isinstance(value, list):
+            return tuple(self.applySteps(x) for x in value[0])
+        return self.applySteps(value)
+
+    def applySteps(self, value):
+        for name, args in self.steps:
+            value = getattr(FieldTransform, name)(value, *args)
+        return value
+
+    def then(self, other: "FieldTransform") -> "FieldTransform":
+        '''
+        Returns the transform that applies this one, then the other one.
+        '''
+
+        chained = FieldTransform.__new__(FieldTransform)
+        chained.steps = self.steps + other.steps
+        return chained
+
+    def applyBatch(self, values: list) -> list:
+        '''
+        Transforms many values at once, returning the same values calling the transform one by one would.
+        With NumPy installed, values of the same kind (numbers, strings or same sized numeric compounds) are transformed
+        as a single array operation; without it, or for mixed values, they are transformed one by one.
+        '''
+
+        if numpy == None or len(values) < BATCHTRANSFORMMINIMUM:
+            return [self(value) for value in values]
+
+        compound = isinstance(values[0], list)
+        try:
+            components = [value[0] for value in values] if compound else values # compounds come back as [(x, y, z)]
+            kinds = {type(x) for component in components for x in component} if compound else {type(x) for x in components}
+            array = numpy.array(components)
+            if len(kinds) != 1 or array.dtype.kind not in ("biuf" if compound else "biufU"):
+                return [self(value) for value in values]
+            result = array
+            for name, args in self.steps:
+                result = getattr(FieldTransform, f"{name}Array")(result, *args)
+        except (TypeError, ValueError, IndexError): # e.g.: some compounds are missing, or a transform that doesn't apply to strings
+            return [self(value) for value in values]
+
+        if numpy.shape(result) != array.shape or (array.dtype.kind in "biu" and result.dtype.kind == "f"): # Python would keep the unchanged integers integers
+            return [self(value) for value in values]
+        if compound:
+            return [tuple(component) for component in result.tolist()]
+        return result.tolist()
+
+    def __repr__(self) -> str:
+        return " -> ".join(f"FieldTransform{(name, *args)!r}" for name, args in self.steps)
+
+    @staticmethod
+    def oneMinus(value):
+        return 1 - value
+
+    @staticmethod
+    def addBelow(value, amount, limit):
+        # adds amount to values below limit
+        return value + amount if limit > value else value
+
+    @staticmethod
+    def equals(value, other) -> bool:
+        return value == other
+
+    @staticmethod
+    def remap(value, pairs: list):
+        # [[from, to], ...], values not in it are kept as they are
+        for fromValue, toValue in pairs:
+            if value == fromValue:
+                return toValue
+        return value
+
+    @staticmethod
+    def oneMinusArray(array):
+        return 1 - array
+
+    @staticmethod
+    def addBelowArray(array, amount, limit):
+        return numpy.where(limit > array, array + amount, array)
+
+    @staticmethod
+    def equalsArray(array, other):
+        return array == other
+
+    @staticmethod
+    def remapArray(array, pairs: list):
+        if numpy.array([toValue for _, toValue in pairs]).dtype.kind != array.dtype.kind:
+            raise TypeError("Remapped values of another kind") # select would convert them (or the kept values) to a common type, Python keeps both as they are
+        return numpy.select([array == fromValue for fromValue, _ in pairs], [toValue for _, toValue in pairs], default= array)
+
+    NAMES = ("oneMinus", "addBelow", "equals", "remap")
+
+class TargetField(NamedTuple):
+    '''
+    Entry of a COMMON_TO_<ENGINE> table whose value has to be transformed on the way to the engine's attribute.
+    Entries without a transform are plain attribute names, see getTargetField.
+    '''
+    attr: str               # field name on the engine's node
+    func: Callable          # value transform, applied after the one of the NodeField (if any)
+
+class RouteField(NamedTuple):
+    '''
+    One field of a ConversionRoute: a fromEngine attribute, the toEngine attribute it ends up in, and the composed transform on the way.
+    '''
+    sourceAttr: str         # field name on the fromEngine node
+    commonName: str         # field name in the made up common specification
+    targetAttr: str         # field name on the toEngine node
+    func: Callable | None   # the fromEngine -> common and common -> toEngine transforms composed (see composeTransforms), None if the value is copied as is
+
+class ConversionRoute(NamedTuple):
+    '''
+    Direct fromEngine -> toEngine attribute map of a node type, with the common names resolved away.
+    Built once per engine pair by compileConversionRoutes, independent of the scene.
+    '''
+    sourceType: str                    # node type in fromEngine
+    commonType: str                    # node type in the made up common specification
+    targetType: str                    # node type in toEngine
+    fields: tuple[RouteField, ...]     # in the order of the fromEngine table
+
+class PlanField(NamedTuple):
+    '''
+    One field of a ConversionPlan: where the value comes from, how it's transformed and where it goes.
+    '''
+    sourceAttr: str        # field name on the fromEngine node
+    sourceType: str | None # type of the fromEngine field, as reported by cmd.getAttr(typ= True)
+    func: Callable | None  # value transform, None if the value is copied as is
+    commonName: str        # field name in the made up common specification
+    targetAttr: str        # field name on the toEngine node
+    targetType: str        # type of the toEngine field, as reported by cmd.getAttr(typ= True)
+    setter: Callable       # function that writes the value to the toEngine node, see selectSetter
+
+class SourceRead(NamedTuple):
+    '''
+    How a fromEngine attribute's value is obtained by readSourceAttributes.
+    '''
+    attr: str
+    parent: str | None # if set, the value is taken from this (already read) compound parent instead of querying Maya
+    index: int         # position of attr among the parent's children
+
+class ConversionPlan(NamedTuple):
+    '''
+    Flat, immutable description of how a node type converts from one engine to another.
+    Built once per (fromEngine, toEngine, node type) by compileConversionPlan.
+    '''
+    sourceType: str                            # node type in fromEngine
+    commonType: str                            # node type in the made up common specification
+    targetType: str                            # node type in toEngine
+    fields: tuple[PlanField, ...]              # fields to copy over, in order
+    reads: tuple[SourceRead, ...]              # every fromEngine attribute the fields need, each read once. Compound parents come before their children.
+    sockets: Mapping[str, tuple[str, ...]]     # fromEngine field name -> toEngine field names, used for rebuilding connections
+
+class Edge(NamedTuple):
+    '''
+    A connection between two nodes of a NodeGraph, with its plugs already split into node and attribute names.
+    '''
+    srcNode: str  # name of the node on the left (output) side of the connection
+    srcAttr: str
+    dstNode: str  # name of the node on the right (input) side of the connection
+    dstAttr: str
+
+class NodeGraph:
+    '''
+    Registry of crawled nodes, indexed by node name, and of the connections between them.
+    '''
+    def __init__(self):
+        self.nodes: dict[str, Node] = {}
+        # ^ Key: node name
+        # ^ Value: the one Node object that represents it in the graph
+        self.edges: list[Edge] = []
+        self.edgeSet: set[Edge] = set() # for skipping edges that are found from both of their ends
+
+    def __iter__(self):
+        return iter(self.nodes.values())
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, nodeName: str) -> bool:
+        return nodeName in self.nodes
+
+    def get(self, nodeName: str) -> Node | None:
+        return self.nodes.get(nodeName)
+
+    def addNode(self, node: Node) -> Node:
+        '''
+        Registers the given node and returns it, or returns the already registered node of the same name.
+        '''
+        return self.nodes.setdefault(node.name, node)
+
+    def addEdge(self, srcPlug: str, dstPlug: str) -> Edge:
+        '''
+        Registers the connection between the given plugs (unless it's already registered) and returns it.
+        '''
+        edge = Edge(*splitPlug(srcPlug), *splitPlug(dstPlug))
+        if edge not in self.edgeSet:
+            self.edgeSet.add(edge)
+            self.edges.append(edge)
+        return edge
+
+class AttributeSchema(NamedTuple):
+    '''
+    Description of a single attribute of a node type.
+    '''
+    name: str
+    shortName: str
+    type: str                 # as reported by cmd.getAttr(typ= True)
+    default: object           # None if Maya reports no default for it (e.g.: string attributes)
+    children: tuple[str, ...] # children of compound attributes (e.g.: diffuseColor -> diffuseColorR, diffuseColorG, diffuseColorB)
+    parent: str | None        # parent of compound children
+
+class NodeSchema:
+    '''
+    Attribute names, types, defaults and compound children of a node type, see getNodeSchema.
+    '''
+    def __init__(self, nodeType: str, attributes: dict[str, AttributeSchema] | None = None):
+        self.nodeType: str = nodeType
+        self.attributes: dict[str, AttributeSchema] = attributes if attributes != None else {}
+        # ^ Key: attribute name
+        # ^ Value: AttributeSchema
+        self.shortNames: dict[str, str] = {a.shortName: a.name for a in self.attributes.values()}
+        # ^ Key: attribute short name
+        # ^ Value: attribute name
+
+    def get(self, attr: str) -> AttributeSchema | None:
+        return self.attributes.get(attr)
+
+    def typeOf(self, attr: str) -> str | None:
+        attribute = self.attributes.get(attr)
+        return attribute.type if attribute != None else None
+
+    def toDict(self) -> dict:
+        return {name: {"shortName": a.shortName, "type": a.type, "default": a.default, "children": list(a.children), "parent": a.parent} for name, a in self.attributes.items()}
+
+    @classmethod
+    def fromDict(cls, nodeType: str, data: dict) -> "NodeSchema":
+        attributes: dict[str, AttributeSchema] = {}
+        for name, a in data.items():
+            default = tuple(a["default"]) if isinstance(a["default"], list) else a["default"] # JSON turns tuples into lists
+            attributes[name] = AttributeSchema(name= name, shortName= a["shortName"], type= a["type"], default= default, children= tuple(a["children"]), parent= a["parent"])
+        return cls(nodeType, attributes)
+
+
+class ConversionReport:
+    '''
+    Counters of what a convertNodeTree run did, printed at the end of the run.
+    '''
+    def __init__(self):
+        self.convertedNodes: int = 0
+        self.writes: int = 0            # attributes set on the converted nodes
+        self.skippedDefaults: int = 0   # attributes not set because their value equals the converted node's default
+        self.skippedConnected: int = 0  # attributes not set because a rebuilt connection is going to drive them
+        self.connections: int = 0
+        self.reusedNodes: int = 0         # previously converted nodes that got updated instead of recreated, see ConversionMap
+        self.removedNodes: int = 0        # previously converted nodes whose original node no longer exists
+        self.removedConnections: int = 0  # previously made connections that no longer exist in the original network
+        self.missingTextures: dict[str, str] = {}
+        # ^ Key: name of a converted node
+        # ^ Value: its texture path, which has no file (or no tiles), see checkTextures
+        self.skippedTextures: dict[str, str] = {}
+        # ^ Key: name of a converted node
+        # ^ Value: its texture path, left as it is by TexturePreparation as it has tokens other than tile tokens (e.g. <f>)
+
+    def __str__(self) -> str:
+        return (f"Converted nodes: {self.convertedNodes}\n"
+                f"Updated nodes: {self.reusedNodes}\n"
+                f"Removed nodes: {self.removedNodes}\n"
+                f"Attributes written: {self.writes}\n"
+                f"Writes skipped: {self.skippedDefaults + self.skippedConnected} (default values: {self.skippedDefaults}, connected: {self.skippedConnected})\n"
+                f"Connections made: {self.connections}\n"
+                f"Connections removed: {self.removedConnections}\n"
+                f"Missing textures: {len(self.missingTextures)}\n"
+                + (f"Textures not prepared: {len(self.skippedTextures)}\n" if len(self.skippedTextures) != 0 else ""))
+
+
+class ConversionTransaction:
+    '''
+    Context manager that wraps a conversion into a single undo chunk (or, with recordUndo= False, suspends undo recording for it),
+    and puts the scene back the way it was if the conversion fails partway: nodes created through createConvertedNode get deleted,
+    and the changes made to nodes that existed before (see recordValue, recordConnection, deleteNodes) get reverted.
+    '''
+    active: "ConversionTransaction | None" = None # the innermost transaction that is currently open
+
+    def __init__(self, name: str = "nodeNetworkConversion", recordUndo: bool = True):
+        self.name: str = name
+        self.recordUndo: bool = recordUndo
+        self.createdNodes: list[str] = []
+        self.createdNodeSet: set[str] = set()
+        self.previousValues: dict[str, tuple[str | None, object]] = {}
+        # ^ Key: plug of a node that existed before the transaction, whose value has been changed
+        # ^ Value: (its attribute type, its value before the first change)
+        self.connectionChanges: list[tuple[bool, str, str]] = []
+        # ^ (connected, source plug, destination plug) of every connection made (True) or broken (False) between nodes that existed before, in order
+        self.pendingDeletes: list[str] = []   # nodes that existed before, deleted once the transaction succeeds
+        self.undoState: bool = True
+        self.outer: ConversionTransaction | None = None
+
+    def __enter__(self) -> "ConversionTransaction":
+        self.openUndo()
+        self.outer = ConversionTransaction.active
+        ConversionTransaction.active = self
+        return self
+
+    def __exit__(self, excType, excValue, tb) -> bool:
+        ConversionTransaction.active = self.outer
+        try:
+            self.end(excType, excValue)
+        finally:
+            self.closeUndo()
+
+        return False # exceptions are not swallowed
+
+    def openUndo(self):
+        if self.recordUndo:
+            cmd.undoInfo(openChunk= True, chunkName= self.name)
+        else:
+            self.undoState = cmd.undoInfo(query= True, state= True)
+            cmd.undoInfo(stateWithoutFlush= False)
+
+    def closeUndo(self):
+        if self.recordUndo:
+            cmd.undoInfo(closeChunk= True)
+        else:
+            cmd.undoInfo(stateWithoutFlush= self.undoState)
+
+    def end(self, excType = None, excValue = None):
+        '''
+        Commits the transaction, or rolls it back if an exception of the given type ended it.
+        '''
+
+        if excType == None:
+            self.commit()
+            return
+
+        revertedCount = len(self.previousValues) + len(self.connectionChanges) + len(self.pendingDeletes)
+        self.rollback()
+        outcome = "cancelled" if issubclass(excType, ConversionCancelled) else "failed"
+        print(f'! Node converter: Conversion {outcome}, {len(self.createdNodes)} created node(s) have been removed and {revertedCount} change(s) of existing nodes reverted.')
+        if outcome == "failed":
+            print(f'! - {excValue}')
+
+    def track(self, nodeName: str):
+        self.createdNodes.append(nodeName)
+        self.createdNodeSet.add(nodeName)
+
+    def recordValue(self, plug: str, attrType: str | None):
+        '''
+        Keeps the value of the given plug before it's changed, unless it's on a node created by the transaction.
+        '''
+        if plug.partition(".")[0] not in self.createdNodeSet and plug not in self.previousValues:
+            self.previousValues[plug] = (attrType, cmd.getAttr(plug))
+
+    def recordConnection(self, connected: bool, srcPlug: str, dstPlug: str):
+        '''
+        Keeps that the given connection has been made (connected) or broken, unless it's to a node created by the transaction.
+        '''
+        if srcPlug.partition(".")[0] not in self.createdNodeSet and dstPlug.partition(".")[0] not in self.createdNodeSet:
+            self.connectionChanges.append((connected, srcPlug, dstPlug))
+
+    def deleteLater(self, nodeName: str):
+        self.pendingDeletes.append(nodeName)
+
+    def commit(self):
+        '''
+        Deletes the nodes whose deletion waited for the transaction to succeed. Nested transactions leave all of it to the outer one.
+        '''
+
+        if self.outer != None: # nested transactions roll back (and commit) with the outer one
+            for nodeName in self.createdNodes:
+                self.outer.track(nodeName)
+            for plug, previous in self.previousValues.items():
+                if plug.partition(".")[0] not in self.outer.createdNodeSet:
+                    self.outer.previousValues.setdefault(plug, previous)
+            self.outer.connectionChanges.extend(self.connectionChanges)
+            self.outer.pendingDeletes.extend(self.pendingDeletes)
+            return
+
+        leftovers = [nodeName for nodeName in self.pendingDeletes if cmd.objExists(nodeName)]
+        if len(leftovers) != 0:
+            cmd.delete(leftovers)
+
+    def rollback(self):
+        '''
+        Reverts the changes made to nodes that existed before the transaction, then deletes every node created in it that still exists.
+        Values are restored while the connections the transaction made are broken and the ones it broke aren't made again yet,
+        as Maya doesn't set connected attributes.
+        '''
+
+        wasConnected: dict[tuple[str, str], bool] = {}
+        # ^ Key: (source plug, destination plug) of a connection the transaction made or broke
+        # ^ Value: whether it existed before the transaction, i.e. the opposite of its first change
+        for connected, srcPlug, dstPlug in self.connectionChanges:
+            wasConnected.setdefault((srcPlug, dstPlug), not connected)
+
+        for (srcPlug, dstPlug), connected in reversed(wasConnected.items()):
+            if not connected:
+                try:
+                    cmd.disconnectAttr(srcPlug, dstPlug)
+                except Exception: # one of the nodes is gone (or the connection is broken) since
+                    pass
+
+        for plug, (attrType, value) in reversed(self.previousValues.items()): # oldest last, a compound kept after one of its children changed already holds that change
+            setPlugValue(plug, value, attrType)
+
+        for (srcPlug, dstPlug), connected in wasConnected.items():
+            if connected:
+                try:
+                    cmd.connectAttr(srcPlug, dstPlug, force= True)
+                except Exception: # one of the nodes is gone since
+                    pass
+
+        leftovers = [nodeName for nodeName in self.createdNodes if cmd.objExists(nodeName)]
+        if len(leftovers) != 0:
+            cmd.delete(leftovers)
+
+
+class ConversionMap:
+    '''
+    Persisted record of a previous fromEngine -> toEngine conversion, used for incremental re-conversions.
+    It's stored as JSON on a network node in the scene, so it's saved with the scene.
+    For every converted original node it holds the name of its converted equivalent, the values written to it
+    with a fingerprint of them, and the connections that drive it.
+    '''
+    def __init__(self, fromEngine: str, toEngine: str, records: dict | None = None):
+        self.networkNode: str = f"nodeNetworkConverter{fromEngine}To{toEngine}"
+        self.records: dict[str, dict] = records if records != None else {}
+        # ^ Key: original node name
+        # ^ Value: {"converted": converted node name, "targetType": its type, "valueHash": fingerprint of "values",
+        #           "values": {toEngine attribute: value}, "connectionHash": fingerprint of "connections", "connections": [[left side plug, right side plug], ...]}
+
+    @classmethod
+    def load(cls, fromEngine: str, toEngine: str) -> "ConversionMap":
+        conversionMap = cls(fromEngine, toEngine)
+        if cmd.objExists(f"{conversionMap.networkNode}.{CONVERSIONMAPATTR}"):
+            try:
+                data = json.loads(cmd.getAttr(f"{conversionMap.networkNode}.{CONVERSIONMAPATTR}") or "{}")
+            except ValueError:
+                print(f'! Node converter: The record of the previous conversion on "{conversionMap.networkNode}" is unreadable, converting from scratch.')
+                data = {}
+            if data.get("formatVersion") == CONVERSIONMAPFORMATVERSION:
+                conversionMap.records = data["records"]
+        return conversionMap
+
+    def save(self):
+        if not cmd.objExists(self.networkNode):
+            cmd.createNode("network", name= self.networkNode, skipSelect= True)
+            if ConversionTransaction.active != None:
+                ConversionTransaction.active.track(self.networkNode)
+        if not cmd.objExists(f"{self.networkNode}.{CONVERSIONMAPATTR}"):
+            cmd.addAttr(self.networkNode, longName= CONVERSIONMAPATTR, dataType= "string")
+        recordValue(f"{self.networkNode}.{CONVERSIONMAPATTR}", "string")
+        cmd.setAttr(f"{self.networkNode}.{CONVERSIONMAPATTR}", json.dumps({"formatVersion": CONVERSIONMAPFORMATVERSION, "records": self.records}), typ= "string")
+
+    @staticmethod
+    def hashValues(plan: "ConversionPlan", nodeInfo: list, connectedFields: set[str]) -> str:
+        return hashlib.sha1(json.dumps([plan.targetType, [field.targetAttr for field in plan.fields], nodeInfo, sorted(connectedFields)], default= str).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def hashConnections(connections: list[tuple[str, str]]) -> str:
+        return hashlib.sha1(json.dumps(sorted(connections)).encode("utf-8")).hexdigest()
+
+    def getReusable(self, nodeName: str, targetType: str) -> dict | None:
+        '''
+        Returns the record of the given original node if its converted equivalent still exists and can be updated.
+        '''
+        record = self.records.get(nodeName)
+        if record == None or record["targetType"] != targetType or not cmd.objExists(record["converted"]) or cmd.nodeType(record["converted"]) != targetType:
+            return None
+        return record
+
+    def recordNode(self, nodeName: str, convertedName: str, plan: "ConversionPlan", nodeInfo: list, connectedFields: set[str]):
+        '''
+        Records the values of the given converted node. Fields driven by connections are left out of "values",
+        so they get written if the connection goes away.
+        - connectedFields = toEngine attributes of the plan's fields that are driven by connections
+        '''
+        previous = self.records.get(nodeName, {})
+        self.records[nodeName] = {
+            "converted": convertedName,
+            "targetType": plan.targetType,
+            "valueHash": self.hashValues(plan, nodeInfo, connectedFields),
+            "values": {field.targetAttr: nodeFieldData for field, nodeFieldData in zip(plan.fields, nodeInfo) if field.targetAttr not in connectedFields},
+            "connectionHash": previous.get("connectionHash", "") if previous.get("converted") == convertedName else "",
+            "connections": previous.get("connections", []) if previous.get("converted") == convertedName else [],
+        }
+
+    def hasSameConnections(self, nodeName: str, convertedName: str, connections: list[tuple[str, str]]) -> bool:
+        record = self.records.get(nodeName)
+        return record != None and record["converted"] == convertedName and record["connectionHash"] == self.hashConnections(connections)
+
+    def getConnections(self, nodeName: str, convertedName: str) -> set[tuple[str, str]]:
+        '''
+        Returns the connections that were made to the given converted node by the previous conversion.
+        '''
+        record = self.records.get(nodeName)
+        if record == None or record["converted"] != convertedName:
+            return set()
+        return {(srcPlug, dstPlug) for srcPlug, dstPlug in record["connections"]}
+
+    def recordConnections(self, nodeName: str, connections: list[tuple[str, str]]):
+        if nodeName in self.records:
+            self.records[nodeName]["connections"] = [list(connection) for connection in connections]
+            self.records[nodeName]["connectionHash"] = self.hashConnections(connections)
+
+    def removeOrphans(self, report: "ConversionReport"):
+        '''
+        Deletes the converted equivalents of original nodes that no longer exist (see deleteNodes), and forgets records whose converted node is gone.
+        '''
+        for nodeName, record in list(self.records.items()):
+            if cmd.objExists(nodeName) and cmd.objExists(record["converted"]):
+                continue
+            if cmd.objExists(record["converted"]):
+                deleteNodes([record["converted"]])
+                report.removedNodes += 1
+            del self.records[nodeName]
+
+
+
+class MayaCmdsBackend:
+    '''
+    The default command backend (see setBackend): every command goes to maya.cmds.
+    maya.cmds is only imported when the first command is made, so importing this module doesn't need Maya.
+    '''
+    def __getattr__(self, name: str):
+        import maya.cmds
+        command = getattr(maya.cmds, name)
+        setattr(self, name, command) # from now on it's found on the instance, without going through __getattr__ again
+        return command
+
+
+class ConversionEmitter:
+    '''
+    Stands in for cmd while a conversion runs in emitter mode (see emitConversion). Queries go to the wrapped commands,
+    while the nodes, values and connections the conversion creates are only recorded, to be written as a self-contained
+    Maya ASCII fragment (toMayaAscii) or Python script (toPython) that Maya can load in one go.
+    - commands = the backend the queries go to (see cmd)
+    '''
+    def __init__(self, commands):
+        self.commands = commands
+        self.createdNodes: dict[str, str] = {}
+        # ^ Key: name of a node created by the conversion
+        # ^ Value: its type
+        self.values: dict[str, list[tuple[str, tuple, str | None]]] = {}
+        # ^ Key: name of a node created by the conversion
+        # ^ Value: (attribute, values, type) of every setAttr call on it, in order
+        self.connections: list[tuple[str, str]] = []
+        # ^ (source plug, destination plug) of every connectAttr call
+        self.nameCounters: dict[str, int] = {}
+        self.temporaryNodes: set[str] = set() # nodes made in the wrapped scene by createNode, see createNode
+
+    def __getattr__(self, name: str):
+        return getattr(self.commands, name) # everything that isn't an edit goes to the wrapped commands
+
+    def createNode(self, nodeType: str, **kwargs) -> str:
+        '''
+        Only made by captureNodeSchema, for a temporary node to query the attributes of: it's created in the wrapped scene,
+        and deleted from it by delete, so it never ends up in the recorded edits (nor in the scene).
+        '''
+        nodeName = self.commands.createNode(nodeType, **kwargs)
+        self.temporaryNodes.add(nodeName)
+        return nodeName
+
+    def shadingNode(self, nodeType: str, asShader: bool = False, **kwargs) -> str:
+        counter = self.nameCounters.get(nodeType, 0)
+        while True:
+            counter += 1
+            nodeName = f"{nodeType}{counter}"
+            if nodeName not in self.createdNodes and not self.commands.objExists(nodeName):
+                break
+        self.nameCounters[nodeType] = counter
+
+        self.createdNodes[nodeName] = nodeType
+        self.values[nodeName] = []
+        return nodeName
+
+    def setAttr(self, plug: str, *values, typ: str | None = None):
+        nodeName, _, attr = plug.partition(".")
+        if nodeName not in self.createdNodes:
+            raise RuntimeError(f'! Node converter: Only nodes created by the conversion can be edited in emitter mode, not "{nodeName}".')
+        self.values[nodeName].append((attr, values, typ))
+
+    def connectAttr(self, srcPlug: str, dstPlug: str, **kwargs):
+        self.connections.append((srcPlug, dstPlug))
+
+    def objExists(self, nodeName: str) -> bool:
+        return nodeName in self.createdNodes or self.commands.objExists(nodeName)
+
+    def delete(self, nodeNames):
+        for nodeName in [nodeNames] if isinstance(nodeNames, str) else nodeNames:
+            if nodeName in self.createdNodes:
+                del self.createdNodes[nodeName]
+                del self.values[nodeName]
+            elif nodeName in self.temporaryNodes:
+                self.temporaryNodes.remove(nodeName)
+                self.commands.delete(nodeName)
+        self.connections = [(srcPlug, dstPlug) for srcPlug, dstPlug in self.connections if self.objExists(srcPlug.partition(".")[0]) and self.objExists(dstPlug.partition(".")[0])]
+
+    @staticmethod
+    def formatMayaAsciiValue(value) -> str:
+        if isinstance(value, bool):
+            return "yes" if value else "no"
+        if isinstance(value, str):
+            return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        return repr(value) if isinstance(value, float) else str(value)
+
+    @classmethod
+    def formatSetAttr(cls, plug: str, values: tuple, typ: str | None) -> str:
+        '''
+        Returns the MEL setAttr statement of a recorded setAttr call.
+        '''
+        typeFlag = f' -type "{typ}"' if typ != None else ""
+        return f'setAttr "{plug}"{typeFlag} {" ".join(cls.formatMayaAsciiValue(value) for value in values)};'
+
+    def getMayaAsciiStatements(self) -> list[str]:
+        '''
+        Returns the MEL statements that create the recorded nodes, values and connections.
+        '''
+        statements: list[str] = []
+        for nodeName, nodeType in self.createdNodes.items():
+            statements.append(f'createNode {nodeType} -n "{nodeName}";')
+            for attr, values, typ in self.values[nodeName]:
+                statements.append("\t" + self.formatSetAttr(f".{attr}", values, typ))
+        for nodeName in self.createdNodes: # shadingNode(asShader= True) lists every created node in the hypershade
+            statements.append(f'connectAttr "{nodeName}.msg" ":defaultShaderList1.s" -na;')
+        for srcPlug, dstPlug in self.connections:
+            statements.append(f'connectAttr "{srcPlug}" "{dstPlug}";')
+        return statements
+
+    def toMayaAscii(self, requiredPlugins: dict[str, str] | None = None) -> str:
+        '''
+        Returns the recorded edits as a Maya ASCII fragment that can be imported into the scene they were recorded in.
+        - requiredPlugins = plugin: version pairs the fragment's nodes need
+        '''
+        lines = ["//Maya ASCII scene fragment", "//Written by the node network converter"]
+        lines.extend(f'requires "{plugin}" "{version}";' for plugin, version in (requiredPlugins or {}).items())
+        lines.extend(self.getMayaAsciiStatements())
+        return "\n".join(lines) + "\n"
+
+    def toPython(self) -> str:
+        '''
+        Returns the recorded edits as a Python script. The nodes get named by Maya when the script runs,
+        so the script keeps working if the recorded names are taken by then.
+        '''
+        lines = ["import maya.cmds as cmd", "", "nodes = {}"]
+        for nodeName, nodeType in self.createdNodes.items():
+            lines.append(f"nodes[{nodeName!r}] = cmd.shadingNode({nodeType!r}, asShader= True)")
+            for attr, values, typ in self.values[nodeName]:
+                typeArg = f", typ= {typ!r}" if typ != None else ""
+                lines.append(f"cmd.setAttr(nodes[{nodeName!r}] + {'.' + attr!r}, {', '.join(repr(value) for value in values)}{typeArg})")
+        for srcPlug, dstPlug in self.connections:
+            lines.append(f"cmd.connectAttr({self.formatPythonPlug(srcPlug)}, {self.formatPythonPlug(dstPlug)})")
+        return "\n".join(lines) + "\n"
+
+    def formatPythonPlug(self, plug: str) -> str:
+        nodeName, _, attr = plug.partition(".")
+        if nodeName in self.createdNodes:
+            return f"nodes[{nodeName!r}] + {'.' + attr!r}"
+        return repr(plug)
+
+class InstrumentedBackend:
+    '''
+    Wraps a command backend (see setBackend) and records every command made through it in an Instrumentation.
+    '''
+    def __init__(self, backend, instrumentation: "Instrumentation"):
+        self.backend = backend
+        self.instrumentation: Instrumentation = instrumentation
+
+    def __getattr__(self, name: str):
+        command = getattr(self.backend, name)
+        stats = self.instrumentation.calls.setdefault(name, [0, 0.0])
+        # ^ [count, cumulative seconds]
+
+        if not self.instrumentation.timeCalls:
+            def instrumentedCommand(*args, **kwargs):
+                stats[0] += 1
+                return command(*args, **kwargs)
+        else:
+            clock = time.perf_counter
+            events = self.instrumentation.events if self.instrumentation.traceCalls else None
+
+            def instrumentedCommand(*args, **kwargs):
+                start = clock()
+                try:
+                    return command(*args, **kwargs)
+                finally:
+                    seconds = clock() - start
+                    stats[0] += 1
+                    stats[1] += seconds
+                    if events != None:
+                        events.append((name, "call", start, seconds, None))
+
+        setattr(self, name, instrumentedCommand) # found on the instance from now on, without going through __getattr__ again
+        return instrumentedCommand
+
+
+class PhaseTimer:
+    '''
+    Context manager that records the time spent in a phase of the conversion in an Instrumentation, see timePhase.
+    '''
+    def __init__(self, instrumentation: "Instrumentation", name: str):
+        self.instrumentation: Instrumentation = instrumentation
+        self.name: str = name
+        self.start: float = 0.0
+        self.callsBefore: dict[str, int] = {}
+
+    def __enter__(self) -> "PhaseTimer":
+        self.callsBefore = self.instrumentation.beginPhase(self.name)
+        self.start = time.perf_counter()
+        return self
 
+    def __exit__(self, excType, excValue, tb) -> bool:
+        self.instrumentation.recordPhase(self.name, self.start, time.perf_counter() - self.start, self.callsBefore)
+        return False
+
+
+class Instrumentation:
+    '''
+    Context manager that records where the time of the conversions run inside it goes: the phases of the conversion (see timePhase),
+    every command sent to the backend (see InstrumentedBackend), and the time every node took to convert.
+    Read the results with toDict (or print it), and write them as a Chrome trace (chrome://tracing, Perfetto) with writeChromeTrace.
+    Without an active Instrumentation none of this is recorded, and none of it costs anything.
+    - timeCalls = whether the commands get timed too, not only counted
+    - trace = whether the phases and nodes get recorded one by one for writeChromeTrace
+    - traceCalls = whether every command gets recorded for writeChromeTrace too (that's a lot of events)
+    - slowestNodes = how many of the slowest nodes are kept
+    '''
+    active: "Instrumentation | None" = None # the instrumentation that is currently recording
+
+    def __init__(self, timeCalls: bool = True, trace: bool = False, traceCalls: bool = False, slowestNodes: int = 10):
+        self.timeCalls: bool = timeCalls or traceCalls
+        self.trace: bool = trace or traceCalls
+        self.traceCalls: bool = traceCalls
+        self.slowestNodes: int = slowestNodes
+        self.phases: dict[str, list] = {}
+        # ^ Key: phase name
+        # ^ Value: [count, cumulative seconds]
+        self.calls: dict[str, list] = {}
+        # ^ Key: command name
+        # ^ Value: [count, cumulative seconds]
+        self.phaseCalls: dict[str, dict[str, int]] = {}
+        # ^ Key: phase name
+        # ^ Value: number of calls of every command made in the phase, keyed by command name
+        self.nodeTypes: dict[str, list] = {}
+        # ^ Key: node type
+        # ^ Value: [count, cumulative seconds]
+        self.nodes: list[tuple[float, str, str]] = []
+        # ^ heap of the slowest (seconds, node name, node type)
+        self.events: list[tuple[str, str, float, float, dict | None]] = []
+        # ^ (name, category, start, seconds, arguments) of everything recorded for writeChromeTrace
+        self.start: float = 0.0
+        self.seconds: float = 0.0
+        self.backend = None
+        self.outer: Instrumentation | None = None
+
+    def __enter__(self) -> "Instrumentation":
+        self.outer = Instrumentation.active
+        Instrumentation.active = self
+        self.backend = setBackend(InstrumentedBackend(cmd, self))
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, tb) -> bool:
+        self.seconds = time.perf_counter() - self.start
+        setBackend(self.backend)
+        Instrumentation.active = self.outer
+        return False
+
+    def beginPhase(self, name: str) -> dict[str, int]:
+        '''
+        Called when a phase of the conversion starts. Returns the number of calls of every command made so far, for recordPhase.
+        '''
+        return {command: stats[0] for command, stats in self.calls.items()}
+
+    def recordPhase(self, name: str, start: float, seconds: float, callsBefore: dict[str, int] | None = None):
+        stats = self.phases.setdefault(name, [0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        if callsBefore != None:
+            phaseCalls = self.phaseCalls.setdefault(name, {})
+            for command, (count, _) in self.calls.items():
+                if count != callsBefore.get(command, 0):
+                    phaseCalls[command] = phaseCalls.get(command, 0) + count - callsBefore.get(command, 0)
+        if self.trace:
+            self.events.append((name, "phase", start, seconds, None))
+
+    def recordNode(self, nodeName: str, nodeType: str, start: float, seconds: float):
+        stats = self.nodeTypes.setdefault(nodeType, [0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        if len(self.nodes) < self.slowestNodes:
+            heapq.heappush(self.nodes, (seconds, nodeName, nodeType))
+        elif self.slowestNodes > 0 and seconds > self.nodes[0][0]:
+            heapq.heapreplace(self.nodes, (seconds, nodeName, nodeType))
+        if self.trace:
+            self.events.append((nodeName, "node", start, seconds, {"type": nodeType}))
+
+    def toDict(self) -> dict:
+        def sortedStats(stats: dict[str, list]) -> dict[str, dict]:
+            return {name: {"count": count, "seconds": seconds} for name, (count, seconds) in sorted(stats.items(), key= lambda item: (-item[1][1], -item[1][0]))}
+
+        phases = sortedStats(self.phases)
+        for name, stats in phases.items():
+            stats["calls"] = sum(self.phaseCalls.get(name, {}).values())
+
+        return {
+            "seconds": self.seconds,
+            "phases": phases,
+            "calls": sortedStats(self.calls),
+            "totalCalls": sum(count for count, _ in self.calls.values()),
+            "nodeTypes": sortedStats(self.nodeTypes),
+            "slowestNodes": [{"node": nodeName, "type": nodeType, "seconds": seconds} for seconds, nodeName, nodeType in sorted(self.nodes, reverse= True)],
+        }
+
+    def writeChromeTrace(self, path: str):
+        '''
+        Writes the recorded phases, nodes (and commands, with traceCalls) as a Chrome trace event file.
+        '''
+        pid = os.getpid()
+        traceEvents = [{"name": "Node converter", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "process_name"}}]
+        for name, category, start, seconds, args in self.events:
+            event = {"name": name, "cat": category, "ph": "X", "pid": pid, "tid": 0, "ts": (start - self.start) * 1e6, "dur": seconds * 1e6}
+            if args != None:
+                event["args"] = args
+            traceEvents.append(event)
+
+        with open(path, "w", encoding= "utf-8") as f:
+            json.dump({"traceEvents": traceEvents, "displayTimeUnit": "ms"}, f)
+
+    def __str__(self) -> str:
+        data = self.toDict()
+        lines = [f"Node converter: {data['seconds']:.3f}s, {data['totalCalls']} backend calls"]
+        lines.append("Phases:")
+        lines.extend(f"- {name}: {stats['seconds']:.3f}s ({stats['count']}x, {stats['calls']} backend calls)" for name, stats in data["phases"].items())
+        lines.append("Backend calls:")
+        lines.extend(f"- {name}: {stats['count']}" + (f" in {stats['seconds']:.3f}s" if self.timeCalls else "") for name, stats in data["calls"].items())
+        lines.append("Node types:")
+        lines.extend(f"- {name}: {stats['count']} node(s) in {stats['seconds']:.3f}s" for name, stats in data["nodeTypes"].items())
+        lines.append("Slowest nodes:")
+        lines.extend(f"- {node['node']} ({node['type']}): {node['seconds'] * 1000:.2f}ms" for node in data["slowestNodes"])
+        return "\n".join(lines)
+
+class TextureConverter(ABC):
+    '''
+    Turns a texture image into a file the renderer reads faster (see TexturePreparation). Subclass it (implementing convert) to use another tool,
+    or to stand in for one (e.g. a plain copy where txmake isn't installed).
+    '''
+    extension: str = ".tex" # extension of the prepared files
+
+    def getKey(self) -> str:
+        '''
+        Returns what tells the outputs of this converter (and its settings) apart from others. Prepared files are cached by it
+        and the content of their source, so changing the settings prepares every texture again.
+        '''
+        return type(self).__name__
+
+    @abstractmethod
+    def convert(self, sourcePath: str, outputPath: str):
+        '''
+        Writes the prepared version of sourcePath to outputPath. Raises an error if it can't.
+        '''
+
+class TxMakeConverter(TextureConverter):
+    '''
+    Converts textures to tiled, mipmapped .tex files with RenderMan's txmake.
+    - executable = path of txmake, by default the one in $RMANTREE/bin (or on the PATH if RMANTREE isn't set)
+    - arguments = extra txmake arguments, e.g. ["-mode", "periodic"]
+    '''
+    def __init__(self, executable: str | None = None, arguments: list[str] | tuple[str, ...] = ()):
+        if executable == None:
+            rmanTree = os.environ.get("RMANTREE")
+            executable = os.path.join(rmanTree, "bin", "txmake") if rmanTree != None else "txmake"
+        self.executable: str = executable
+        self.arguments: list[str] = list(arguments)
+
+    def getKey(self) -> str:
+        return json.dumps(["txmake", self.arguments])
+
+    def convert(self, sourcePath: str, outputPath: str):
+        subprocess.run([self.executable, *self.arguments, sourcePath, outputPath], check= True, capture_output= True)
+
+class TexturePreparation:
+    '''
+    Context manager that prepares the textures of the conversions run inside it: every unique texture path of the converted nodes
+    (see TEXTUREATTRS) is converted once with the converter, in a pool of workers, and the converted nodes get the prepared file instead.
+    Prepared files are kept in cacheDir, named by the hash of their source's content and the converter (see TextureConverter.getKey),
+    so textures that haven't changed are never prepared again, whatever scene they're used in. The content hashes of the source files are
+    kept in cacheDir too, and only computed again for files that have been modified since.
+    Every tile of a path with tile tokens (see TEXTURETILETOKENS) is prepared, named by the hash of all of its tiles and its tile
+    (e.g. <hash>.1001.tex), and the node gets the path with the tokens (e.g. <hash>.<UDIM>.tex). Paths with other tokens (e.g. <f>)
+    and files that don't exist are left as they are.
+    - cacheDir = folder of the prepared files
+    - converter = TextureConverter to prepare the textures with, TxMakeConverter by default
+    - workers = how many textures are hashed and converted at once (default: number of cores)
+    '''
+    active: "TexturePreparation | None" = None # the texture preparation of the conversions that are currently running
+
+    def __init__(self, cacheDir: str, converter: TextureConverter | None = None, workers: int | None = None):
+        self.cacheDir: str = cacheDir
+        self.converter: TextureConverter = converter if converter != None else TxMakeConverter()
+        self.workers: int = workers or os.cpu_count() or 1
+        self.contentHashes: dict[str, list] = {}
+        # ^ Key: absolute path of a source texture
+        # ^ Value: [st_mtime_ns, st_size, hash of its content] when it was last hashed
+        self.prepared: dict[str, str] = {}
+        # ^ Key: texture path as the nodes had it
+        # ^ Value: path of its prepared file
+        self.missing: set[str] = set()   # texture paths that aren't files
+        self.skipped: set[str] = set()   # texture paths with tokens that aren't tile tokens
+        self.failed: dict[str, str] = {}
+        # ^ Key: texture path as the nodes had it
+        # ^ Value: why it couldn't be prepared
+        self.convertedCount: int = 0     # textures converted, the others came from the cache
+        self.outer: TexturePreparation | None = None
+
+    def __enter__(self) -> "TexturePreparation":
+        os.makedirs(self.cacheDir, exist_ok= True)
+        try:
+            with open(os.path.join(self.cacheDir, TEXTUREINDEXFILE), "r", encoding= "utf-8") as f:
+                index = json.load(f)
+            if index.get("formatVersion") == TEXTUREINDEXFORMATVERSION:
+                self.contentHashes = index["files"]
+        except (OSError, ValueError): # no index yet, or one that can't be read anymore
+            pass
+
+        self.outer = TexturePreparation.active
+        TexturePreparation.active = self
+        return self
+
+    def __exit__(self, excType, excValue, tb) -> bool:
+        TexturePreparation.active = self.outer
+        try:
+            indexPath = os.path.join(self.cacheDir, TEXTUREINDEXFILE)
+            tempPath = f"{indexPath}.{os.getpid()}.tmp"
+            with open(tempPath, "w", encoding= "utf-8") as f:
+                json.dump({"formatVersion": TEXTUREINDEXFORMATVERSION, "files": self.contentHashes}, f)
+            os.replace(tempPath, indexPath) # never leaving a half written index behind for other sessions
+        except OSError:
+            pass
+        return False
+
+    def getContentHash(self, path: str) -> str:
+        '''
+        Returns the SHA-256 of the given file's content, read from the file only if it has been modified since it was last hashed.
+        '''
+
+        stat = os.stat(path)
+        cached = self.contentHashes.get(path)
+        if cached != None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(TEXTUREHASHCHUNKSIZE), b""):
+                digest.update(chunk)
+
+        contentHash = digest.hexdigest()
+        self.contentHashes[path] = [stat.st_mtime_ns, stat.st_size, contentHash]
+        return contentHash
+
+    def getOutputPath(self, contentHash: str, tile: str | None = None) -> str:
+        '''
+        Returns the path of the prepared file of the given content, for the given tile (e.g. "1001", or tile tokens: "<UDIM>") of it if it has tiles.
+        '''
+        key = hashlib.sha256(f"{contentHash}\n{self.converter.getKey()}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cacheDir, (f"{key}.{tile}" if tile != None else key) + self.converter.extension)
+
+    def prepareFile(self, sourcePath: str, outputPath: str) -> bool:
+        '''
+        Converts sourcePath to outputPath, unless it has been prepared already. Returns whether it had to be converted.
+        '''
+
+        if os.path.exists(outputPath):
+            return False
+
+        tempPath = f"{os.path.splitext(outputPath)[0]}.{os.getpid()}.partial{self.converter.extension}"
+        try:
+            self.converter.convert(sourcePath, tempPath)
+            os.replace(tempPath, outputPath) # a cached file is always complete, even if the conversion gets interrupted
+        finally:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+        return True
+
+    def prepareTextures(self, texturePaths: list[str]) -> dict[str, str]:
+        '''
+        Prepares the given textures: hashes every file (every tile of paths with tile tokens), then converts every content that isn't
+        in the cache yet, both in the pool of workers. Returns the path of the prepared file of every texture path that could be prepared.
+        Relative paths are looked up in the current Maya project, see checkTextures.
+        '''
+
+        sources: dict[str, tuple[str | None, dict[int, str]]] = {}
+        # ^ Key: texture path
+        # ^ Value: (its tile tokens, see TextureResolver.getTileTokens, or None if it has none, absolute path of every tile keyed by UDIM number)
+        workspaceRoot = getWorkspaceRoot() if len(texturePaths) != 0 else ""
+        for texturePath in dict.fromkeys(texturePaths):
+            sourcePath = resolveTexturePath(texturePath, workspaceRoot)
+            tileTokens = None
+            if "<" in os.path.basename(sourcePath):
+                tileTokens = textureResolver.getTileTokens(os.path.basename(sourcePath))
+                if tileTokens == None: # other tokens (<f>, ...) stand for files that can't be told apart by tile
+                    self.skipped.add(texturePath)
+                    continue
+            tiles = textureResolver.getTiles(sourcePath)
+            if len(tiles) == 0:
+                self.missing.add(texturePath)
+                continue
+            sources[texturePath] = (tileTokens, tiles)
+
+        prepared: dict[str, str] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers= self.workers) as pool: # every worker waits for one file read or converter process at a time
+            hashes = {sourcePath: pool.submit(self.getContentHash, sourcePath) for _, tiles in sources.values() for sourcePath in tiles.values()}
+
+            outputs: dict[str, tuple[dict[str, str], list[str]]] = {}
+            # ^ Key: path of a prepared file, with the tile tokens for tiled textures
+            # ^ Value: ({prepared file: its source file} of every tile, texture paths with the same content, converted only once)
+            for texturePath, (tileTokens, tiles) in sources.items():
+                try:
+                    if tileTokens == None:
+                        outputPath = self.getOutputPath(hashes[tiles[1001]].result())
+                        files = {outputPath: tiles[1001]}
+                    else:
+                        contentHash = hashlib.sha256("\n".join(f"{udim} {hashes[tilePath].result()}" for udim, tilePath in sorted(tiles.items())).encode("utf-8")).hexdigest()
+                        outputPath = self.getOutputPath(contentHash, tileTokens)
+                        files = {self.getOutputPath(contentHash, textureResolver.formatTile(tileTokens, udim)): tilePath for udim, tilePath in tiles.items()}
+                except OSError as e:
+                    self.failed[texturePath] = str(e)
+                    continue
+                outputs.setdefault(outputPath, (files, []))[1].append(texturePath)
+
+            conversions = {pool.submit(self.prepareFile, sourcePath, tileOutputPath): outputPath for outputPath, (files, _) in outputs.items() for tileOutputPath, sourcePath in files.items()}
+            errors: dict[str, str] = {}
+            # ^ Key: path of a prepared file (with the tile tokens for tiled textures) that couldn't be prepared
+            # ^ Value: why, the error of its first tile that failed
+            for future in concurrent.futures.as_completed(conversions):
+                outputPath = conversions[future]
+                try:
+                    self.convertedCount += future.result()
+                except Exception as e: # whatever the converter raises, the texture is left as it is
+                    error = e.stderr.decode(errors= "replace").strip() if isinstance(e, subprocess.CalledProcessError) and e.stderr else str(e)
+                    errors.setdefault(outputPath, error or type(e).__name__)
+
+            for outputPath, (_, paths) in outputs.items():
+                if outputPath in errors:
+                    self.failed.update((texturePath, errors[outputPath]) for texturePath in paths)
+                else:
+                    prepared.update((texturePath, outputPath) for texturePath in paths)
+
+        self.prepared.update(prepared)
+        return prepared
+
+    def prepareNodeValues(self, nodes: list[Node], nodeValues: dict[str, list], fromEngine: str, toEngine: str, report: ConversionReport | None = None):
+        '''
+        Replaces the texture paths among the field values of the given nodes (see getBatchFieldValues) with their prepared files.
+        Texture paths that can't be prepared because of their tokens are recorded in the report.
+        '''
+
+        textureFields = getTextureFields(nodes, nodeValues, fromEngine, toEngine)
+        if len(textureFields) == 0:
+            return
+
+        texturePaths = sorted({values[i] for _, values, i in textureFields})
+        convertedCount = self.convertedCount
+        prepared = self.prepareTextures(texturePaths)
+        for nodeName, values, i in textureFields:
+            if report != None and values[i] in self.skipped:
+                report.skippedTextures[nodeName] = values[i]
+            values[i] = prepared.get(values[i], values[i])
+
+        for texturePath in texturePaths: # missing ones have been reported by checkTextures already
+            if texturePath in self.failed:
+                print(f'! Node converter: Couldn\'t prepare texture "{texturePath}", leaving it as it is: {self.failed[texturePath]}')
+            elif texturePath in self.skipped:
+                print(f'! Node converter: Texture "{texturePath}" has tokens other than tile tokens, leaving it as it is.')
+        if len(prepared) != 0:
+            print(f"Node converter: {len(set(prepared.values()))} texture(s) prepared in {self.cacheDir} ({self.convertedCount - convertedCount} converted, the rest from the cache).")
+
+class TextureResolver:
+    '''
+    Answers whether texture files exist, and which tiles the paths with UV tile tokens (<UDIM>, <UVTILE>, <u>/<v>, <U>/<V>) have.
+    Every directory is listed once, with a single os.scandir, and its listing is kept until clear is called,
+    so checking thousands of textures and tiles on network storage costs one listing per directory instead of one lookup per file.
+    '''
+    def __init__(self):
+        self.directories: dict[str, dict[str, str]] = {}
+        # ^ Key: absolute, normalised path of a directory
+        # ^ Value: {normcased file name: file name} of the files in it, empty if there's no such directory
+        self.patterns: dict[str, tuple[re.Pattern, tuple[str, ...]]] = {}
+        # ^ Key: file name with tokens
+        # ^ Value: (regular expression matching the normcased names of its tiles, names of the tile numbers in it), see getTilePattern
+
+    def clear(self, directory: str | None = None):
+        '''
+        Forgets the listing of the given directory (every directory by default), to see files added or removed since it was listed.
+        '''
+
+        if directory == None:
+            self.directories.clear()
+        else:
+            self.directories.pop(os.path.normpath(os.path.abspath(directory)), None)
+
+    def listDirectory(self, directory: str) -> dict[str, str]:
+        '''
+        Returns {normcased file name: file name} of the files in the given directory, listing it only the first time.
+        '''
+
+        directory = os.path.normpath(os.path.abspath(directory))
+        files = self.directories.get(directory)
+        if files == None:
+            files = {}
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            files[os.path.normcase(entry.name)] = entry.name
+            except OSError: # no such directory (or no access to it): no files
+                pass
+            self.directories[directory] = files
+
+        return files
+
+    def getTilePattern(self, fileName: str) -> tuple[re.Pattern, tuple[str, ...]]:
+        '''
+        Returns a regular expression that matches the normcased names of the files a file name with tokens stands for,
+        and the names of the tile numbers of its tile tokens (see TEXTURETILETOKENS). Other tokens (e.g. <f>) match anything.
+        '''
+
+        cached = self.patterns.get(fileName)
+        if cached != None:
+            return cached
+
+        expression = ""
+        tileNumbers: list[str] = []
+        for i, part in enumerate(re.split(r"<(\w+)>", fileName)):
+            if i % 2 == 0: # text between the tokens
+                expression += re.escape(os.path.normcase(part))
+            elif part in TEXTURETILETOKENS:
+                tokenExpression = TEXTURETILETOKENS[part]
+                if any(f"(?P<{tileNumber}>" in tokenExpression for tileNumber in tileNumbers): # the same tile number again, it has to have the same value
+                    tokenExpression = re.sub(r"\(\?P<(\w+)>[^()]*\)", r"(?P=\1)", tokenExpression)
+                expression += tokenExpression
+                tileNumbers.extend(re.findall(r"\(\?P<(\w+)>", tokenExpression))
+            else:
+                expression += ".+?"
+
+        cached = (re.compile(expression), tuple(dict.fromkeys(tileNumbers)))
+        self.patterns[fileName] = cached
+        return cached
+
+    def getTileTokens(self, fileName: str) -> str | None:
+        '''
+        Returns the part of a file name with tokens from its first to its last token (e.g. "<u>_<v>" of "color_<u>_<v>.exr"),
+        or None if some of them aren't tile tokens (see TEXTURETILETOKENS).
+        '''
+
+        parts = re.split(r"(<\w+>)", fileName) # every other part is a token
+        if len(parts) == 1 or any(parts[i][1:-1] not in TEXTURETILETOKENS for i in range(1, len(parts), 2)):
+            return None
+        return "".join(parts[1:-1])
+
+    def formatTile(self, fileName: str, udim: int) -> str:
+        '''
+        Returns the given file name with its tile tokens replaced by the numbers of the given tile (e.g. "<u>_<v>", 1012 -> "1_1").
+        '''
+
+        u, v = (udim - 1001) % 10, (udim - 1001) // 10
+        values = {"UDIM": str(udim), "udim": str(udim), "UVTILE": f"u{u + 1}_v{v + 1}", "u": str(u), "v": str(v), "U": str(u + 1), "V": str(v + 1)}
+        return re.sub(r"<(\w+)>", lambda match: values.get(match.group(1), match.group(0)), fileName)
+
+    def getTiles(self, path: str) -> dict[int, str]:
+        '''
+        Returns the paths of the files the given texture path stands for, keyed by their UDIM number (1001 + u + 10 * v).
+        Paths without tile tokens have a single tile, 1001, if the file exists. Files matching a path with other tokens only
+        (e.g. <f>) are all returned under 1001, the first of them (by name) as its value.
+        '''
+
+        directory, fileName = os.path.split(os.path.abspath(path))
+        files = self.listDirectory(directory)
+        if "<" not in fileName:
+            name = files.get(os.path.normcase(fileName))
+            return {1001: os.path.join(directory, name)} if name != None else {}
+
+        pattern, tileNumbers = self.getTilePattern(fileName)
+        tiles: dict[int, str] = {}
+        for normName in sorted(files):
+            match = pattern.fullmatch(normName)
+            if match == None:
+                continue
+            values = {tileNumber: int(match.group(tileNumber)) for tileNumber in tileNumbers}
+            if "udim" in values:
+                udim = values["udim"]
+            elif "U" in values or "V" in values: # 1 based tile numbers (Mudbox, <UVTILE>)
+                udim = 1001 + (values.get("U", 1) - 1) + 10 * (values.get("V", 1) - 1)
+            else: # 0 based tile numbers (ZBrush), or no tile token at all
+                udim = 1001 + values.get("u", 0) + 10 * values.get("v", 0)
+            tiles.setdefault(udim, os.path.join(directory, files[normName]))
+
+        return tiles
+
+    def exists(self, path: str) -> bool:
+        '''
+        Returns whether the given texture path has a file, or for paths with tokens, at least one tile.
+        '''
+        return len(self.getTiles(path)) != 0
+
+class ConversionProgress(NamedTuple):
+    '''
+    Where a conversion run by a ConversionScheduler is at, as handed to its progress callback.
+    '''
+    phase: str          # phase of the conversion (see timePhase), or "done", "cancelled" or "failed" once it's over
+    done: int           # steps of the phase done so far
+    total: int | None   # steps of the phase, None while it's not known yet (crawl)
+    fraction: float     # of the whole conversion done so far, estimated with SCHEDULERPHASEWEIGHTS
+    seconds: float      # since the conversion started
+    eta: float | None   # estimated seconds left, None until there's enough done to estimate it from
+
+class ConversionCancelled(Exception):
+    '''
+    Raised into the ConversionTransaction of a conversion that was cancelled, see ConversionScheduler.cancel.
+    '''
+
+class ConversionScheduler:
+    '''
+    Runs a conversion (crawl and convertNodeTree) in small steps (see iterCrawlNodeTree, iterConvertNodeTree) while Maya is idle,
+    so the UI stays responsive: every time Maya is idle, steps are run until the time budget is used up, then Maya gets control back.
+    Progress and ETA are reported to the progress callback after every slice. Cancelling (cancel, or the callback returning True)
+    stops the conversion and reverts everything it has done so far, like a failed conversion does (see ConversionTransaction).
+    Every slice is an undo step of its own, so edits made in the scene between slices stay out of the conversion's undo steps.
+    Undoing slices while the conversion still runs is not supported, cancel it instead.
+    - roots = nodes to crawl the networks of, the selected ones (when the conversion starts) by default
+    - incremental = see convertNodeTree
+    - budget = seconds of work per slice, SCHEDULERBUDGET by default
+    - progress = called with a ConversionProgress after every slice and once the conversion is over, e.g. MainProgressBar()
+    - batchSize = see iterConvertNodeTree, SCHEDULERBATCHSIZE by default
+    '''
+    def __init__(self, fromEngine: str, toEngine: str, roots: list[Node] | None = None, incremental: bool = True, budget: float | None = None,
+                 progress: Callable[[ConversionProgress], bool | None] | None = None, batchSize: int | None = None):
+        self.fromEngine: str = fromEngine
+        self.toEngine: str = toEngine
+        self.roots: list[Node] | None = roots
+        self.incremental: bool = incremental
+        self.budget: float = budget if budget != None else SCHEDULERBUDGET
+        self.progress = progress
+        self.batchSize: int = batchSize if batchSize != None else SCHEDULERBATCHSIZE
+        self.state: str = "waiting"    # "waiting", "running", "done", "cancelled" or "failed"
+        self.report: ConversionReport | None = None
+        self.steps = None
+        self.transaction: ConversionTransaction | None = None
+        self.start: float = 0.0
+        self.lastStep: tuple[str, int, int | None] = ("crawl", 0, None)
+        # ^ (phase, done, total) of the last step that ran
+
+    def getSteps(self):
+        roots = self.roots if self.roots != None else getSelected()
+        with timePhase("crawl"):
+            graph = yield from iterCrawlNodeTree(roots)
+        return (yield from iterConvertNodeTree(graph, self.fromEngine, self.toEngine, self.incremental, self.batchSize))
+
+    def begin(self):
+        self.transaction = ConversionTransaction() # only active while its steps run, see tick
+        self.steps = self.getSteps()
+        self.state = "running"
+        self.start = time.perf_counter()
+
+    def startIdle(self) -> "ConversionScheduler":
+        '''
+        Starts the conversion, running it in Maya's idle time. Returns the scheduler.
+        '''
+
+        self.begin()
+        cmd.evalDeferred(self.tickIdle, lowestPriority= True)
+        return self
+
+    def tickIdle(self):
+        if self.tick():
+            cmd.evalDeferred(self.tickIdle, lowestPriority= True) # the next slice after Maya has handled everything else
+
+    def run(self) -> ConversionReport | None:
+        '''
+        Runs the whole conversion right away, slice by slice (the progress callback is still called). Returns its ConversionReport.
+        '''
+
+        if self.state == "waiting":
+            self.begin()
+        while self.tick():
+            pass
+        return self.report
+
+    def tick(self) -> bool:
+        '''
+        Runs the steps of the conversion for one slice of the time budget. Returns whether the conversion is still running.
+        '''
+
+        if self.state != "running":
+            return False
+
+        outer = ConversionTransaction.active
+        self.transaction.openUndo() # closed before Maya gets control back, so nothing else ends up in the slice's undo step
+        try:
+            ConversionTransaction.active = self.transaction
+            try:
+                sliceEnd = time.perf_counter() + self.budget
+                while True:
+                    self.lastStep = next(self.steps)
+                    if time.perf_counter() >= sliceEnd:
+                        break
+            finally:
+                ConversionTransaction.active = outer
+        except StopIteration as stop:
+            self.report = stop.value
+            self.finish("done")
+        except Exception as error:
+            self.finish("failed", type(error), error)
+            raise
+        finally:
+            self.transaction.closeUndo()
+
+        if self.state == "running" and self.reportProgress(self.lastStep[0]):
+            self.cancel()
+        return self.state == "running"
+
+    def cancel(self):
+        '''
+        Stops the conversion and reverts everything it has done so far, in an undo step of its own.
+        '''
+
+        if self.state != "running":
+            return
+        self.steps.close() # leaves the phases it's in
+        self.transaction.openUndo()
+        try:
+            self.finish("cancelled", ConversionCancelled, ConversionCancelled("Cancelled."))
+        finally:
+            self.transaction.closeUndo()
+
+    def finish(self, state: str, excType = None, excValue = None):
+        self.state = state
+        try:
+            self.transaction.end(excType, excValue) # rolls back, unless the conversion is done
+        finally:
+            self.reportProgress(state)
+
+    def getFraction(self, phase: str) -> float:
+        '''
+        Returns the estimated fraction of the conversion that's done, with the given phase at the last step that ran.
+        '''
+
+        if phase == "done":
+            return 1.0
+
+        fraction = 0.0
+        for weightedPhase, weight in SCHEDULERPHASEWEIGHTS.items():
+            if weightedPhase == self.lastStep[0]:
+                _, done, total = self.lastStep
+                fraction += weight * (done / total if total else 0.0)
+                break
+            fraction += weight
+
+        return fraction / sum(SCHEDULERPHASEWEIGHTS.values())
+
+    def reportProgress(self, phase: str) -> bool:
+        '''
+        Hands the current ConversionProgress to the progress callback. Returns whether the callback asked to cancel the conversion.
+        '''
+
+        if self.progress == None:
+            return False
+
+        seconds = time.perf_counter() - self.start
+        fraction = self.getFraction(phase)
+        eta = seconds * (1.0 - fraction) / fraction if fraction >= SCHEDULERMINIMUMETAFRACTION else None
+        _, done, total = self.lastStep
+        return bool(self.progress(ConversionProgress(phase, done, total, fraction, seconds, eta)))
+
+class MainProgressBar:
+    '''
+    Progress callback of a ConversionScheduler that shows the progress in Maya's main progress bar (bottom of the main window).
+    Pressing Esc cancels the conversion.
+    '''
+    def __init__(self):
+        self.bar: str | None = None
+
+    def __call__(self, progress: ConversionProgress) -> bool:
+        if progress.phase in ("done", "cancelled", "failed"):
+            if self.bar != None:
+                cmd.progressBar(self.bar, edit= True, endProgress= True)
+                self.bar = None
+            return False
+
+        if self.bar == None:
+            import maya.mel # only there in Maya's UI
+            self.bar = maya.mel.eval("$tmp = $gMainProgressBar")
+            cmd.progressBar(self.bar, edit= True, beginProgress= True, isInterruptable= True, maxValue= 1000)
+
+        eta = f", about {progress.eta:.0f}s left" if progress.eta != None else ""
+        cmd.progressBar(self.bar, edit= True, progress= int(progress.fraction * 1000), status= f"Node converter: {progress.phase}{eta}")
+        return cmd.progressBar(self.bar, query= True, isCancelled= True)
+
+class ConversionTables(Mapping):
+    '''
+    ENGINECONVERSIONS: the conversion tables keyed by table name (e.g.: "ARNOLD_TO_COMMON"), each one loaded from CONVERSIONTABLEDIR
+    the first time it's used (see loadConversionTable), so only the tables of the engines being converted are ever read.
+    '''
+    def __init__(self):
+        self.tables: dict[str, dict] = {}
+        # ^ Key: table name
+        # ^ Value: the loaded table
+
+    def __getitem__(self, tableName: str) -> dict:
+        if not isinstance(tableName, str): # e.g. FROMENGINES.get of an unknown engine
+            raise KeyError(tableName)
+        if tableName not in self.tables:
+            self.tables[tableName] = loadConversionTable(tableName)
+        return self.tables[tableName]
+
+    def __iter__(self):
+        fileNames = sorted(os.listdir(getConversionTableDir()))
+        return iter([fileName[:-len(".json")] for fileName in fileNames if fileName.endswith(".json")])
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
 
 ### }}}
 
 ### {{{ CONSTANT definitions
 
-# This is to stop the recursive mapInConnections function from going outside of shading nodes when looking for incoming connections
+# Command backend that every Maya query and edit of the converter goes through, see setBackend.
+# Backends answer to the subset of maya.cmds the converter uses (ls, listConnections, nodeType, objExists, getAttr, setAttr,
+# shadingNode, createNode, connectAttr, disconnectAttr, delete, undoInfo, listAttr, attributeQuery, addAttr, pluginInfo, and in the UI
+# evalDeferred and progressBar, see ConversionScheduler) with maya.cmds' flags and return values, e.g.: MayaCmdsBackend, fake_scene.FakeSceneBackend, ConversionEmitter.
+cmd = MayaCmdsBackend()
+
+# Smallest number of values FieldTransform.applyBatch hands over to NumPy, transforming fewer one by one is faster
+BATCHTRANSFORMMINIMUM = 32
+
+# Seconds of work a ConversionScheduler does every time Maya is idle, and the number of nodes it reads the values of in one step
+SCHEDULERBUDGET = 0.05
+SCHEDULERBATCHSIZE = 100
+
+# Rough share of the time of a conversion that each phase takes, for the progress and ETA of ConversionScheduler, in the order they run
+SCHEDULERPHASEWEIGHTS = {
+    "crawl": 0.1,
+    "plan connections": 0.05,
+    "read values": 0.2,
+    "check textures": 0.05,
+    "prepare textures": 0.1,
+    "convert nodes": 0.4,
+    "connect": 0.1
+}
+SCHEDULERMINIMUMETAFRACTION = 0.05 # the ETA is only estimated once this much of the conversion is done
+
+# What timePhase returns when nothing is recording
+NOPHASETIMER = contextlib.nullcontext()
+
+# This is to stop the crawler (crawlNodeTree) from going outside of shading nodes when looking for incoming connections
 STOPCRAWLINGTYPES = ["colorManagementGlobals", "place2dTexture", "lightLinker", "materialInfo", "nodeGraphEditorInfo", "partition", "defaultShaderList"]
 
 # Render engine table for dict selection
@@ -66,585 +1544,213 @@ TOENGINES = {
     "RenderMan": "COMMON_TO_RENDERMAN"
 }
 
-# Arnold nodes and components "translated" to engine independent attribute names
+# Directory of the conversion tables: one <table name>.json file per table of ENGINECONVERSIONS, see readConversionTableFile.
+# Parsed tables are cached in its __pycache__ folder, see loadConversionTable.
+# None when the script wasn't run from a file (e.g. pasted into the Script Editor), see getConversionTableDir.
+CONVERSIONTABLEDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "conversions") if "__file__" in globals() else None
+CONVERSIONTABLEFORMATVERSION = 1
+CONVERSIONCACHEFORMATVERSION = 2 # bumped when NodeField or FieldTransform change, so pickles of older versions are not used
+
+# Engine nodes and components "translated" to engine independent attribute names (<ENGINE>_TO_COMMON tables),
+# and the engine independent names "translated" to engine specific ones (COMMON_TO_<ENGINE> tables).
 # in the long run this should make adding more render engines to this script easier.
 # Despite that, the naming conventions will most likely have to be modified down the line
+# Tables are read from CONVERSIONTABLEDIR when they are first used, so only the ones of the engines being converted get loaded.
+ENGINECONVERSIONS = ConversionTables()
 
-ENGINECONVERSIONS ={
-
-    "ARNOLD_TO_COMMON": {
-        "aiStandardSurface": {
-            "nodeTypeName": [NodeField(commonName= "surfaceShader")],
-            "caching": [NodeField(commonName= "caching")],
-            "frozen": [NodeField(commonName= "frozen")],
-            "isHistoricallyInteresting": [NodeField(commonName= "isHistoricallyInteresting")],
-            "nodeState": [NodeField(commonName= "nodeState")],
-            "base": [NodeField(commonName= "diffuseGain")],
-            "baseColor": [NodeField(commonName= "diffuseColor")],
-            "baseColorR": [NodeField(commonName= "diffuseColorR")],
-            "baseColorG": [NodeField(commonName= "diffuseColorG")],
-            "baseColorB": [NodeField(commonName= "diffuseColorB")],
-            "diffuseRoughness": [NodeField(commonName= "diffuseRoughness")],
-            "thinWalled": [NodeField(commonName= "DoubleSided"), NodeField(commonName= "diffuseBackUseDiffuseColor"), NodeField(commonName= "specularDoubleSided"), NodeField(commonName= "roughSpecularDoubleSided"), NodeField(commonName= "subsurfaceDoubleSided"), NodeField(commonName= "thinGlass"), NodeField(commonName= "clearcoatDoubleSided"), NodeField(commonName= "fuzzDoubleSided")],
-            "specular": [NodeField(commonName= "specularGain")],
-            "specularColor": [NodeField(commonName= "specularEdgeColor"), NodeField(commonName= "roughSpecularEdgeColor")],
-            "specularColorR": [NodeField(commonName= "specularEdgeColorR"), NodeField(commonName= "roughSpecularEdgeColorR")],
-            "specularColorG": [NodeField(commonName= "specularEdgeColorG"), NodeField(commonName= "roughSpecularEdgeColorG")],
-            "specularColorB": [NodeField(commonName= "specularEdgeColorB"), NodeField(commonName= "roughSpecularEdgeColorB")],
-            "specularIOR": [NodeField(commonName= "specularior"), NodeField(commonName= "roughSpecularIor")],
-            "specularRoughness": [NodeField(commonName= "specularRoughness"), NodeField(commonName= "roughSpecularRoughness", func= lambda x: x + 0.1 if 1 > x else x)],
-            "specularAnisotropy": [NodeField(commonName= "specularAnisotropy"), NodeField(commonName= "roughSpecularAnisotropy")],
-            "specularRotation": [NodeField(commonName= "specularAnisotropyDirection"), NodeField(commonName= "roughSpecularAnisotropyDirection")],
-            "tangent": [NodeField(commonName= "glassAnisotropyDirection")],
-            "tangentX": [NodeField(commonName= "specularAnisotropyDirectionX"), NodeField(commonName= "roughSpecularAnisotropyDirectionX"), NodeField(commonName= "clearcoatAnisotropyDirectionX"), NodeField(commonName= "glassAnisotropyDirectionX")],
-            "tangentY": [NodeField(commonName= "specularAnisotropyDirectionY"), NodeField(commonName= "roughSpecularAnisotropyDirectionY"), NodeField(commonName= "clearcoatAnisotropyDirectionY"), NodeField(commonName= "glassAnisotropyDirectionY")],
-            "tangentZ": [NodeField(commonName= "specularAnisotropyDirectionZ"), NodeField(commonName= "roughSpecularAnisotropyDirectionZ"), NodeField(commonName= "clearcoatAnisotropyDirectionZ"), NodeField(commonName= "glassAnisotropyDirectionZ")],
-            "coat": [NodeField(commonName= "coatGain")],
-            "coatColor": [NodeField(commonName= "clearcoatEdgeColor")],
-            "coatColorR": [NodeField(commonName= "clearcoatEdgeColorR")],
-            "coatColorG": [NodeField(commonName= "clearcoatEdgeColorG")],
-            "coatColorB": [NodeField(commonName= "clearcoatEdgeColorB")],
-            "coatIOR": [NodeField(commonName= "clearcoatIor")],
-            "coatAffectColor": [NodeField(commonName= "clearcoatThickness")],
-            "coatRoughness": [NodeField(commonName= "clearcoatRoughness")],
-            "coatAnisotropy": [NodeField(commonName= "clearcoatAnisotropy")],
-            "coatRotation": [NodeField(commonName= "clearcoatAnisotropyDirection")],
-            "coatNormal": [NodeField(commonName= "clearcoatBumpNormal")],
-            "coatNormalX": [NodeField(commonName= "clearcoatBumpNormalX")],
-            "coatNormalY": [NodeField(commonName= "clearcoatBumpNormalY")],
-            "coatNormalZ": [NodeField(commonName= "clearcoatBumpNormalZ")],
-            "coatAffectRoughness": [NodeField(commonName= "coatAffectRoughness")],
-            "sheen": [NodeField(commonName= "sheen")],
-            "sheenColor": [NodeField(commonName= "sheenColor")],
-            "sheenColorR": [NodeField(commonName= "sheenColorR")],
-            "sheenColorG": [NodeField(commonName= "sheenColorG")],
-            "sheenColorB": [NodeField(commonName= "sheenColorB")],
-            "sheenRoughness": [NodeField(commonName= "sheenRoughness")],
-            "subsurface": [NodeField(commonName= "subsurfaceGain")],
-            "subsurfaceColor": [NodeField(commonName= "subsurfaceColor")],
-            "subsurfaceColorR": [NodeField(commonName= "subsurfaceColorR")],
-            "subsurfaceColorG": [NodeField(commonName= "subsurfaceColorG")],
-            "subsurfaceColorB": [NodeField(commonName= "subsurfaceColorB")],
-            "subsurfaceScale": [NodeField(commonName= "subsurfaceScale")],
-            "subsurfaceRadius": [NodeField(commonName= "subsurfaceRadius")],
-            "subsurfaceRadiusR": [NodeField(commonName= "subsurfaceRadiusR")],
-            "subsurfaceRadiusG": [NodeField(commonName= "subsurfaceRadiusG")],
-            "subsurfaceRadiusB": [NodeField(commonName= "subsurfaceRadiusB")],
-            "subsurfaceAnisotropy": [NodeField(commonName= "subsurfaceDirectionality")],
-            "transmission": [NodeField(commonName= "refractionGain"), NodeField(commonName= "reflectionGain")],
-            "transmissionColor": [NodeField(commonName= "refractionColor")],
-            "transmissionColorR": [NodeField(commonName= "refractionColorR")],
-            "transmissionColorG": [NodeField(commonName= "refractionColorG")],
-            "transmissionColorB": [NodeField(commonName= "refractionColorB")],
-            "transmissionExtraRoughness": [NodeField(commonName= "glassRoughness")],
-            "transmissionScatterAnisotropy": [NodeField(commonName= "glassAnisotropy")],
-            "transmissionScatter": [NodeField(commonName= "ssAlbedo"), NodeField(commonName= "extinction", func=lambda lst: tuple(map(lambda x: 1 - x, lst[0])))],
-            "transmissionScatterR": [NodeField(commonName= "ssAlbedoR"), NodeField(commonName= "extinctionR", func= lambda x: 1 - x)],
-            "transmissionScatterG": [NodeField(commonName= "ssAlbedoG"), NodeField(commonName= "extinctionG", func= lambda x: 1 - x)],
-            "transmissionScatterB": [NodeField(commonName= "ssAlbedoB"), NodeField(commonName= "extinctionB", func= lambda x: 1 - x)],
-            "emission": [NodeField(commonName= "emission")],
-            "emissionColor": [NodeField(commonName= "emissionColor")],
-            "emissionColorR": [NodeField(commonName= "emissionColorR")],
-            "emissionColorG": [NodeField(commonName= "emissionColorG")],
-            "emissionColorB": [NodeField(commonName= "emissionColorB")],
-            "normalCamera": [NodeField(commonName= "bumpNormal")],
-            "normalCameraX": [NodeField(commonName= "bumpNormalX")],
-            "normalCameraY": [NodeField(commonName= "bumpNormalY")],
-            "normalCameraZ": [NodeField(commonName= "bumpNormalZ")],
-            "opacity": [NodeField(commonName= "opacity")],
-            "opacityR": [NodeField(commonName= "opacityR")],
-            "opacityG": [NodeField(commonName= "opacityG")],
-            "opacityB": [NodeField(commonName= "opacityB")],
-            "aiEnableMatte": [NodeField(commonName= "userColorEnable")],
-            "aiMatteColor": [NodeField(commonName= "userColor")],
-            "aiMatteColorR": [NodeField(commonName= "userColorR")],
-            "aiMatteColorG": [NodeField(commonName= "userColorG")],
-            "aiMatteColorB": [NodeField(commonName= "userColorB")],
-            "aiMatteColorA": [NodeField(commonName= "userColorA")],
-            "outColor": [NodeField(commonName= "outColor")],
-            "outColorR": [NodeField(commonName= "outColorR")],
-            "outColorG": [NodeField(commonName= "outColorG")],
-            "outColorB": [NodeField(commonName= "outColorB")],
-            "outAlpha": [NodeField(commonName= "outAlpha")],
-            "outTransparency": [NodeField(commonName= "outTransparency")],
-            "outTransparencyR": [NodeField(commonName= "outTransparencyR")],
-            "outTransparencyG": [NodeField(commonName= "outTransparencyG")],
-            "outTransparencyB": [NodeField(commonName= "outTransparencyB")],
-            "caustics": [NodeField(commonName= "caustics")],
-            "transmissionDispersion": [NodeField(commonName= "transmissionDispersion")],
-            "transmitAovs": [NodeField(commonName= "transmitAovs")],
-            "transmissionDepth": [NodeField(commonName= "transmissionDepth")],
-            "thinFilmThickness": [NodeField(commonName= "thinFilmThickness")],
-            "thinFilmIOR": [NodeField(commonName= "thinFilmIOR")],
-            "internalReflections": [NodeField(commonName= "internalReflections")],
-            "exitToBackground": [NodeField(commonName= "exitToBackground")],
-            "dielectricPriority": [NodeField(commonName= "dielectricPriority")],
-            "indirectDiffuse": [NodeField(commonName= "indirectDiffuse")],
-            "indirectSpecular": [NodeField(commonName= "indirectSpecular")],
-        },
-        "file": {
-            "nodeTypeName": [NodeField(commonName= "textureFileNode")],
-            "caching": [NodeField(commonName= "caching")],
-            "frozen": [NodeField(commonName= "frozen")],
-            "isHistoricallyInteresting": [NodeField(commonName= "isHistoricallyInteresting")],
-            "nodeState": [NodeField(commonName= "nodeState")],
-            "fileTextureName": [NodeField(commonName= "filename")],
-            "colorOffset": [NodeField(commonName= "colorOffset")],
-            "colorOffsetR": [NodeField(commonName= "colorOffsetR")],
-            "colorOffsetG": [NodeField(commonName= "colorOffsetG")],
-            "colorOffsetB": [NodeField(commonName= "colorOffsetB")],
-            "outColor": [NodeField(commonName= "outColor")],
-            "outColorR": [NodeField(commonName= "outColorR")],
-            "outColorG": [NodeField(commonName= "outColorG")],
-            "outColorB": [NodeField(commonName= "outColorB")],
-            "colorSpace": [NodeField(commonName= "linearize", func= lambda x: True if x == "sRGB" else False), NodeField(commonName= "colorSpace")],
-            "uvTilingMode": [NodeField(commonName= "uvTilingMode", func = lambda x: 0 if x == 0 else 0 if x == 4 else 4-x)],
-            "colorGain": [NodeField(commonName= "colorGain")],
-            "colorGainR": [NodeField(commonName= "colorGainR")],
-            "colorGainG": [NodeField(commonName= "colorGainG")],
-            "colorGainB": [NodeField(commonName= "colorGainB")],
-            "invert": [NodeField(commonName= "invert")],
-        },
-        "aiNormalMap": {
-            "nodeTypeName": [NodeField(commonName= "normalMapper")],
-            "caching": [NodeField(commonName= "caching")],
-            "frozen": [NodeField(commonName= "frozen")],
-            "isHistoricallyInteresting": [NodeField(commonName= "isHistoricallyInteresting")],
-            "nodeState": [NodeField(commonName= "nodeState")],
-            "outValue": [NodeField(commonName= "outValue")],
-            "outValueX": [NodeField(commonName= "outValueX")],
-            "outValueY": [NodeField(commonName= "outValueY")],
-            "outValueZ": [NodeField(commonName= "outValueZ")],
-            "outTransparency": [NodeField(commonName= "outTransparency")],
-            "outTransparencyR": [NodeField(commonName= "outTransparencyR")],
-            "outTransparencyG": [NodeField(commonName= "outTransparencyG")],
-            "outTransparencyB": [NodeField(commonName= "outTransparencyB")],
-            "input": [NodeField(commonName= "input")],
-            "inputX": [NodeField(commonName= "inputX")],
-            "inputY": [NodeField(commonName= "inputY")],
-            "inputZ": [NodeField(commonName= "inputZ")],
-            "tangent": [NodeField(commonName= "tangent")],
-            "tangentX": [NodeField(commonName= "tangentX")],
-            "tangentY": [NodeField(commonName= "tangentY")],
-            "tangentZ": [NodeField(commonName= "tangentZ")],
-            "normal": [NodeField(commonName= "normal")],
-            "normalX": [NodeField(commonName= "normalX")],
-            "normalY": [NodeField(commonName= "normalY")],
-            "normalZ": [NodeField(commonName= "normalZ")],
-            "strength": [NodeField(commonName= "strength")],
-            "invertZ": [NodeField(commonName= "invertZ")],
-            "invertX": [NodeField(commonName= "invertX")],
-            "invertY": [NodeField(commonName= "invertY")],
-            "order": [NodeField(commonName= "order")],
-            "colorToSigned": [NodeField(commonName= "colorToSigned")],
-            "tangentSpace": [NodeField(commonName= "tangentSpace")],
-        }
-    },
-
-    # "Translating" common attribute names to Renderman specific ones
-    "COMMON_TO_RENDERMAN": {
-        "normalMapper":{
-            "nodeTypeName": "PxrNormalMap",
-            "caching": "caching",
-            "frozen": "frozen",
-            "isHistoricallyInteresting": "isHistoricallyInteresting",
-            "nodeState": "nodeState",
-            "outValue": "resultN",
-            "outValueX": "resultNX",
-            "outValueY": "resultNY",
-            "outValueZ": "resultNZ",
-            "resultNG": "resultNG",
-            "resultNGX": "resultNGX",
-            "resultNGY": "resultNGY",
-            "resultNGZ": "resultNGZ",
-            "input": "inputRGB",
-            "inputX": "inputRGBR",
-            "inputY": "inputRGBG",
-            "inputZ": "inputRGBB",
-            "filename": "filename",
-            "normal": "bumpOverlay",
-            "normalX": "bumpOverlayX",
-            "normalY": "bumpOverlayY",
-            "normalZ": "bumpOverlayZ",
-            "strength": "bumpScale",
-            "invertZ": "invertBump",
-            "invertX": "flipX",
-            "invertY": "flipY",
-            "orientation": "orientation",
-            "firstChannel": "firstChannel",
-            "atlasStyle": "atlasStyle",
-            "invertT": "invertT",
-            "blur": "blur",
-            "lerp": "lerp",
-            "filter": "filter",
-            "smoothRayDerivs": "smoothRayDerivs",
-            "manifold": "manifold",
-            "mipBias": "mipBias",
-            "maxResolution": "maxResolution",
-            "optimizeIndirect": "optimizeIndirect",
-            "reverse": "reverse",
-            "adjustAmount": "adjustAmount",
-            "surfaceNormalMix": "surfaceNormalMix",
-            "disable": "disable",
-        },
-        "textureFileNode": {
-            "nodeTypeName": "PxrTexture",
-            "caching": "caching",
-            "frozen": "frozen",
-            "isHistoricallyInteresting": "isHistoricallyInteresting",
-            "nodeState": "nodeState",
-            "filename": "filename",
-            "colorOffset": "colorOffset",
-            "colorOffsetR": "colorOffsetR",
-            "colorOffsetG": "colorOffsetG",
-            "colorOffsetB": "colorOffsetB",
-            "outColor": "resultRGB",
-            "outColorR": "resultR",
-            "outColorG": "resultG",
-            "outColorB": "resultB",
-            "linearize": "linearize",
-            "uvTilingMode": "atlasStyle",
-            "colorGain": "colorScale",
-            "colorGainR": "colorScaleR",
-            "colorGainG": "colorScaleG",
-            "colorGainB": "colorScaleB",
-            "resultR": "resultR",
-            "resultG": "resultG",
-            "resultB": "resultB",
-            "resultA": "resultA",
-            "invertT": "invertT",
-        },
-	"surfaceShader": {
-            "nodeTypeName": "PxrSurface",
-            "caching": "caching",
-            "frozen": "frozen",
-            "isHistoricallyInteresting": "isHistoricallyInteresting",
-            "nodeState": "nodeState",
-            "inputMaterial": "inputMaterial",
-            "diffuseGain": "diffuseGain",
-            "diffuseColor": "diffuseColor",
-            "diffuseColorR": "diffuseColorR",
-            "diffuseColorG": "diffuseColorG",
-            "diffuseColorB": "diffuseColorB",
-            "diffuseRoughness": "diffuseRoughness",
-            "diffuseExponent": "diffuseExponent",
-            "diffuseBumpNormal": "diffuseBumpNormal",
-            "diffuseBumpNormalX": "diffuseBumpNormalX",
-            "diffuseBumpNormalY": "diffuseBumpNormalY",
-            "diffuseBumpNormalZ": "diffuseBumpNormalZ",
-            "doubleSided": "diffuseDoubleSided",
-            "diffuseBackUseDiffuseColor": "diffuseBackUseDiffuseColor",
-            "diffuseBackColor": "diffuseBackColor",
-            "diffuseBackColorR": "diffuseBackColorR",
-            "diffuseBackColorG": "diffuseBackColorG",
-            "diffuseBackColorB": "diffuseBackColorB",
-            "diffuseTransmitGain": "diffuseTransmitGain",
-            "diffuseTransmitColor": "diffuseTransmitColor",
-            "diffuseTransmitColorR": "diffuseTransmitColorR",
-            "diffuseTransmitColorG": "diffuseTransmitColorG",
-            "diffuseTransmitColorB": "diffuseTransmitColorB",
-            "specularFresnelMode": "specularFresnelMode",
-            "specularFaceColor": "specularFaceColor",
-            "specularFaceColorR": "specularFaceColorR",
-            "specularFaceColorG": "specularFaceColorG",
-            "specularFaceColorB": "specularFaceColorB",
-            "specularEdgeColor": "specularEdgeColor",
-            "specularEdgeColorR": "specularEdgeColorR",
-            "specularEdgeColorG": "specularEdgeColorG",
-            "specularEdgeColorB": "specularEdgeColorB",
-            "specularFresnelShape": "specularFresnelShape",
-            "specularior": "specularIor",
-            "specularIorR": "specularIorR",
-            "specularIorG": "specularIorG",
-            "specularIorB": "specularIorB",
-            "specularExtinctionCoeff": "specularExtinctionCoeff",
-            "specularExtinctionCoeffR": "specularExtinctionCoeffR",
-            "specularExtinctionCoeffG": "specularExtinctionCoeffG",
-            "specularExtinctionCoeffB": "specularExtinctionCoeffB",
-            "specularRoughness": "specularRoughness",
-            "specularModelType": "specularModelType",
-            "specularAnisotropy": "specularAnisotropy",
-            "specularAnisotropyDirection": "specularAnisotropyDirection",
-            "specularAnisotropyDirectionX": "specularAnisotropyDirectionX",
-            "specularAnisotropyDirectionY": "specularAnisotropyDirectionY",
-            "specularAnisotropyDirectionZ": "specularAnisotropyDirectionZ",
-            "specularBumpNormal": "specularBumpNormal",
-            "specularBumpNormalX": "specularBumpNormalX",
-            "specularBumpNormalY": "specularBumpNormalY",
-            "specularBumpNormalZ": "specularBumpNormalZ",
-            "specularDoubleSided": "specularDoubleSided",
-            "roughSpecularFresnelMode": "roughSpecularFresnelMode",
-            "roughSpecularFaceColor": "roughSpecularFaceColor",
-            "roughSpecularFaceColorR": "roughSpecularFaceColorR",
-            "roughSpecularFaceColorG": "roughSpecularFaceColorG",
-            "roughSpecularFaceColorB": "roughSpecularFaceColorB",
-            "roughSpecularEdgeColor": "roughSpecularEdgeColor",
-            "roughSpecularEdgeColorR": "roughSpecularEdgeColorR",
-            "roughSpecularEdgeColorG": "roughSpecularEdgeColorG",
-            "roughSpecularEdgeColorB": "roughSpecularEdgeColorB",
-            "roughSpecularFresnelShape": "roughSpecularFresnelShape",
-            "roughSpecularIor": "roughSpecularIor",
-            "roughSpecularIorR": "roughSpecularIorR",
-            "roughSpecularIorG": "roughSpecularIorG",
-            "roughSpecularIorB": "roughSpecularIorB",
-            "roughSpecularExtinctionCoeff": "roughSpecularExtinctionCoeff",
-            "roughSpecularExtinctionCoeffR": "roughSpecularExtinctionCoeffR",
-            "roughSpecularExtinctionCoeffG": "roughSpecularExtinctionCoeffG",
-            "roughSpecularExtinctionCoeffB": "roughSpecularExtinctionCoeffB",
-            "roughSpecularRoughness": "roughSpecularRoughness",
-            "roughSpecularModelType": "roughSpecularModelType",
-            "roughSpecularAnisotropy": "roughSpecularAnisotropy",
-            "roughSpecularAnisotropyDirection": "roughSpecularAnisotropyDirection",
-            "roughSpecularAnisotropyDirectionX": "roughSpecularAnisotropyDirectionX",
-            "roughSpecularAnisotropyDirectionY": "roughSpecularAnisotropyDirectionY",
-            "roughSpecularAnisotropyDirectionZ": "roughSpecularAnisotropyDirectionZ",
-            "roughSpecularBumpNormal": "roughSpecularBumpNormal",
-            "roughSpecularBumpNormalX": "roughSpecularBumpNormalX",
-            "roughSpecularBumpNormalY": "roughSpecularBumpNormalY",
-            "roughSpecularBumpNormalZ": "roughSpecularBumpNormalZ",
-            "roughSpecularDoubleSided": "roughSpecularDoubleSided",
-            "clearcoatFresnelMode": "clearcoatFresnelMode",
-            "clearcoatFaceColor": "clearcoatFaceColor",
-            "clearcoatFaceColorR": "clearcoatFaceColorR",
-            "clearcoatFaceColorG": "clearcoatFaceColorG",
-            "clearcoatFaceColorB": "clearcoatFaceColorB",
-            "clearcoatEdgeColor": "clearcoatEdgeColor",
-            "clearcoatEdgeColorR": "clearcoatEdgeColorR",
-            "clearcoatEdgeColorG": "clearcoatEdgeColorG",
-            "clearcoatEdgeColorB": "clearcoatEdgeColorB",
-            "clearcoatFresnelShape": "clearcoatFresnelShape",
-            "clearcoatIor": "clearcoatIor",
-            "clearcoatIorR": "clearcoatIorR",
-            "clearcoatIorG": "clearcoatIorG",
-            "clearcoatIorB": "clearcoatIorB",
-            "clearcoatExtinctionCoeff": "clearcoatExtinctionCoeff",
-            "clearcoatExtinctionCoeffR": "clearcoatExtinctionCoeffR",
-            "clearcoatExtinctionCoeffG": "clearcoatExtinctionCoeffG",
-            "clearcoatExtinctionCoeffB": "clearcoatExtinctionCoeffB",
-            "clearcoatThickness": "clearcoatThickness",
-            "clearcoatAbsorptionTint": "clearcoatAbsorptionTint",
-            "clearcoatAbsorptionTintR": "clearcoatAbsorptionTintR",
-            "clearcoatAbsorptionTintG": "clearcoatAbsorptionTintG",
-            "clearcoatAbsorptionTintB": "clearcoatAbsorptionTintB",
-            "clearcoatRoughness": "clearcoatRoughness",
-            "clearcoatModelType": "clearcoatModelType",
-            "clearcoatAnisotropy": "clearcoatAnisotropy",
-            "clearcoatAnisotropyDirection": "clearcoatAnisotropyDirection",
-            "clearcoatAnisotropyDirectionX": "clearcoatAnisotropyDirectionX",
-            "clearcoatAnisotropyDirectionY": "clearcoatAnisotropyDirectionY",
-            "clearcoatAnisotropyDirectionZ": "clearcoatAnisotropyDirectionZ",
-            "clearcoatBumpNormal": "clearcoatBumpNormal",
-            "clearcoatBumpNormalX": "clearcoatBumpNormalX",
-            "clearcoatBumpNormalY": "clearcoatBumpNormalY",
-            "clearcoatBumpNormalZ": "clearcoatBumpNormalZ",
-            "clearcoatDoubleSided": "clearcoatDoubleSided",
-            "specularEnergyCompensation": "specularEnergyCompensation",
-            "clearcoatEnergyCompensation": "clearcoatEnergyCompensation",
-            "iridescenceFaceGain": "iridescenceFaceGain",
-            "iridescenceEdgeGain": "iridescenceEdgeGain",
-            "iridescenceFresnelShape": "iridescenceFresnelShape",
-            "iridescenceMode": "iridescenceMode",
-            "iridescencePrimaryColor": "iridescencePrimaryColor",
-            "iridescencePrimaryColorR": "iridescencePrimaryColorR",
-            "iridescencePrimaryColorG": "iridescencePrimaryColorG",
-            "iridescencePrimaryColorB": "iridescencePrimaryColorB",
-            "iridescenceSecondaryColor": "iridescenceSecondaryColor",
-            "iridescenceSecondaryColorR": "iridescenceSecondaryColorR",
-            "iridescenceSecondaryColorG": "iridescenceSecondaryColorG",
-            "iridescenceSecondaryColorB": "iridescenceSecondaryColorB",
-            "iridescenceRoughness": "iridescenceRoughness",
-            "iridescenceAnisotropy": "iridescenceAnisotropy",
-            "iridescenceAnisotropyDirection": "iridescenceAnisotropyDirection",
-            "iridescenceAnisotropyDirectionX": "iridescenceAnisotropyDirectionX",
-            "iridescenceAnisotropyDirectionY": "iridescenceAnisotropyDirectionY",
-            "iridescenceAnisotropyDirectionZ": "iridescenceAnisotropyDirectionZ",
-            "iridescenceBumpNormal": "iridescenceBumpNormal",
-            "iridescenceBumpNormalX": "iridescenceBumpNormalX",
-            "iridescenceBumpNormalY": "iridescenceBumpNormalY",
-            "iridescenceBumpNormalZ": "iridescenceBumpNormalZ",
-            "iridescenceCurve": "iridescenceCurve",
-            "iridescenceScale": "iridescenceScale",
-            "iridescenceFlip": "iridescenceFlip",
-            "iridescenceThickness": "iridescenceThickness",
-            "iridescenceDoubleSided": "iridescenceDoubleSided",
-            "sheen": "fuzzGain",
-            "sheenColor": "fuzzColor",
-            "sheenColorR": "fuzzColorR",
-            "sheenColorG": "fuzzColorG",
-            "sheenColorB": "fuzzColorB",
-            "sheenRoughness": "fuzzConeAngle",
-            "fuzzBumpNormal": "fuzzBumpNormal",
-            "fuzzBumpNormalX": "fuzzBumpNormalX",
-            "fuzzBumpNormalY": "fuzzBumpNormalY",
-            "fuzzBumpNormalZ": "fuzzBumpNormalZ",
-            "fuzzDoubleSided": "fuzzDoubleSided",
-            "subsurfaceType": "subsurfaceType",
-            "subsurfaceGain": "subsurfaceGain",
-            "subsurfaceColor": "subsurfaceColor",
-            "subsurfaceColorR": "subsurfaceColorR",
-            "subsurfaceColorG": "subsurfaceColorG",
-            "subsurfaceColorB": "subsurfaceColorB",
-            "subsurfaceScale": "subsurfaceDmfp",
-            "subsurfaceRadius": "subsurfaceDmfpColor",
-            "subsurfaceRadiusR": "subsurfaceDmfpColorR",
-            "subsurfaceRadiusG": "subsurfaceDmfpColorG",
-            "subsurfaceRadiusB": "subsurfaceDmfpColorB",
-            "shortSubsurfaceGain": "shortSubsurfaceGain",
-            "shortSubsurfaceColor": "shortSubsurfaceColor",
-            "shortSubsurfaceColorR": "shortSubsurfaceColorR",
-            "shortSubsurfaceColorG": "shortSubsurfaceColorG",
-            "shortSubsurfaceColorB": "shortSubsurfaceColorB",
-            "shortSubsurfaceDmfp": "shortSubsurfaceDmfp",
-            "longSubsurfaceGain": "longSubsurfaceGain",
-            "longSubsurfaceColor": "longSubsurfaceColor",
-            "longSubsurfaceColorR": "longSubsurfaceColorR",
-            "longSubsurfaceColorG": "longSubsurfaceColorG",
-            "longSubsurfaceColorB": "longSubsurfaceColorB",
-            "longSubsurfaceDmfp": "longSubsurfaceDmfp",
-            "subsurfaceDirectionality": "subsurfaceDirectionality",
-            "subsurfaceBleed": "subsurfaceBleed",
-            "subsurfaceDiffuseBlend": "subsurfaceDiffuseBlend",
-            "subsurfaceResolveSelfIntersections": "subsurfaceResolveSelfIntersections",
-            "subsurfaceIor": "subsurfaceIor",
-            "subsurfacePostTint": "subsurfacePostTint",
-            "subsurfacePostTintR": "subsurfacePostTintR",
-            "subsurfacePostTintG": "subsurfacePostTintG",
-            "subsurfacePostTintB": "subsurfacePostTintB",
-            "subsurfaceDiffuseSwitch": "subsurfaceDiffuseSwitch",
-            "subsurfaceDoubleSided": "subsurfaceDoubleSided",
-            "subsurfaceTransmitGain": "subsurfaceTransmitGain",
-            "considerBackside": "considerBackside",
-            "continuationRayMode": "continuationRayMode",
-            "maxContinuationHits": "maxContinuationHits",
-            "followTopology": "followTopology",
-            "subsurfaceSubset": "subsurfaceSubset",
-            "singlescatterGain": "singlescatterGain",
-            "singlescatterColor": "singlescatterColor",
-            "singlescatterColorR": "singlescatterColorR",
-            "singlescatterColorG": "singlescatterColorG",
-            "singlescatterColorB": "singlescatterColorB",
-            "singlescatterMfp": "singlescatterMfp",
-            "singlescatterMfpColor": "singlescatterMfpColor",
-            "singlescatterMfpColorR": "singlescatterMfpColorR",
-            "singlescatterMfpColorG": "singlescatterMfpColorG",
-            "singlescatterMfpColorB": "singlescatterMfpColorB",
-            "singlescatterDirectionality": "singlescatterDirectionality",
-            "singlescatterIor": "singlescatterIor",
-            "singlescatterBlur": "singlescatterBlur",
-            "singlescatterDirectGain": "singlescatterDirectGain",
-            "singlescatterDirectGainTint": "singlescatterDirectGainTint",
-            "singlescatterDirectGainTintR": "singlescatterDirectGainTintR",
-            "singlescatterDirectGainTintG": "singlescatterDirectGainTintG",
-            "singlescatterDirectGainTintB": "singlescatterDirectGainTintB",
-            "singlescatterDoubleSided": "singlescatterDoubleSided",
-            "singlescatterConsiderBackside": "singlescatterConsiderBackside",
-            "singlescatterContinuationRayMode": "singlescatterContinuationRayMode",
-            "singlescatterMaxContinuationHits": "singlescatterMaxContinuationHits",
-            "singlescatterDirectGainMode": "singlescatterDirectGainMode",
-            "singlescatterSubset": "singlescatterSubset",
-            "irradianceTint": "irradianceTint",
-            "irradianceTintR": "irradianceTintR",
-            "irradianceTintG": "irradianceTintG",
-            "irradianceTintB": "irradianceTintB",
-            "irradianceRoughness": "irradianceRoughness",
-            "unitLength": "unitLength",
-            "refractionGain": "refractionGain",
-            "reflectionGain": "reflectionGain",
-            "refractionColor": "refractionColor",
-            "refractionColorR": "refractionColorR",
-            "refractionColorG": "refractionColorG",
-            "refractionColorB": "refractionColorB",
-            "glassRoughness": "glassRoughness",
-            "glassRefractionRoughness": "glassRefractionRoughness",
-            "glassRefraction2Roughness": "glassRefraction2Roughness",
-            "glassRefraction2Blend": "glassRefraction2Blend",
-            "glassRefraction2Tint": "glassRefraction2Tint",
-            "glassRefraction2TintR": "glassRefraction2TintR",
-            "glassRefraction2TintG": "glassRefraction2TintG",
-            "glassRefraction2TintB": "glassRefraction2TintB",
-            "glassAnisotropy": "glassAnisotropy",
-            "glassAnisotropyDirection": "glassAnisotropyDirection",
-            "glassAnisotropyDirectionX": "glassAnisotropyDirectionX",
-            "glassAnisotropyDirectionY": "glassAnisotropyDirectionY",
-            "glassAnisotropyDirectionZ": "glassAnisotropyDirectionZ",
-            "glassBumpNormal": "glassBumpNormal",
-            "glassBumpNormalX": "glassBumpNormalX",
-            "glassBumpNormalY": "glassBumpNormalY",
-            "glassBumpNormalZ": "glassBumpNormalZ",
-            "glassIor": "glassIor",
-            "mwWalkable": "mwWalkable",
-            "mwIor": "mwIor",
-            "thinGlass": "thinGlass",
-            "ignoreFresnel": "ignoreFresnel",
-            "ignoreAccumOpacity": "ignoreAccumOpacity",
-            "blocksVolumes": "blocksVolumes",
-            "volumeAggregate": "volumeAggregate",
-            "volumeAggregateName": "volumeAggregateName",
-            "ssAlbedo": "ssAlbedo",
-            "ssAlbedoR": "ssAlbedoR",
-            "ssAlbedoG": "ssAlbedoG",
-            "ssAlbedoB": "ssAlbedoB",
-            "extinction": "extinction",
-            "extinctionR": "extinctionR",
-            "extinctionG": "extinctionG",
-            "extinctionB": "extinctionB",
-            "g": "g",
-            "g1": "g1",
-            "blend": "blend",
-            "volumeGlow": "volumeGlow",
-            "volumeGlowR": "volumeGlowR",
-            "volumeGlowG": "volumeGlowG",
-            "volumeGlowB": "volumeGlowB",
-            "maxExtinction": "maxExtinction",
-            "multiScatter": "multiScatter",
-            "enableOverlappingVolumes": "enableOverlappingVolumes",
-            "emission": "glowGain",
-            "emissionColor": "glowColor",
-            "emissionColorR": "glowColorR",
-            "emissionColorG": "glowColorG",
-            "emissionColorB": "glowColorB",
-            "bumpNormal": "bumpNormal",
-            "bumpNormalX": "bumpNormalX",
-            "bumpNormalY": "bumpNormalY",
-            "bumpNormalZ": "bumpNormalZ",
-            "shadowBumpTerminator": "shadowBumpTerminator",
-            "shadowColor": "shadowColor",
-            "shadowColorR": "shadowColorR",
-            "shadowColorG": "shadowColorG",
-            "shadowColorB": "shadowColorB",
-            "shadowMode": "shadowMode",
-            "opacity": "presence",
-            "presenceCached": "presenceCached",
-            "mwStartable": "mwStartable",
-            "roughnessMollificationClamp": "roughnessMollificationClamp",
-            "userColor": "userColor",
-            "userColorR": "userColorR",
-            "userColorG": "userColorG",
-            "userColorB": "userColorB",
-            "utilityPattern": "utilityPattern",
-            "outColor": "outColor",
-            "outColorR": "outColorR",
-            "outColorG": "outColorG",
-            "outColorB": "outColorB",
-            "outGlowColor": "outGlowColor",
-            "outGlowColorR": "outGlowColorR",
-            "outGlowColorG": "outGlowColorG",
-            "outGlowColorB": "outGlowColorB",
-            "outMatteOpacity": "outMatteOpacity",
-            "outMatteOpacityR": "outMatteOpacityR",
-            "outMatteOpacityG": "outMatteOpacityG",
-            "outMatteOpacityB": "outMatteOpacityB",
-            "outTransparency": "outTransparency",
-            "outTransparencyR": "outTransparencyR",
-            "outTransparencyG": "outTransparencyG",
-            "outTransparencyB": "outTransparencyB",
-            "attributeAliasList": "attributeAliasList",
-	}
-    },
+# Attribute types that cmd.getAttr returns as a single [(x, y, z)] value, so their children can be taken from the parent's value
+NUMERICCOMPOUNDTYPES = ["float2", "float3", "double2", "double3", "long2", "long3", "short2", "short3"]
+
+# Shading group attributes that the networks of the materials are connected to, see getSceneRoots
+SHADINGGROUPPLUGS = ["surfaceShader", "volumeShader", "displacementShader"]
+
+# The record of the previous conversion (see ConversionMap) is stored in this string attribute of a network node
+CONVERSIONMAPATTR = "conversionMap"
+CONVERSIONMAPFORMATVERSION = 1
+
+# Converted values that are this close to the default of the attribute they'd be written to are not written
+FLOATTOLERANCE = 1e-6
+
+# Maya plugins of the render engines. Their versions key the schema snapshots, see getNodeSchema
+ENGINEPLUGINS = {
+    "Arnold": "mtoa",
+    "RenderMan": "RenderMan_for_Maya"
+}
+
+# Attribute that holds the image path of the engines' texture nodes, see TexturePreparation
+# Key: engine
+# Value: {node type: attribute}
+TEXTUREATTRS = {
+    "Arnold": {"file": "fileTextureName", "aiImage": "filename"},
+    "RenderMan": {"PxrTexture": "filename"}
 }
 
+# UV tile tokens of texture paths, see TextureResolver.getTilePattern
+# Key: token, as it's written between < and > in the path
+# Value: regular expression of its value, with a group for every tile number in it: udim, or u and v (0 based), or U and V (1 based)
+TEXTURETILETOKENS = {
+    "UDIM": r"(?P<udim>\d{4})",
+    "udim": r"(?P<udim>\d{4})",
+    "UVTILE": r"u(?P<U>\d+)_v(?P<V>\d+)",
+    "u": r"(?P<u>\d+)",
+    "v": r"(?P<v>\d+)",
+    "U": r"(?P<U>\d+)",
+    "V": r"(?P<V>\d+)",
+}
+
+# Content hashes of the source textures are kept in this file of TexturePreparation's cache folder
+TEXTUREINDEXFILE = "textureIndex.json"
+TEXTUREINDEXFORMATVERSION = 1
+TEXTUREHASHCHUNKSIZE = 1 << 20 # bytes hashed at a time
+
+# Directory of the on-disk schema snapshots (one JSON file per engine and plugin version). None keeps schemas in memory only.
+SCHEMASNAPSHOTDIR: str | None = None
+SCHEMAFORMATVERSION = 1
+
+# Captured NodeSchemas, see getNodeSchema
+# Key: engine
+# Value: dict of NodeSchemas keyed by node type
+nodeSchemaCache: dict[str, dict[str, NodeSchema]] = {}
+
+# Directory listings of texture folders, kept for the whole session. Call textureResolver.clear() to see files added since.
+textureResolver = TextureResolver()
+
+# Compiled ConversionRoutes, see getConversionRoute
+# Key: (fromEngine, toEngine)
+# Value: dict of ConversionRoutes keyed by fromEngine node type
+conversionRouteCache: dict[tuple[str, str], dict[str, ConversionRoute]] = {}
+
+# Compiled ConversionPlans, see getConversionPlan
+# Key: (fromEngine, toEngine, node type)
+# Value: ConversionPlan, or None if the node type cannot be converted
+conversionPlanCache: dict[tuple[str, str, str], ConversionPlan | None] = {}
+
 ### }}}
 
+def setBackend(backend) -> object:
+    '''
+    Makes every command of the converter go through the given backend (see cmd). Returns the previous backend, to restore it with.
+    '''
+
+    global cmd
+    previous = cmd
+    cmd = backend
+
+    return previous
+
+
+def readConversionTableFile(path: str) -> dict:
+    '''
+    Reads a conversion table file: {"formatVersion": 1, "direction": ..., "nodeTypes": {node type: {attribute: ...}}}
+    - "toCommon" tables (<ENGINE>_TO_COMMON) map every attribute of the engine's node types to one or more common attribute names,
+      each one either a plain name or {"commonName": ..., "transform": [name, *arguments]} (see FieldTransform).
+      Returns them as lists of NodeFields.
+    - "fromCommon" tables (COMMON_TO_<ENGINE>) map every common attribute name of a common node type to the engine's attribute name,
+      either a plain name or {"attr": ..., "transform": [name, *arguments]}. The latter are returned as TargetFields.
+    The "nodeTypeName" entry of a node type holds the common node type name ("toCommon") or the engine's node type ("fromCommon").
+    '''
+
+    with open(path, "r", encoding= "utf-8") as f:
+        data = json.load(f)
+
+    if data.get("formatVersion") != CONVERSIONTABLEFORMATVERSION:
+        raise ValueError(f"{path} has format version {data.get('formatVersion')}, expected {CONVERSIONTABLEFORMATVERSION}")
+
+    if data.get("direction") == "fromCommon":
+        return {commonType: {commonName: TargetField(attr= field["attr"], func= FieldTransform(*field["transform"])) if isinstance(field, dict) else field for commonName, field in fields.items()} for commonType, fields in data["nodeTypes"].items()}
+    if data.get("direction") != "toCommon":
+        raise ValueError(f"{path} has an unknown direction: {data.get('direction')}")
+
+    table: dict[str, dict[str, list[NodeField]]] = {}
+    for nodeType, attributes in data["nodeTypes"].items():
+        table[nodeType] = {}
+        for attr, fields in attributes.items():
+            nodeFields = []
+            for field in (fields if isinstance(fields, list) else [fields]):
+                if isinstance(field, str):
+                    nodeFields.append(NodeField(commonName= field))
+                else:
+                    transform = field.get("transform")
+                    nodeFields.append(NodeField(commonName= field["commonName"], func= FieldTransform(*transform) if transform != None else None))
+            table[nodeType][attr] = nodeFields
+
+    return table
+
+
+def getConversionTableDir() -> str:
+    '''
+    Returns CONVERSIONTABLEDIR, or raises a FileNotFoundError naming where the conversions folder was expected if it's not there.
+    '''
+
+    if CONVERSIONTABLEDIR == None:
+        raise FileNotFoundError('! Node converter: The conversions folder can\'t be found, the script wasn\'t run from a file (e.g. it was pasted into the Script Editor).'
+                                ' Put MtoA_to_MtoRM.py and the conversions folder into a script folder and import it (see Usage), or set CONVERSIONTABLEDIR to the conversions folder.')
+    if not os.path.isdir(CONVERSIONTABLEDIR):
+        raise FileNotFoundError(f'! Node converter: The conversions folder was not found, expected it at "{CONVERSIONTABLEDIR}". Keep it next to MtoA_to_MtoRM.py.')
+    return CONVERSIONTABLEDIR
+
+
+def loadConversionTable(tableName: str) -> dict:
+    '''
+    Returns the conversion table of the given name from CONVERSIONTABLEDIR. Raises a FileNotFoundError naming the expected path if there is no such table.
+    The parsed table is pickled into the __pycache__ folder next to the table file, and read from there as long as the file
+    hasn't been modified since. Read-only installs just parse the file in every session.
+    '''
+
+    path = os.path.join(getConversionTableDir(), f"{tableName}.json")
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise FileNotFoundError(f'! Node converter: The conversion table {tableName} was not found, expected it at "{path}".') from None
+
+    cacheKey = [CONVERSIONCACHEFORMATVERSION, CONVERSIONTABLEFORMATVERSION, stat.st_mtime_ns, stat.st_size]
+    cachePath = os.path.join(CONVERSIONTABLEDIR, "__pycache__", f"{tableName}.pickle")
+    try:
+        with open(cachePath, "rb") as f:
+            cached = pickle.load(f)
+        if cached[0] == cacheKey:
+            return cached[1]
+    except Exception: # no cache yet, or one that can't be read anymore
+        pass
+
+    table = readConversionTableFile(path)
+
+    tempPath = f"{cachePath}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cachePath), exist_ok= True)
+        with open(tempPath, "wb") as f:
+            pickle.dump([cacheKey, table], f, protocol= pickle.HIGHEST_PROTOCOL)
+        os.replace(tempPath, cachePath) # never leaving a half written cache behind for other sessions
+    except (OSError, pickle.PicklingError): # read-only installs, or a script that wasn't imported (its classes can't be pickled)
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+
+    return table
+
+
+def runSteps(steps):
+    '''
+    Runs the given conversion steps (e.g. iterConvertNodeTree) to the end, all at once. Returns what they return.
+    '''
+
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def timePhase(name: str):
+    '''
+    Returns a context manager that records the time spent in it as the given phase of the active Instrumentation,
+    or one that does nothing if there is no active Instrumentation.
+    '''
+
+    if Instrumentation.active == None:
+        return NOPHASETIMER
+    return PhaseTimer(Instrumentation.active, name)
+
+
 def getSelected() -> list[Node]:
     '''
     Returns the selected nodes formatted into the Node class w/o input and output connections data.
@@ -660,322 +1766,1214 @@ def getSelected() -> list[Node]:
 
     return sNodes
 
-def populateInConnectionsData(node: Node) -> Node:
+def splitPlug(plug: str) -> tuple[str, str]:
     '''
-    Returns the given node with outgoing connection data populated
-    Duh, I know. ...
+    Returns the node and the attribute name of the given plug (e.g.: "file1.outColor" -> ("file1", "outColor")).
     '''
 
-    incomingConnections: list[list[str]] = []
+    nodeName, _, attr = plug.partition(".")
+    return nodeName, attr
 
-    inConTemp = cmd.listConnections(node.name, c = True, s = True, d = False, fnn = True, plugs = True)
-    if inConTemp != None:
-        for i in range(0, len(inConTemp), 2):
-            if cmd.nodeType(inConTemp[i+1]) not in STOPCRAWLINGTYPES:
-                incomingConnections.append([inConTemp[i], inConTemp[i+1]]) #every first inConTemp value will always be the current node and every second it's connection
 
-        if len(incomingConnections) != 0:
-            node.inCon = incomingConnections
+def getNodeTypes(nodeNames: list[str]) -> dict[str, str]:
+    '''
+    Returns the node types of the given nodes, resolved in bulk with a single cmd.ls call.
+    - Key: node name
+    - Value: node type
+    '''
+
+    if len(nodeNames) == 0:
+        return {}
 
-    return node
+    lsTemp = cmd.ls(nodeNames, long=True, showType=True)
+    if lsTemp == None:
+        return {}
 
+    return {lsTemp[i]: lsTemp[i+1] for i in range(0, len(lsTemp), 2)} # every first lsTemp value is a node name and every second its type
 
-def populateOutConnectionsData(node: Node) -> Node:
+
+def populateConnectionsData(frontier: list[Node], upstream: bool, nodeTypes: dict[str, str]) -> list[Node]:
     '''
-    Returns the given node with incoming and outgoing connection data populated
-    Duh, I know. ...
+    Returns the given frontier with incoming (upstream = True) or outgoing (upstream = False) connection data populated.
+    The whole frontier is queried with a single cmd.listConnections call, and the types of the connected nodes that
+    aren't in nodeTypes yet get resolved with a single getNodeTypes call and added to it.
     '''
 
-    outgoingConnections: list[list[str]] = []
+    if len(frontier) == 0:
+        return frontier
+
+    frontierByName: dict[str, Node] = {}
+    for node in frontier:
+        frontierByName[node.name] = node
+        frontierByName.setdefault(node.name.split("|")[-1], node) # listConnections reports the node's own side of a connection with its short name
+
+    conTemp = cmd.listConnections([node.name for node in frontier], c = True, s = upstream, d = not upstream, fnn = True, plugs = True)
+    if conTemp == None:
+        return frontier
+
+    # {{{ resolving the types of every newly found node at once
+    unknownNames: dict[str, None] = {} # the names in the order they were found, without repeats
+    for i in range(1, len(conTemp), 2):
+        nodeName = conTemp[i].split(".")[0]
+        if nodeName not in nodeTypes:
+            unknownNames[nodeName] = None
+    nodeTypes.update(getNodeTypes(list(unknownNames)))
+    for nodeName in unknownNames:
+        if nodeName not in nodeTypes: # cmd.ls might report a node under a different path than listConnections did
+            nodeTypes[nodeName] = cmd.nodeType(nodeName)
+    # }}}
 
-    outConTemp = cmd.listConnections(node.name, c = True, s = False, d = True, fnn = True, plugs = True)
+    connections: dict[str, list[list[str]]] = {}
+    # ^ Key: name of the frontier node
+    # ^ Value: its connections
 
-    if outConTemp != None:
-        for i in range(0, len(outConTemp), 2):
-            if cmd.nodeType(outConTemp[i+1]) not in STOPCRAWLINGTYPES:
-                outgoingConnections.append([outConTemp[i], outConTemp[i+1]]) #every first outConTemp value will always be the current node and every second it's connection
+    for i in range(0, len(conTemp), 2): # every first conTemp value is a frontier node's plug and every second it's connection
+        node = frontierByName.get(conTemp[i].split(".")[0])
+        if node != None and nodeTypes.get(conTemp[i+1].split(".")[0]) not in STOPCRAWLINGTYPES:
+            connections.setdefault(node.name, []).append([conTemp[i], conTemp[i+1]])
 
-        if len(outgoingConnections) != 0:
-            node.outCon = outgoingConnections
+    for node in frontier:
+        if node.name in connections:
+            if upstream:
+                node.inCon = connections[node.name]
+            else:
+                node.outCon = connections[node.name]
 
-    return node
+    return frontier
 
 
-def mapInConnections(nodeConnection: list[str], nodes: list[Node]) -> list[Node]:
+def getSceneRoots(fromEngine: str, shadingGroups: list[str] | None = None) -> list[Node]:
     '''
-    Returns the given list[Node] extended with all the nodes (incoming) connected to nodeConnection.
+    Returns the nodes that scene-wide conversions start crawling from:
+    every node of the scene that fromEngine has a conversion dict for,
+    or, if shadingGroups is given, the nodes connected to the shader plugs (see SHADINGGROUPPLUGS) of those shading groups.
     '''
 
-    nodeName = nodeConnection[1].split(".")[0]
-    node = Node(name= nodeName, nType= cmd.nodeType(nodeName))
-    node = populateInConnectionsData(node)
-    nodes.append(node)
+    if shadingGroups == None:
+        lsTemp = cmd.ls(type= list(ENGINECONVERSIONS.get(FROMENGINES.get(fromEngine), {}).keys()), long= True, showType= True)
+    else:
+        plugs = [f"{sg}.{plug}" for sg in shadingGroups for plug in SHADINGGROUPPLUGS]
+        shaders = cmd.listConnections(plugs, s = True, d = False, fnn = True) if len(plugs) != 0 else None
+        lsTemp = cmd.ls(list(dict.fromkeys(shaders)), long= True, showType= True) if shaders != None else None
 
+    if lsTemp == None:
+        return []
 
-    if node.inCon != None:
-        for x in node.inCon:
-            mapInConnections(x, nodes)
+    return [Node(name= lsTemp[i], nType= lsTemp[i+1]) for i in range(0, len(lsTemp), 2)] # every first lsTemp value is a node name and every second its type
 
-    return nodes
 
-def mapOutConnections(nodeConnection: list[str], nodes: list[Node]) -> list[Node]:
+def crawlNodeTree(sNodes: list[Node], downstream: bool = True) -> NodeGraph:
     '''
-    Returns the given list[Node] extended with all the nodes (outgoing) connected to nodeConnection.
+    Returns a NodeGraph of the node trees that the selected nodes are a part of, see iterCrawlNodeTree.
     '''
+    return runSteps(iterCrawlNodeTree(sNodes, downstream))
 
-    nodeName = nodeConnection[1].split(".")[0]
-    node = Node(name= nodeName, nType= cmd.nodeType(nodeName))
-    node = populateOutConnectionsData(node)
-    nodes.append(node)
 
+def iterCrawlNodeTree(sNodes: list[Node], downstream: bool = True):
+    '''
+    Crawls the node trees that the selected nodes are a part of, one level of them in one direction per step (see ConversionScheduler).
+    Returns a NodeGraph of them.
+    The crawl is iterative and keyed by node name, so every node is visited once per direction, shared upstream nodes
+    end up in the graph only once and cycles can't send it into an endless loop.
+    It expands a whole level of the network at a time, so the number of Maya calls grows with the depth of the network,
+    not with the number of nodes in it.
+    - sNodes = selected nodes
+    - downstream = whether outgoing connections of the selected nodes get followed too, not just the incoming ones
+    '''
+
+    graph = NodeGraph()
+
+    nodeTypes: dict[str, str] = {}
+    # ^ Key: node name
+    # ^ Value: node type
+
+    crawled: set[tuple[str, bool]] = set()
+    # ^ (node name, upstream) pairs that have already been crawled
+
+    frontiers: dict[bool, list[Node]] = {True: [], False: []}
+    # ^ Key: upstream. True means incoming connections get followed, False means outgoing ones.
+    # ^ Value: the nodes of the current level that are waiting to be crawled in that direction
+
+    # {{{ the selected nodes get crawled in both directions (unless downstream is False)
+    for sNode in sNodes:
+        if sNode.name not in graph:
+            graph.addNode(sNode)
+            nodeTypes[sNode.name] = sNode.nType
+            frontiers[True].append(sNode)
+            if downstream:
+                frontiers[False].append(sNode)
+    # }}}
 
-    if node.outCon != None:
-        for x in node.outCon:
-            mapOutConnections(x, nodes)
+    while len(frontiers[True]) != 0 or len(frontiers[False]) != 0:
+        nextFrontiers: dict[bool, list[Node]] = {True: [], False: []}
 
-    return nodes
+        for upstream, frontier in frontiers.items():
+            for node in frontier:
+                crawled.add((node.name, upstream))
 
-def crawlNodeTree(sNodes: list[Node]):
+            populateConnectionsData(frontier, upstream, nodeTypes)
+
+            for node in frontier:
+                connections = node.inCon if upstream else node.outCon
+                if connections == None:
+                    continue
+
+                for x in connections:
+                    nodeName = splitPlug(x[1])[0]
+                    selfPlug = f"{node.name}.{splitPlug(x[0])[1]}"
+                    if upstream:
+                        graph.addEdge(x[1], selfPlug)
+                    else:
+                        graph.addEdge(selfPlug, x[1])
+
+                    if nodeName not in graph:
+                        graph.addNode(Node(name= nodeName, nType= nodeTypes[nodeName]))
+                    if (nodeName, upstream) not in crawled:
+                        crawled.add((nodeName, upstream))
+                        nextFrontiers[upstream].append(graph.nodes[nodeName])
+
+            yield ("crawl", len(graph.nodes), None)
+
+        frontiers = nextFrontiers
+
+    return graph
+
+
+def getAttributeKind(attrType: str | None) -> str:
     '''
-    Returns maps of the node trees that the selected nodes are a part of.
-    - sNodes = selected nodes
+    Returns which group of the SETTERS table the given attribute type belongs to: "compound", "string", "bool", "enum" or "scalar".
     '''
-    
 
-    # {{{ Looking for incoming and outgoing connections and assigning them to their respective sNode item
-    for i in range(0, len(sNodes)):
-        sNodes[i] = populateInConnectionsData(sNodes[i])
-        sNodes[i] = populateOutConnectionsData(sNodes[i])
-    # }}}
+    if attrType in NUMERICCOMPOUNDTYPES:
+        return "compound"
+    if attrType in ("string", "bool", "enum"):
+        return attrType
+    return "scalar"
+
+
+# {{{ setters: every one of them writes a value with exactly one cmd.setAttr call
+def setScalarValue(plug: str, nodeFieldData, nodeFieldDataType: str):
+    cmd.setAttr(plug, nodeFieldData)
+
+def setCompoundValue(plug: str, nodeFieldData, nodeFieldDataType: str):
+    # Maya has it's own type for vectors and such so we have to pass them not as a list/tuple but individual values. Weird flex, but ok..
+    cmd.setAttr(plug, *nodeFieldData, typ= nodeFieldDataType)
+
+def setBroadcastValue(plug: str, nodeFieldData, nodeFieldDataType: str):
+    # fromEngine only has a single value where toEngine needs a compound, so it goes to all elements of it
+    cmd.setAttr(plug, *([nodeFieldData] * int(nodeFieldDataType[-1])), typ= nodeFieldDataType)
+
+def setFirstComponentValue(plug: str, nodeFieldData, nodeFieldDataType: str):
+    # fromEngine has a compound where toEngine only has a single value
+    cmd.setAttr(plug, nodeFieldData[0])
+
+def setStringValue(plug: str, nodeFieldData, nodeFieldDataType: str):
+    cmd.setAttr(plug, nodeFieldData, typ= "string")
+
+def setBoolValue(plug: str, nodeFieldData, nodeFieldDataType: str):
+    cmd.setAttr(plug, bool(nodeFieldData))
+
+def setEnumValue(plug: str, nodeFieldData, nodeFieldDataType: str):
+    cmd.setAttr(plug, int(nodeFieldData))
+# }}}
+
+# Setter of a field, selected by the kinds (see getAttributeKind) of its fromEngine and toEngine attributes
+# Key: (fromEngine kind, toEngine kind)
+# Value: setter
+SETTERS = {
+    ("compound", "compound"): setCompoundValue,
+    ("scalar", "compound"): setBroadcastValue,
+    ("bool", "compound"): setBroadcastValue,
+    ("enum", "compound"): setBroadcastValue,
+    ("compound", "scalar"): setFirstComponentValue,
+    ("compound", "bool"): setFirstComponentValue,
+    ("compound", "enum"): setFirstComponentValue,
+}
+
+# Setter of a field whose kinds have no entry in SETTERS, selected by the kind of its toEngine attribute
+TARGETSETTERS = {
+    "compound": setCompoundValue,
+    "string": setStringValue,
+    "bool": setBoolValue,
+    "enum": setEnumValue,
+    "scalar": setScalarValue,
+}
 
 
+def selectSetter(oldNodeFieldDataType: str | None, nodeFieldDataType: str) -> Callable:
+    '''
+    Returns the setter that writes a value read from an attribute of type oldNodeFieldDataType to an attribute of type nodeFieldDataType.
+    '''
 
-    nodes: list[Node] = sNodes
-    for i in range(0, len(sNodes)):
-        if sNodes[i] != None:
-            if sNodes[i].inCon != None:
-                for x in sNodes[i].inCon:
-                    mapInConnections(x, nodes)
-            if sNodes[i].outCon != None:
-                for x in sNodes[i].outCon:
-                    mapOutConnections(x, nodes)
+    targetKind = getAttributeKind(nodeFieldDataType)
+    return SETTERS.get((getAttributeKind(oldNodeFieldDataType), targetKind), TARGETSETTERS[targetKind])
 
 
-    return nodes
+def getTargetField(field: str | TargetField) -> tuple[str, Callable | None]:
+    '''
+    Returns the attribute name and the transform (None if there's none) of an entry of a COMMON_TO_<ENGINE> table.
+    '''
+
+    if isinstance(field, TargetField):
+        return field.attr, field.func
+    return field, None
 
 
-def convertNode(node: Node, fromEngine: str, toEngine: str) -> str | None:
+def composeTransforms(first: Callable | None, second: Callable | None) -> Callable | None:
     '''
-    Convert the given node from the provided fromEngine engine's own system to the toEngine's equivalent node
-    Returns the name of the newly created node.
-    OR None if the node cannot be converted.
+    Returns the transform that applies first, then second. Either of them can be None (no transform).
+    '''
+
+    if first == None:
+        return second
+    if second == None:
+        return first
+    if isinstance(first, FieldTransform) and isinstance(second, FieldTransform):
+        return first.then(second) # stays picklable and vectorisable
+
+    def composed(value):
+        result = first(value)
+        return second([result] if isinstance(result, tuple) else result) # handing compounds over the way cmd.getAttr returns them
+
+    return composed
+
+
+def captureNodeSchema(nodeType: str, sampleNode: str | None = None) -> NodeSchema:
+    '''
+    Queries the attributes of the given node type from Maya and returns them as a NodeSchema.
+    - sampleNode = an existing node of the type to query. If None, a temporary node is created (and deleted) for it.
     '''
 
-    # {{{ DONE: get and store existing attributes in the "common" types
-    conversionFromDict = ENGINECONVERSIONS[FROMENGINES[fromEngine]] # This returns a dict that contains subdictionaries of shader node information.
+    tempNode: str | None = None
+    if sampleNode == None:
+        tempNode = sampleNode = cmd.createNode(nodeType, skipSelect= True)
+
+    attributes: dict[str, AttributeSchema] = {}
+
+    try:
+        for attr in cmd.listAttr(sampleNode) or []:
+            if "." in attr or "[" in attr: # children of multi attributes have no fixed plug to query
+                continue
+
+            try:
+                attrType = cmd.getAttr(f"{sampleNode}.{attr}", typ = True)
+            except Exception: # message attributes and the like have no value, thus no type
+                continue
+
+            try:
+                default = cmd.attributeQuery(attr, node= sampleNode, listDefault= True)
+            except Exception:
+                default = None
+            if isinstance(default, list):
+                default = default[0] if len(default) == 1 else tuple(default)
+
+            parent = cmd.attributeQuery(attr, node= sampleNode, listParent= True)
+            attributes[attr] = AttributeSchema(
+                name= attr,
+                shortName= cmd.attributeQuery(attr, node= sampleNode, shortName= True),
+                type= attrType,
+                default= default,
+                children= tuple(cmd.attributeQuery(attr, node= sampleNode, listChildren= True) or ()),
+                parent= parent[0] if parent else None,
+            )
+    finally:
+        if tempNode != None:
+            cmd.delete(tempNode)
+
+    return NodeSchema(nodeType, attributes)
+
+
+def getEnginePluginVersion(engine: str) -> str:
+    '''
+    Returns the version of the given engine's Maya plugin, or "unknown" if it can't be queried.
+    '''
+
+    try:
+        return str(cmd.pluginInfo(ENGINEPLUGINS[engine], query= True, version= True))
+    except Exception:
+        return "unknown"
+
+
+def getSchemaSnapshotPath(engine: str) -> str | None:
+    '''
+    Returns the path of the given engine's schema snapshot for the currently loaded plugin version, or None if snapshots are disabled.
+    '''
+
+    if SCHEMASNAPSHOTDIR == None:
+        return None
+
+    version = "".join(c if c.isalnum() or c in ".-_" else "_" for c in getEnginePluginVersion(engine))
+    return os.path.join(SCHEMASNAPSHOTDIR, f"{engine}-{version}.json")
+
+
+def loadSchemaSnapshot(engine: str) -> dict[str, NodeSchema]:
+    '''
+    Returns the NodeSchemas stored in the given engine's schema snapshot, keyed by node type.
+    Returns an empty dict if there is no usable snapshot.
+    '''
+
+    path = getSchemaSnapshotPath(engine)
+    if path == None or not os.path.isfile(path):
+        return {}
+
+    data = readSchemaSnapshotFile(path)
+    if data == None:
+        return {}
+
+    return {nodeType: NodeSchema.fromDict(nodeType, attributes) for nodeType, attributes in data["nodeTypes"].items()}
+
+
+def readSchemaSnapshotFile(path: str) -> dict | None:
+    '''
+    Returns the contents of the given schema snapshot file (see saveSchemaSnapshot).
+    Returns None if it can't be read or was written in a different format.
+    '''
+
+    try:
+        with open(path, "r", encoding= "utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f'! Node converter: Couldn\'t read schema snapshot "{path}", ignoring it.\n! - {e}')
+        return None
+
+    if data.get("formatVersion") != SCHEMAFORMATVERSION:
+        return None
+
+    return data
+
+
+def saveSchemaSnapshot(engine: str):
+    '''
+    Writes the cached NodeSchemas of the given engine to its schema snapshot, if snapshots are enabled.
+    '''
+
+    path = getSchemaSnapshotPath(engine)
+    if path == None:
+        return
+
+    data = {
+        "formatVersion": SCHEMAFORMATVERSION,
+        "engine": engine,
+        "pluginVersion": getEnginePluginVersion(engine),
+        "nodeTypes": {nodeType: schema.toDict() for nodeType, schema in nodeSchemaCache.get(engine, {}).items()},
+    }
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok= True)
+        with open(f"{path}.tmp", "w", encoding= "utf-8") as f:
+            json.dump(data, f, indent= 1)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        print(f'! Node converter: Couldn\'t write schema snapshot "{path}".\n! - {e}')
+
+
+def getNodeSchema(engine: str, nodeType: str, sampleNode: str | None = None) -> NodeSchema:
+    '''
+    Returns the NodeSchema of the given node type of the given engine.
+    Schemas are looked up in memory first, then in the engine's schema snapshot, and only captured from Maya
+    (see captureNodeSchema) when neither has them. Newly captured schemas are added to the snapshot.
+    '''
+
+    if engine not in nodeSchemaCache:
+        nodeSchemaCache[engine] = loadSchemaSnapshot(engine)
+
+    engineSchemas = nodeSchemaCache[engine]
+    if nodeType not in engineSchemas:
+        engineSchemas[nodeType] = captureNodeSchema(nodeType, sampleNode)
+        saveSchemaSnapshot(engine)
+
+    return engineSchemas[nodeType]
+
+
+def getEngineNodeTypes(engine: str) -> list[str]:
+    '''
+    Returns every node type of the given engine that its conversion dicts know about, in both directions.
+    '''
+
+    nodeTypes = list(ENGINECONVERSIONS.get(FROMENGINES.get(engine), {}).keys())
+    nodeTypes.extend(toFields["nodeTypeName"] for toFields in ENGINECONVERSIONS.get(TOENGINES.get(engine), {}).values())
+
+    return list(dict.fromkeys(nodeTypes))
+
+
+def captureEngineSchemas(engine: str):
+    '''
+    Captures the schema of every node type of the given engine (see getEngineNodeTypes) into its schema snapshot,
+    so conversions that can't query Maya (see ma_convert.py) have them at hand. SCHEMASNAPSHOTDIR has to be set.
+    '''
+
+    if getSchemaSnapshotPath(engine) == None:
+        print("! Node converter: SCHEMASNAPSHOTDIR isn't set, there is nowhere to write the schemas to.")
+        return
+
+    for nodeType in getEngineNodeTypes(engine):
+        getNodeSchema(engine, nodeType)
+
+
+def compileSourceReads(sourceAttrs: list[str], sourceSchema: NodeSchema) -> tuple[SourceRead, ...]:
+    '''
+    Returns the SourceReads that fetch every given attribute with as few Maya calls as possible:
+    children of numeric compounds are taken from their parent's value whenever the parent gets read anyway,
+    or when reading the parent once saves reading more than one of its children.
+    '''
+
+    neededChildren: dict[str, int] = {}
+    # ^ Key: numeric compound parent
+    # ^ Value: number of its children in sourceAttrs
+
+    for attr in sourceAttrs:
+        attribute = sourceSchema.get(attr)
+        if attribute != None and attribute.parent != None and sourceSchema.typeOf(attribute.parent) in NUMERICCOMPOUNDTYPES:
+            neededChildren[attribute.parent] = neededChildren.get(attribute.parent, 0) + 1
+
+    directReads: list[SourceRead] = []
+    childReads: list[SourceRead] = []
+    readAttrs: set[str] = set()
+
+    for attr in sourceAttrs:
+        attribute = sourceSchema.get(attr)
+        parent = attribute.parent if attribute != None else None
+
+        if parent != None and parent in neededChildren and (parent in sourceAttrs or neededChildren[parent] > 1):
+            if parent not in readAttrs:
+                readAttrs.add(parent)
+                directReads.append(SourceRead(attr= parent, parent= None, index= 0))
+            childReads.append(SourceRead(attr= attr, parent= parent, index= sourceSchema.get(parent).children.index(attr)))
+        elif attr not in readAttrs:
+            directReads.append(SourceRead(attr= attr, parent= None, index= 0))
+
+        readAttrs.add(attr)
+
+    return tuple(directReads + childReads)
+
+
+def compileConversionRoutes(fromEngine: str, toEngine: str) -> dict[str, ConversionRoute]:
+    '''
+    Composes the fromEngine -> common and common -> toEngine conversion tables into a direct ConversionRoute for every
+    fromEngine node type that has an equivalent in toEngine, keyed by node type. Transforms of both tables are composed into one.
+    '''
+
+    conversionFromDict = ENGINECONVERSIONS.get(FROMENGINES.get(fromEngine), {}) # This returns a dict that contains subdictionaries of shader node information.
     # ^ Key: nodeType (in fromEngine)
     # ^ Value: dict of nodeType's fields NodeField objects
     #			    ^ Key: node field's name in fromEngines format
     #			    ^ Value: NodeField object with node field's name in the made up common node names specification assigned
+    conversionToDict = ENGINECONVERSIONS.get(TOENGINES.get(toEngine), {})
 
-    nodeInfo: dict = {}
-    # ^ Key: Node field's name
-    # ^ Value: node field's value
+    routes: dict[str, ConversionRoute] = {}
 
-    if node.nType in conversionFromDict.keys():
-        nodeInfo["nodeTypeName"] = conversionFromDict[node.nType]["nodeTypeName"][0].commonName
+    for nType, nodeFields in conversionFromDict.items():
+        commonType: str = nodeFields["nodeTypeName"][0].commonName
+        if commonType not in conversionToDict:
+            continue
+        toFields: dict = conversionToDict[commonType]
 
-        for k, v in list(conversionFromDict[node.nType].items())[1:]: # Iterate through the dict but skip the first item in it (in this case the key "nodeTypeName")
-            for item in v:
-                if callable(item.func):
-                    nodeInfo[f"{item.commonName}"] = item.func(cmd.getAttr(f"{node.name}.{k}"))
-                else:
+        fields: list[RouteField] = []
+        for sourceAttr, items in nodeFields.items():
+            if sourceAttr == "nodeTypeName":
+                continue
 
-                    currentAttribute = cmd.getAttr(f"{node.name}.{k}")
-                    if isinstance(currentAttribute, list):
-                        nodeInfo[f"{item.commonName}"] = currentAttribute[0]
-                    else:
-                        nodeInfo[f"{item.commonName}"] = currentAttribute
-        #            nodeInfo[f"{conversionFromDict[node.nType][k].commonName}"] = currentAttribute
+            for item in items:
+                if item.commonName in toFields: # get only the fromEngine fields that have an equivalent in toEngine fields
+                    targetAttr, targetFunc = getTargetField(toFields[item.commonName])
+                    fields.append(RouteField(sourceAttr= sourceAttr, commonName= item.commonName, targetAttr= targetAttr, func= composeTransforms(item.func, targetFunc)))
 
-                nodeInfo[f"{item.commonName}-type"] = cmd.getAttr(f"{node.name}.{k}",typ = True)
-                # ^ set the value and type attributes for the node that's been passed in the function call; to the common node and fields names based on the madeup specification
+        routes[nType] = ConversionRoute(sourceType= nType, commonType= commonType, targetType= toFields["nodeTypeName"], fields= tuple(fields))
 
-        # }}}
+    return routes
 
-        # {{{ DONE: convert common type to toEngine's types
-        #           & spawn toEngine node with converted attributes
-        conversionToDict = ENGINECONVERSIONS[TOENGINES[toEngine]]
-        intersectionDict: list = []
-        for deepValue in conversionFromDict[node.nType].values():
-            for item in deepValue:
-                if item.commonName in conversionToDict[nodeInfo["nodeTypeName"]]: # get only the fromEngine fields that have an equivalent in toEngine fields
-                    intersectionDict.append(item.commonName)
 
+def getConversionRoute(fromEngine: str, toEngine: str, nType: str) -> ConversionRoute | None:
+    '''
+    Returns the ConversionRoute of the given node type, or None if it has no equivalent in toEngine.
+    The routes of an engine pair are compiled the first time one of them is asked for and cached for the session.
+    '''
 
-        newNode: str | None = cmd.shadingNode(conversionToDict[nodeInfo["nodeTypeName"]]["nodeTypeName"], asShader= True) # creating new node in hypershade
+    key = (fromEngine, toEngine)
+    if key not in conversionRouteCache:
+        conversionRouteCache[key] = compileConversionRoutes(fromEngine, toEngine)
 
-        for x in intersectionDict: # Iterate through the dict and assign attributes to the new node
-            nodeFieldData = None
+    return conversionRouteCache[key].get(nType)
 
-            nodeFieldData = nodeInfo[x]
-            oldNodeFieldDataType = nodeInfo[f'{x}-type']
-            nodeFieldDataType = cmd.getAttr(f"{newNode}.{conversionToDict[nodeInfo['nodeTypeName']][f'{x}']}",typ = True)
 
+def compileConversionPlan(fromEngine: str, toEngine: str, nType: str, sampleNode: str | None = None) -> ConversionPlan | None:
+    '''
+    Resolves the ConversionRoute of the given node type into a flat ConversionPlan, with the attribute types and setters of the fields.
+    Returns None if the node type cannot be converted.
+    - sampleNode = an existing node of the given type, used for capturing its schema if it's not known yet (see getNodeSchema)
+    '''
 
-            if nodeFieldData != None and nodeFieldData != None:
-                try: # This block is a solution for the fact that some node fields need a type as well a value to be assignable, but not every field accepts a type.
-                        cmd.setAttr(f'{newNode}.{conversionToDict[nodeInfo["nodeTypeName"]][f"{x}"]}', nodeFieldData) # setting attributes of the spawend node
-                except Exception as e:
-                        if nodeFieldDataType == "float3": # Maya has it's own type for vectors and such so if we need them, we have to convert the tuple containing it into Maya's type first... (in this case we have to pass float3 not as a list/tuple but individual values. Weird flex, but ok..)
-                            try: # This try except block is here because during conversion there might be instances when fromEngine only has a float value but toEngine needs a float3 value instead. First we try assigning the float3 to float3 but if it doesn't work we assign the float to all elements of float3
-                                cmd.setAttr(f"{newNode}.{conversionToDict[nodeInfo['nodeTypeName']][f'{x}']}", nodeFieldData[0], nodeFieldData[1], nodeFieldData[2], typ= f"{nodeFieldDataType}") # setting attributes of the spawend node and also specifying a type
-                            except:
-                                cmd.setAttr(f"{newNode}.{conversionToDict[nodeInfo['nodeTypeName']][f'{x}']}", nodeFieldData, nodeFieldData, nodeFieldData, typ= f"{nodeFieldDataType}") 
-                        elif nodeFieldDataType == "float":
+    route = getConversionRoute(fromEngine, toEngine, nType)
+    if route == None:
+        return None
 
-                            if oldNodeFieldDataType == "float3": # if 
-                                cmd.setAttr(f"{newNode}.{conversionToDict[nodeInfo['nodeTypeName']][f'{x}']}", nodeFieldData[0])
-                            elif nodeFieldData < 0:
-                                cmd.setAttr(f"{newNode}.{conversionToDict[nodeInfo['nodeTypeName']][f'{x}']}", (nodeFieldData*-1))
-                            else:
-                                cmd.setAttr(f"{newNode}.{conversionToDict[nodeInfo['nodeTypeName']][f'{x}']}", nodeFieldData)
+    sourceSchema = getNodeSchema(fromEngine, nType, sampleNode)
+    targetSchema = getNodeSchema(toEngine, route.targetType)
 
-                        else:
-                            cmd.setAttr(f"{newNode}.{conversionToDict[nodeInfo['nodeTypeName']][f'{x}']}", nodeFieldData, typ= f"{nodeFieldDataType}") # setting attributes of the spawend node and also specifying a type
+    fields: dict[str, PlanField] = {}
+    # ^ Key: common name of the field. When more fromEngine fields map to the same common field, the last one wins.
+    # ^ Value: the PlanField that fills it
 
-                # ^ using the previously saved node field information create a new node and assign values from the original node fields to new node; using the common -> toEngine translated dictionary as a reference
-        # }}}
+    sockets: dict[str, list[str]] = {}
+    # ^ Key: fromEngine field name
+    # ^ Value: toEngine field names. It has to be a list bc one key can have multiple corresponging values in the other engine.
+
+    for routeField in route.fields:
+        sockets.setdefault(routeField.sourceAttr, []).append(routeField.targetAttr)
+
+        targetType = targetSchema.typeOf(routeField.targetAttr)
+        if targetType == None:
+            print(f'! Node converter: "{route.targetType}" has no "{routeField.targetAttr}" attribute.\n! Skipping field...')
+            continue
+
+        sourceType = sourceSchema.typeOf(routeField.sourceAttr)
+        fields[routeField.commonName] = PlanField(sourceAttr= routeField.sourceAttr, sourceType= sourceType, func= routeField.func, commonName= routeField.commonName, targetAttr= routeField.targetAttr, targetType= targetType, setter= selectSetter(sourceType, targetType))
+
+    return ConversionPlan(
+        sourceType= nType,
+        commonType= route.commonType,
+        targetType= route.targetType,
+        fields= tuple(fields.values()),
+        reads= compileSourceReads(list(dict.fromkeys(field.sourceAttr for field in fields.values())), sourceSchema),
+        sockets= MappingProxyType({k: tuple(v) for k, v in sockets.items()}),
+    )
+
+
+def getConversionPlan(fromEngine: str, toEngine: str, nType: str, sampleNode: str | None = None) -> ConversionPlan | None:
+    '''
+    Returns the ConversionPlan of the given node type. Plans are compiled the first time they are asked for and cached for the session.
+    Returns None if the node type cannot be converted.
+    - sampleNode = see compileConversionPlan
+    '''
+
+    key = (fromEngine, toEngine, nType)
+    if key not in conversionPlanCache:
+        conversionPlanCache[key] = compileConversionPlan(fromEngine, toEngine, nType, sampleNode)
+
+    return conversionPlanCache[key]
+
+
+def readSourceAttributes(nodeName: str, plan: ConversionPlan) -> dict[str, object]:
+    '''
+    Returns the values of every fromEngine attribute the plan needs, as returned by cmd.getAttr, keyed by attribute name.
+    Every attribute is fetched once at most, children of compounds are taken from their parent's value.
+    '''
+
+    values: dict[str, object] = {}
+
+    for read in plan.reads:
+        if read.parent == None:
+            values[read.attr] = cmd.getAttr(f"{nodeName}.{read.attr}")
+        else:
+            values[read.attr] = values[read.parent][0][read.index] # compounds come back as [(x, y, z)]
+
+    return values
+
+
+def isSameValue(value, reference, tolerance: float = FLOATTOLERANCE) -> bool:
+    '''
+    Returns whether the given value, written to an attribute that holds the reference value (e.g.: its default), would leave it unchanged.
+    Numbers are compared within tolerance. Scalars are compared to every component of a compound reference
+    and only the first component of a compound value is compared to a scalar reference, the same way they get written.
+    '''
+
+    if reference == None or value == None:
+        return False
+
+    if isinstance(value, str) or isinstance(reference, str):
+        return value == reference
+
+    if isinstance(value, (list, tuple)) and isinstance(reference, (list, tuple)):
+        return len(value) == len(reference) and all(isSameValue(v, r, tolerance) for v, r in zip(value, reference))
+    if isinstance(reference, (list, tuple)):
+        return all(isSameValue(value, r, tolerance) for r in reference)
+    if isinstance(value, (list, tuple)):
+        return len(value) != 0 and isSameValue(value[0], reference, tolerance)
+
+    try:
+        return abs(float(value) - float(reference)) <= tolerance
+    except (TypeError, ValueError):
+        return False
+
+
+def getConnectedTargetAttrs(graph: NodeGraph, fromEngine: str, toEngine: str) -> dict[str, set[str]]:
+    '''
+    Returns the toEngine attributes that connectEdge is going to drive with a connection.
+    - Key: name of the original node on the right side of the connection
+    - Value: names of the attributes on its converted equivalent
+    '''
+
+    connectedAttrs: dict[str, set[str]] = {}
+
+    for edge in graph.edges:
+        srcNode = graph.get(edge.srcNode)
+        dstNode = graph.get(edge.dstNode)
+        if srcNode == None or dstNode == None:
+            continue
+
+        srcPlan = getConversionPlan(fromEngine, toEngine, srcNode.nType, sampleNode= srcNode.name)
+        dstPlan = getConversionPlan(fromEngine, toEngine, dstNode.nType, sampleNode= dstNode.name)
+        if srcPlan == None or dstPlan == None or len(srcPlan.sockets.get(edge.srcAttr, ())) == 0:
+            continue
+
+        connectedAttrs.setdefault(dstNode.name, set()).update(dstPlan.sockets.get(edge.dstAttr, ()))
+
+    return connectedAttrs
+
+
+def isConnectedAttribute(attribute: AttributeSchema, connectedAttrs: set[str]) -> bool:
+    '''
+    Returns whether the attribute, its compound parent or one of its children is going to be driven by a connection.
+    '''
+
+    return attribute.name in connectedAttrs or attribute.parent in connectedAttrs or any(child in connectedAttrs for child in attribute.children)
+
+
+def planWrites(plan: ConversionPlan, nodeInfo: list, targetSchema: NodeSchema, connectedAttrs: set[str], report: ConversionReport) -> list[tuple]:
+    '''
+    Returns the (field, value) writes that actually change the converted node:
+    values that equal the toEngine attribute's default and attributes that are going to be driven by a connection
+    (directly, or through their compound parent or children) are left out and counted in the report.
+    - nodeInfo = value of every field of the plan, in the plan's order
+    '''
+
+    writes: list[tuple] = []
+
+    for field, nodeFieldData in zip(plan.fields, nodeInfo):
+        if nodeFieldData == None:
+            continue
+
+        attribute = targetSchema.get(field.targetAttr)
+
+        if isConnectedAttribute(attribute, connectedAttrs):
+            report.skippedConnected += 1
+        elif isSameValue(nodeFieldData, attribute.default):
+            report.skippedDefaults += 1
+        else:
+            writes.append((field, nodeFieldData))
+
+    return writes
+
+
+def planUpdates(plan: ConversionPlan, nodeInfo: list, previousValues: dict, targetSchema: NodeSchema, connectedAttrs: set[str], report: ConversionReport) -> list[tuple]:
+    '''
+    planWrites for an already converted node: returns the (field, value) writes of the fields whose value changed since
+    the previous conversion, leaving out (and counting in the report) the ones that are going to be driven by a connection.
+    - previousValues = the values of the previous conversion, keyed by toEngine attribute name (see ConversionMap)
+    '''
+
+    writes: list[tuple] = []
+
+    for field, nodeFieldData in zip(plan.fields, nodeInfo):
+        if nodeFieldData == None or isSameValue(nodeFieldData, previousValues.get(field.targetAttr)):
+            continue
+
+        if isConnectedAttribute(targetSchema.get(field.targetAttr), connectedAttrs):
+            report.skippedConnected += 1
+        else:
+            writes.append((field, nodeFieldData))
+
+    return writes
+
+
+def recordValue(plug: str, attrType: str | None):
+    '''
+    Keeps the value of the given plug in the active ConversionTransaction (if any) before it's changed, so it can be restored.
+    '''
+    if ConversionTransaction.active != None:
+        ConversionTransaction.active.recordValue(plug, attrType)
+
+
+def deleteNodes(nodeNames: list[str]):
+    '''
+    Deletes the given nodes once the active ConversionTransaction succeeds, so they're still there if it's rolled back.
+    Without a transaction they're deleted right away.
+    '''
+    if ConversionTransaction.active != None:
+        for nodeName in nodeNames:
+            ConversionTransaction.active.deleteLater(nodeName)
     else:
+        cmd.delete(nodeNames)
+
+
+def setPlugValue(plug: str, value, attrType: str | None):
+    '''
+    Writes a value the way cmd.getAttr returned it (compounds as [(x, y, z)]) back to the plug.
+    '''
+    if attrType in NUMERICCOMPOUNDTYPES:
+        cmd.setAttr(plug, *value[0], typ= attrType)
+    elif attrType == "string":
+        cmd.setAttr(plug, value or "", typ= "string")
+    else:
+        cmd.setAttr(plug, value)
+
+
+def createConvertedNode(nodeType: str) -> str:
+    '''
+    Creates a new shading node of the given type in the hypershade and returns its name.
+    The node is tracked by the active ConversionTransaction (if any), so it gets removed if the conversion fails.
+    '''
+
+    newNode: str = cmd.shadingNode(nodeType, asShader= True)
+    if ConversionTransaction.active != None:
+        ConversionTransaction.active.track(newNode)
+
+    return newNode
+
+
+def transformFieldValues(field: PlanField, values: list) -> list:
+    '''
+    Returns the given values of a field's fromEngine attribute (as cmd.getAttr returns them) the way they get written to the toEngine attribute.
+    FieldTransforms transform all of them at once, see FieldTransform.applyBatch.
+    '''
+
+    if isinstance(field.func, FieldTransform):
+        return field.func.applyBatch(values)
+    if callable(field.func):
+        return [field.func(value) for value in values]
+    return [value[0] if isinstance(value, list) else value for value in values]
+
+
+def getNodeFieldValues(nodeName: str, plan: ConversionPlan) -> list:
+    '''
+    Returns the value of every field of the plan for the given node, transformed and in the plan's order.
+    '''
+
+    values = readSourceAttributes(nodeName, plan)
+
+    return [transformFieldValues(field, [values[field.sourceAttr]])[0] for field in plan.fields]
+
+
+def getBatchFieldValues(nodes: list[Node], fromEngine: str, toEngine: str) -> dict[str, list]:
+    '''
+    getNodeFieldValues of many nodes at once: the fromEngine attributes of every node are read first, then the values of each field
+    are transformed across every node of the same type in a single pass (see transformFieldValues).
+    Returns the values of the fields keyed by node name. Nodes that cannot be converted are left out.
+    '''
+
+    nodeTypes: dict[str, tuple[ConversionPlan, list[str], list[dict]]] = {}
+    # ^ Key: node type
+    # ^ Value: (its plan, names of its nodes, their fromEngine attribute values)
+
+    for node in nodes:
+        plan = getConversionPlan(fromEngine, toEngine, node.nType, sampleNode= node.name)
+        if plan == None:
+            continue
+        _, nodeNames, sourceValues = nodeTypes.setdefault(node.nType, (plan, [], []))
+        nodeNames.append(node.name)
+        sourceValues.append(readSourceAttributes(node.name, plan))
+
+    nodeValues: dict[str, list] = {}
+
+    for plan, nodeNames, sourceValues in nodeTypes.values():
+        columns = [transformFieldValues(field, [values[field.sourceAttr] for values in sourceValues]) for field in plan.fields]
+        # ^ transformed values of every field, in the plan's order, each one holding the value of every node
+        for i, nodeName in enumerate(nodeNames):
+            nodeValues[nodeName] = [column[i] for column in columns]
+
+    return nodeValues
+
+
+def getTextureFields(nodes: list[Node], nodeValues: dict[str, list], fromEngine: str, toEngine: str) -> list[tuple[str, list, int]]:
+    '''
+    Returns where the texture paths (see TEXTUREATTRS) are among the field values of the given nodes (see getBatchFieldValues),
+    as (node name, its field values, index of the texture path in them).
+    '''
+
+    textureAttrs = TEXTUREATTRS.get(toEngine, {})
+    textureFields: list[tuple[str, list, int]] = []
+    for node in nodes:
+        values = nodeValues.get(node.name)
+        plan = getConversionPlan(fromEngine, toEngine, node.nType, sampleNode= node.name) if values != None else None
+        if plan == None or plan.targetType not in textureAttrs:
+            continue
+        for i, field in enumerate(plan.fields):
+            if field.targetAttr == textureAttrs[plan.targetType] and isinstance(values[i], str) and values[i] != "":
+                textureFields.append((node.name, values, i))
+
+    return textureFields
+
+
+def getWorkspaceRoot() -> str:
+    '''
+    Returns the root folder of the current Maya project, that relative texture paths are relative to (like Maya resolves them),
+    or the working directory if the backend has no project to ask.
+    '''
+
+    try:
+        root = cmd.workspace(query= True, rootDirectory= True)
+    except Exception: # e.g. Maya isn't there
+        root = None
+    return root or os.getcwd()
+
+
+def resolveTexturePath(path: str, workspaceRoot: str) -> str:
+    '''
+    Returns the absolute path of the given texture path: environment variables expanded, and relative to workspaceRoot (see getWorkspaceRoot) if it's relative.
+    '''
+    return os.path.normpath(os.path.join(workspaceRoot, os.path.expandvars(path)))
+
+
+def checkTextures(nodes: list[Node], nodeValues: dict[str, list], fromEngine: str, toEngine: str, report: ConversionReport):
+    '''
+    Warns about the texture paths of the given nodes that have no file, or no tiles at all for paths with tile tokens (see TextureResolver),
+    and records them in the report, before anything gets converted. Relative paths are looked up in the current Maya project.
+    '''
+
+    textureFields = getTextureFields(nodes, nodeValues, fromEngine, toEngine)
+    if len(textureFields) == 0:
+        return
+
+    workspaceRoot = getWorkspaceRoot()
+    for nodeName, values, i in textureFields:
+        if not textureResolver.exists(resolveTexturePath(values[i], workspaceRoot)):
+            report.missingTextures[nodeName] = values[i]
+            print(f'! Node converter: Texture "{values[i]}" of {nodeName} not found.')
+
+
+def convertNode(node: Node, fromEngine: str, toEngine: str, connectedAttrs: set[str] | None = None, report: ConversionReport | None = None, conversionMap: ConversionMap | None = None, nodeInfo: list | None = None) -> str | None:
+    '''
+    Convert the given node from the provided fromEngine engine's own system to the toEngine's equivalent node
+    Returns the name of the newly created node.
+    OR None if the node cannot be converted.
+    - connectedAttrs = toEngine attributes of the new node that are going to be driven by connections, see getConnectedTargetAttrs
+    - report = ConversionReport to count the node's writes in
+    - conversionMap = if given, the node's converted equivalent from a previous conversion gets updated instead of creating a new one
+      (if it still exists), and the result is recorded in the map
+    - nodeInfo = the node's field values if they are known already (see getBatchFieldValues), read from the node otherwise
+    '''
+
+    plan = getConversionPlan(fromEngine, toEngine, node.nType, sampleNode= node.name)
+
+    if plan == None:
         print(f'! Node converter: No conversion dict(s) found for the following node type: {node.nType}.\n! Skipping node...')
-        newNode = None
+        return None
         # raise SystemExit(f'! Node converter: No conversion dict(s) found for the following node type: {node.nType}.\n! Terminating conversion...\n! P.S.: You\'ll have to clean up for now; sorry.. (ctrl+z maybe?)')
 
+    # {{{ get and store existing attributes, keyed by the plan's fields
+    if nodeInfo == None:
+        nodeInfo = getNodeFieldValues(node.name, plan)
+    # ^ value of every field of the plan, in the plan's order
+    # }}}
 
+    if report == None:
+        report = ConversionReport()
+    targetSchema = getNodeSchema(toEngine, plan.targetType)
+    record = conversionMap.getReusable(node.name, plan.targetType) if conversionMap != None else None
+    if conversionMap != None:
+        connectedFields = {field.targetAttr for field in plan.fields if isConnectedAttribute(targetSchema.get(field.targetAttr), connectedAttrs or set())}
+
+    if record != None:
+        # {{{ update the previously converted node with what changed since
+        newNode: str | None = record["converted"]
+        if record["valueHash"] == ConversionMap.hashValues(plan, nodeInfo, connectedFields):
+            writes = []
+        else:
+            disconnectFreedAttributes(node.name, newNode, conversionMap, targetSchema, connectedAttrs or set(), report)
+            writes = planUpdates(plan, nodeInfo, record["values"], targetSchema, connectedAttrs or set(), report)
+        report.reusedNodes += 1
+        # }}}
+    else:
+        # {{{ spawn toEngine node with converted attributes
+        newNode = createConvertedNode(plan.targetType) # creating new node in hypershade
+        writes = planWrites(plan, nodeInfo, targetSchema, connectedAttrs or set(), report) # assign only the attributes that change the new node
+        report.convertedNodes += 1
+        # }}}
+
+    for field, nodeFieldData in writes:
+        if record != None: # updating a node that existed before, its previous value is kept for rolling back
+            recordValue(f"{newNode}.{field.targetAttr}", field.targetType)
+        field.setter(f"{newNode}.{field.targetAttr}", nodeFieldData, field.targetType)
+        report.writes += 1
 
+    if conversionMap != None:
+        conversionMap.recordNode(node.name, newNode, plan, nodeInfo, connectedFields)
 
     return newNode
 
-def getDictIntersection(currentNode: Node, fromEngine: str, toEngine: str) -> dict:
+
+def getEdgeConnections(graph: NodeGraph, edge: Edge, fromEngine: str, toEngine: str) -> list[tuple[str, str]]:
     '''
-    Return a dictionary that has the intersection of a fromEngine - toEngine node conversion's corresponding fields
-    based on currentNode's type.
+    Returns the (left side plug, right side plug) connections that rebuild the given connection of the original node network
+    between the converted equivalents of its nodes.
     '''
 
-    # The code below does the following:
-    # 1) get fromEngine to Common dict
-    # 2) get Common to ToEngine dict
-    # 3) compare fEtC's values to cttE's keys
-    #   - if they are the same, add them to the return dict
-    #   - where:| key= fromEngine's key
-    #           | value: list= toEngine's value appended to it
+    #{{{
+    srcNode = graph.get(edge.srcNode)
+    dstNode = graph.get(edge.dstNode)
+
+    if dstNode == None or dstNode.convertedName == None: # nothing to connect to on the right side
+        return []
 
-    dictIntersection: dict = {}
-    fromEFieldsDict = ENGINECONVERSIONS[FROMENGINES[fromEngine]][currentNode.nType]
-    toEFieldsDict = ENGINECONVERSIONS[TOENGINES[toEngine]][fromEFieldsDict["nodeTypeName"][0].commonName]
+    plan = getConversionPlan(fromEngine, toEngine, dstNode.nType)
+    srcPlan = getConversionPlan(fromEngine, toEngine, srcNode.nType) if srcNode != None else None
+    connectedNodeFound = srcPlan != None and srcNode.convertedName != None
 
-    for k1, v1 in fromEFieldsDict.items():
-        dictIntersection[k1] = [] # it has to be a list bc one key can have multiple corresponging values in the other engine.
-        for item in v1:
-            for k2, v2 in toEFieldsDict.items():
-                if item.commonName == k2:
-                    dictIntersection[k1].append(v2)
-        if dictIntersection[k1] == []:
-            del dictIntersection[k1]
+    #{{{ Create the new connections based on the date we've gathered
+    #   1) set new connection name side A
+    #   2) set new connection name side B
 
+    if connectedNodeFound and edge.dstAttr in plan.sockets:
+        newConnectionsName: tuple = srcPlan.sockets.get(edge.srcAttr, ())
+        newSelfSocketName: tuple = plan.sockets[edge.dstAttr]
 
-    return dictIntersection
+        return [(f'{srcNode.convertedName}.{a}', f'{dstNode.convertedName}.{b}') for a in newConnectionsName for b in newSelfSocketName]
 
+    print(f'! Node converter: Couldn\'t create connection for "{edge.srcNode}.{edge.srcAttr}"')
+    print(f'! Expounding:\n! - Converted equivalent of the connected node was found: \n! -- {connectedNodeFound}\n! - Old connection\'s right side has equivalent on the new converted node:\n! -- {edge.dstAttr in plan.sockets}')
 
-def connectNode(nodes: list[Node], currentNode: Node, fromEngine: str, toEngine: str):
+    # }}}
+
+    #}}}
+
+    return []
+
+
+def connectPlugs(srcPlug: str, dstPlug: str, report: ConversionReport | None = None) -> bool:
     '''
-    Builds INCOMING connections the node (so on its left side) based on the original node networks connections
+    Connects the given plugs, reporting (instead of raising) when it can't be done. Returns whether they got connected.
+    - report = ConversionReport to count the new connection in
     '''
 
-    #{{{
-    if currentNode.nType in ENGINECONVERSIONS[FROMENGINES[fromEngine]].keys():
-        convertedIntersection = getDictIntersection(currentNode, fromEngine, toEngine)
-    else: 
-        print(f'! Node converter: Can\'t make connections to and from "{currentNode.name}", because it could not be converted to the new engine\n! - Missing conversion dict maybe?')
+    try:
+        cmd.connectAttr(srcPlug, dstPlug)
+        if report != None:
+            report.connections += 1
+        return True
+    except Exception as e:
+        print(f'! Node converter: couldn\'t create connection between:\n! - {srcPlug} and\n! - {dstPlug}')
+        print(f'! Maybe there is no conversion dict for one of these nodes?')
+        print(f'! The Python interpreter has the following to say about this:\n! - {e}')
+        traceback.print_exc()
+        return False
+
+
+def disconnectPlugs(srcPlug: str, dstPlug: str, report: ConversionReport):
+    '''
+    Breaks a connection made by a previous conversion, keeping it in the active ConversionTransaction (if any) so it can be restored.
+    '''
+
+    try:
+        cmd.disconnectAttr(srcPlug, dstPlug)
+    except Exception: # the user (or deleting a node) has broken it already
         return
+    report.removedConnections += 1
+    if ConversionTransaction.active != None:
+        ConversionTransaction.active.recordConnection(False, srcPlug, dstPlug)
 
-    if isinstance(currentNode.inCon, list):
-        for x in currentNode.inCon:
-
-            oldConnectionFieldName: str = x[1].split(".")[1]
-            oldConnectionNodeName: str = x[1].split(".")[0]
-            oldNode: Node
-            oNID: dict
-            oldSelfSocketName: str = x[0].split(".")[1]
-
-            # {{{ Find connected node in nodes and make an intersection dict of it's converted fields as well
-            connectedNodeFound = False
-            for node in nodes:
-                if oldConnectionNodeName == node.name:
-                    oldNode = node
-                    if oldNode.nType in ENGINECONVERSIONS[FROMENGINES[fromEngine]].keys():
-                        oNID = getDictIntersection(oldNode, fromEngine, toEngine)
-                        connectedNodeFound = True
-                        break
-            # }}}
-            
-            # FIX: newSelfSocketName is not getting the correct value. It uses the old node's socket name.
-            # TODO: Convert it into the new socket type!
-
-            #{{{ Create the new connections based on the date we've gathered
-            #   1) set new connection name side A
-            #   2) set new connection name side B
-            #   3) connect them
-
-
-            if connectedNodeFound and oldSelfSocketName in convertedIntersection.keys():
-                newConnectionsName: list = oNID[oldConnectionFieldName]
-                newSelfSocketName: list = convertedIntersection[oldSelfSocketName]
-
-                for a in newConnectionsName:
-                    for b in newSelfSocketName:
-                        try:
-                            cmd.connectAttr(f'{oldNode.convertedName}.{a}', f'{currentNode.convertedName}.{b}')
-                        except Exception as e:
-                            print(f'! Node converter: couldn\'t create connection between:\n! - {oldNode.convertedName}.{a} and\n! - {currentNode.convertedName}.{b}')
-                            print(f'! Maybe there is no conversion dict for one of these nodes?')
-                            print(f'! The Python interpreter has the following to say about this:\n! - {e}')
-                            traceback.print_exc()
-            else:
-                print(f'! Node converter: Couldn\'t create connection for "{oldConnectionNodeName}.{oldConnectionFieldName}"')
-                print(f'! Expounding:\n! - Converted equivalent of the connected node was found: \n! -- {connectedNodeFound}\n! - Old connection\'s right side has equivalent on the new converted node:\n! -- {oldSelfSocketName in convertedIntersection.keys()}')
 
-            # }}}
+def disconnectFreedAttributes(nodeName: str, convertedName: str, conversionMap: ConversionMap, targetSchema: NodeSchema, connectedAttrs: set[str], report: ConversionReport):
+    '''
+    Breaks the connections the previous conversion made to the given converted node whose right side is no longer going to be driven
+    by a connection, before the node's values get written: Maya doesn't set connected attributes. The rest is left to updateConnections.
+    '''
 
-    #}}}
+    for srcPlug, dstPlug in conversionMap.getConnections(nodeName, convertedName):
+        attribute = targetSchema.get(dstPlug.partition(".")[2])
+        if attribute != None and not isConnectedAttribute(attribute, connectedAttrs):
+            disconnectPlugs(srcPlug, dstPlug, report)
 
-    return
+
+def connectEdge(graph: NodeGraph, edge: Edge, fromEngine: str, toEngine: str, report: ConversionReport | None = None):
+    '''
+    Rebuilds the given connection of the original node network between the converted equivalents of its nodes.
+    - report = ConversionReport to count the new connections in
+    '''
+
+    for srcPlug, dstPlug in getEdgeConnections(graph, edge, fromEngine, toEngine):
+        connectPlugs(srcPlug, dstPlug, report)
 
 
-def convertNodeTree(nodes: list[Node], fromEngine: str, toEngine: str):
+def updateConnections(graph: NodeGraph, fromEngine: str, toEngine: str, conversionMap: ConversionMap, report: ConversionReport):
+    '''
+    Incremental counterpart of connecting every edge of the graph with connectEdge: only connections that are new since the
+    previous conversion get made, and the ones that no longer exist in the original network get broken.
+    '''
+
+    connections: dict[str, list[tuple[str, str]]] = {}
+    # ^ Key: name of the original node on the right side of the connections
+    # ^ Value: the connections that drive its converted equivalent
+
+    for edge in graph.edges:
+        edgeConnections = getEdgeConnections(graph, edge, fromEngine, toEngine)
+        if len(edgeConnections) != 0:
+            connections.setdefault(edge.dstNode, []).extend(edgeConnections)
+
+    for node in graph:
+        if node.convertedName == None:
+            continue
+
+        nodeConnections = connections.get(node.name, [])
+        if conversionMap.hasSameConnections(node.name, node.convertedName, nodeConnections): # the topology around the node hasn't changed
+            continue
+        previousConnections = conversionMap.getConnections(node.name, node.convertedName)
+
+        for srcPlug, dstPlug in nodeConnections:
+            if (srcPlug, dstPlug) not in previousConnections and connectPlugs(srcPlug, dstPlug, report) and ConversionTransaction.active != None:
+                ConversionTransaction.active.recordConnection(True, srcPlug, dstPlug)
+
+        for srcPlug, dstPlug in previousConnections - set(nodeConnections):
+            disconnectPlugs(srcPlug, dstPlug, report)
+
+        conversionMap.recordConnections(node.name, nodeConnections)
+
+
+def convertNodeTree(graph: NodeGraph, fromEngine: str, toEngine: str, incremental: bool = False) -> ConversionReport:
     '''
     Creates new nodes based on the existing ones, copies all settings that have an equivalent or alternative on the new node to the new node,
     and rebuilds the connections between the newly created nodes.
+    Returns a ConversionReport of the run.
+    - incremental = re-conversions update the nodes of the previous conversion (see ConversionMap) instead of creating a new set of nodes:
+      only changed values and connections get written, only new nodes get created, and the converted equivalents
+      of deleted original nodes get removed
     '''
+    return runSteps(iterConvertNodeTree(graph, fromEngine, toEngine, incremental))
 
-    for i in range(0, len(nodes)):
-        nodes[i].convertedName = convertNode(nodes[i], fromEngine, toEngine)
 
-    for i in range(0, len(nodes)): # not putting this in the for loop above as the order in which we get the nodes from the user is uncertain, thus building incoming connections might not be possible just yet as not all necessary nodes are there yet.
-        if nodes[i].convertedName != None:
-            connectNode(nodes, nodes[i], fromEngine, toEngine)
+def iterConvertNodeTree(graph: NodeGraph, fromEngine: str, toEngine: str, incremental: bool = False, batchSize: int | None = None):
+    '''
+    convertNodeTree in steps (see ConversionScheduler): the values of a batch of nodes are read in one step,
+    every node is created (or updated) and every connection is made in a step of its own. Returns a ConversionReport of the run.
+    - batchSize = number of nodes whose values are read in one step, all of them by default
+    '''
+
+    nodes = list(graph)
+    report = ConversionReport()
+    with timePhase("plan connections"):
+        connectedAttrs = getConnectedTargetAttrs(graph, fromEngine, toEngine)
+        yield ("plan connections", 1, 1)
+    conversionMap = ConversionMap.load(fromEngine, toEngine) if incremental else None
+
+    with timePhase("read values"):
+        nodeValues: dict[str, list] = {}
+        batchSize = batchSize or max(len(nodes), 1)
+        for i in range(0, len(nodes), batchSize):
+            nodeValues.update(getBatchFieldValues(nodes[i:i + batchSize], fromEngine, toEngine)) # every value of a field is transformed in one go
+            yield ("read values", min(i + batchSize, len(nodes)), len(nodes))
+
+    with timePhase("check textures"):
+        checkTextures(nodes, nodeValues, fromEngine, toEngine, report)
+        yield ("check textures", 1, 1)
+
+    if TexturePreparation.active != None:
+        with timePhase("prepare textures"):
+            TexturePreparation.active.prepareNodeValues(nodes, nodeValues, fromEngine, toEngine, report)
+            yield ("prepare textures", 1, 1)
+
+    instrumentation = Instrumentation.active
+    with timePhase("convert nodes"):
+        for i, node in enumerate(nodes):
+            if instrumentation != None:
+                start = time.perf_counter()
+            node.convertedName = convertNode(node, fromEngine, toEngine, connectedAttrs.get(node.name), report, conversionMap, nodeValues.get(node.name))
+            if instrumentation != None:
+                instrumentation.recordNode(node.name, node.nType, start, time.perf_counter() - start)
+            yield ("convert nodes", i + 1, len(nodes))
+
+    with timePhase("connect"):
+        if conversionMap != None:
+            updateConnections(graph, fromEngine, toEngine, conversionMap, report)
+            conversionMap.removeOrphans(report)
+            conversionMap.save()
+            yield ("connect", 1, 1)
+        else:
+            for i, edge in enumerate(graph.edges): # not putting this in the for loop above as the order in which we get the nodes from the user is uncertain, thus building incoming connections might not be possible just yet as not all necessary nodes are there yet.
+                connectEdge(graph, edge, fromEngine, toEngine, report)
+                yield ("connect", i + 1, len(graph.edges))
+
+    print(f"Node converter: Done.\n{report}")
+
+    return report
+
+def recordConversion(graph: NodeGraph, fromEngine: str, toEngine: str, emitter: ConversionEmitter) -> ConversionReport:
+    '''
+    Converts the given NodeGraph with the given ConversionEmitter standing in for cmd, so the edits of the conversion are only recorded on it.
+    Returns a ConversionReport of the run.
+    '''
+
+    backend = setBackend(emitter)
+    try:
+        return convertNodeTree(graph, fromEngine, toEngine)
+    finally:
+        setBackend(backend)
+
+
+def emitConversion(graph: NodeGraph, fromEngine: str, toEngine: str, path: str, load: bool = True) -> ConversionReport:
+    '''
+    Converts the given NodeGraph in emitter mode: instead of editing the scene one command at a time, the converted networks
+    are written to path as a Maya ASCII fragment (.ma) or a Python script (.py), see ConversionEmitter.
+    Returns a ConversionReport of the run.
+    - load = whether the written file gets loaded into the scene right away (a single file import for .ma files)
+    '''
+
+    emitter = ConversionEmitter(cmd)
+    report = recordConversion(graph, fromEngine, toEngine, emitter)
+
+    with timePhase("write"):
+        if path.lower().endswith(".py"):
+            content = emitter.toPython()
+        else:
+            plugin = ENGINEPLUGINS.get(toEngine)
+            content = emitter.toMayaAscii({plugin: getEnginePluginVersion(toEngine)} if plugin != None else None)
+
+        with open(path, "w", encoding= "utf-8") as f:
+            f.write(content)
+
+    if load and len(emitter.createdNodes) != 0:
+        with timePhase("load"):
+            if path.lower().endswith(".py"):
+                exec(compile(content, path, "exec"), {"__name__": "__main__"})
+            else:
+                cmd.file(path, i= True, type= "mayaAscii", ignoreVersion= True, mergeNamespacesOnClash= False, namespace= ":")
+
+    return report
+
+
+def convertScene(fromEngine: str, toEngine: str, shadingGroups: list[str] | None = None, recordUndo: bool = True, incremental: bool = True, emitPath: str | None = None, batchEdits: bool = False) -> ConversionReport:
+    '''
+    Converts every network of the scene (or of the given shading groups, see getSceneRoots) in one go.
+    The networks are merged into a single NodeGraph, so nodes that are shared between them get converted once
+    and their converted equivalent is connected to every converted network that used the original.
+    - recordUndo = see ConversionTransaction
+    - incremental = see convertNodeTree. Ignored in emitter mode and with batchEdits.
+    - emitPath = if given, the conversion runs in emitter mode (see emitConversion) and its result is written to (and loaded from) this file
+    - batchEdits = whether every edit of the conversion is applied at once, as a single MDGModifier (see openmaya_backend.applyConversion)
+    '''
+
+    with timePhase("crawl"):
+        graph = crawlNodeTree(getSceneRoots(fromEngine, shadingGroups), downstream= False) # every convertible node is a root already, only their inputs need crawling
+
+    with ConversionTransaction(name= "nodeNetworkSceneConversion", recordUndo= recordUndo):
+        if emitPath != None:
+            return emitConversion(graph, fromEngine, toEngine, emitPath)
+        if batchEdits:
+            import openmaya_backend # needs Maya's Python API, so it's only imported when it's used
+            return openmaya_backend.applyConversion(graph, fromEngine, toEngine)
+        return convertNodeTree(graph, fromEngine, toEngine, incremental)
+
+
+def mainInBackground(budget: float = SCHEDULERBUDGET, progress: Callable[[ConversionProgress], bool | None] | None = None) -> ConversionScheduler:
+    '''
+    main, run by a ConversionScheduler in Maya's idle time, with its progress in the main progress bar by default (Esc cancels).
+    Returns the scheduler, to cancel it or get its report from.
+    '''
+
+    progress = progress if progress != None else MainProgressBar()
+    return ConversionScheduler("Arnold", "RenderMan", getSelected(), incremental= True, budget= budget, progress= progress).startIdle()
 
-    return
 
 def main ():
 
     fromEngine = "Arnold"
     toEngine = "RenderMan"
 
-    nodeTreeMapped = crawlNodeTree(getSelected())
+    with timePhase("crawl"):
+        nodeTreeMapped = crawlNodeTree(getSelected())
 
-    convertNodeTree(nodeTreeMapped, fromEngine, toEngine)
+    with ConversionTransaction(): # a single undo step, and no half converted networks left behind if something goes wrong
+        convertNodeTree(nodeTreeMapped, fromEngine, toEngine, incremental= True) # running it again updates the previously converted network
 
     return
 
-main()
+if __name__ == "__main__": # running the script from the Script Editor, importing it (e.g.: from batch_convert.py) doesn't convert anything
+    main()
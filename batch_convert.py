@@ -0,0 +1,293 @@
+import argparse
+import collections
+import concurrent.futures
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+# Headless batch converter for Autodesk Maya scene files.
+# Run it with mayapy, e.g.:
+#   mayapy batch_convert.py "assets/**/*.ma" --workers 8 --output-dir converted --report report.json
+# Every worker process starts its own standalone Maya session once, then opens, converts (see MtoA_to_MtoRM.convertScene)
+# and saves one file at a time. A worker that crashes (or hangs past --timeout) doesn't stop the batch: its file is recorded
+# as failed and the pool is restarted for the remaining files.
+
+
+def expandPaths(patterns: list[str]) -> list[str]:
+    '''
+    Returns the scene files matched by the given paths and glob patterns, without duplicates, in the given order.
+    '''
+
+    paths: dict[str, None] = {} # the paths in the order they were matched, without repeats
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive= True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            paths[os.path.abspath(path)] = None
+
+    return list(paths)
+
+
+def getInputRoot(paths: list[str]) -> str:
+    '''
+    Returns the deepest folder that all of the given scene files are in, e.g.: "assets" for assets/a/x.ma and assets/b/x.ma.
+    '''
+
+    try:
+        return os.path.commonpath([os.path.dirname(path) for path in paths])
+    except ValueError: # on different drives
+        return ""
+
+
+def getOutputPath(path: str, outputDir: str | None, suffix: str, inputRoot: str = "") -> str:
+    '''
+    Returns where the converted version of the given scene file gets saved:
+    into outputDir under the same name if it's given, next to the original with suffix added to its name otherwise.
+    In outputDir files keep their path relative to inputRoot (see getInputRoot), so files of the same name from different folders don't collide.
+    '''
+
+    if outputDir != None:
+        relativePath = os.path.relpath(path, inputRoot) if inputRoot != "" else os.path.basename(path)
+        return os.path.join(os.path.abspath(outputDir), relativePath)
+
+    root, ext = os.path.splitext(path)
+    return f"{root}{suffix}{ext}"
+
+
+def initWorker(fromEngine: str, toEngine: str):
+    '''
+    Starts the standalone Maya session of a worker process and loads the plugins of both engines.
+    '''
+
+    import maya.standalone
+    maya.standalone.initialize(name= "python")
+
+    import maya.cmds as cmd
+    import MtoA_to_MtoRM
+
+    for engine in (fromEngine, toEngine):
+        plugin = MtoA_to_MtoRM.ENGINEPLUGINS.get(engine)
+        if plugin != None and not cmd.pluginInfo(plugin, query= True, loaded= True):
+            cmd.loadPlugin(plugin, quiet= True)
+
+
+def convertFile(job: tuple[str, str, str, str, bool]) -> dict:
+    '''
+    Opens the given scene file, converts every network in it and saves the result.
+    Returns a dict describing the outcome: input and output path, success, timings, the ConversionReport's counters or the error.
+    - job = (path, outputPath, fromEngine, toEngine, batchEdits), see MtoA_to_MtoRM.convertScene for batchEdits
+    '''
+
+    import maya.cmds as cmd
+    import MtoA_to_MtoRM
+
+    path, outputPath, fromEngine, toEngine, batchEdits = job
+    result: dict = {"file": path, "output": outputPath, "ok": False, "pid": os.getpid()}
+    start = time.perf_counter()
+
+    try:
+        cmd.file(path, open= True, force= True, prompt= False)
+        result["openSeconds"] = time.perf_counter() - start
+
+        convertStart = time.perf_counter()
+        report = MtoA_to_MtoRM.convertScene(fromEngine, toEngine, recordUndo= False, batchEdits= batchEdits)
+        result["convertSeconds"] = time.perf_counter() - convertStart
+        result["report"] = vars(report)
+
+        saveStart = time.perf_counter()
+        os.makedirs(os.path.dirname(outputPath), exist_ok= True)
+        cmd.file(rename= outputPath)
+        cmd.file(save= True, force= True, type= "mayaAscii" if outputPath.lower().endswith(".ma") else "mayaBinary")
+        result["saveSeconds"] = time.perf_counter() - saveStart
+
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    finally:
+        result["seconds"] = time.perf_counter() - start
+        try:
+            cmd.file(new= True, force= True) # don't carry anything over to the next file of this worker
+        except Exception:
+            pass
+
+    return result
+
+
+def getFailedResult(job: tuple[str, str, str, str, bool], seconds: float, error: str) -> dict:
+    '''
+    Returns the result of a job that didn't return one itself (see convertFile), because its worker died or took too long.
+    '''
+
+    return {"file": job[0], "output": job[1], "ok": False, "pid": None, "seconds": seconds, "error": error}
+
+
+def createExecutor(workers: int, fromEngine: str, toEngine: str, maxFilesPerWorker: int | None) -> concurrent.futures.ProcessPoolExecutor:
+    context = multiprocessing.get_context("spawn") # every worker needs its own, fresh Maya session
+    options = {"max_tasks_per_child": maxFilesPerWorker} if maxFilesPerWorker != None else {}
+    return concurrent.futures.ProcessPoolExecutor(workers, mp_context= context, initializer= initWorker, initargs= (fromEngine, toEngine), **options)
+
+
+def stopExecutor(executor: concurrent.futures.ProcessPoolExecutor, terminate: bool = False):
+    '''
+    Shuts the given pool down without waiting for it. With terminate the worker processes are killed too, e.g. one stuck on a file.
+    '''
+
+    if terminate:
+        if hasattr(executor, "terminate_workers"): # Python 3.14+
+            executor.terminate_workers()
+            return
+        for process in list((getattr(executor, "_processes", None) or {}).values()): # private before 3.14, if it's gone the workers are only shut down
+            process.terminate()
+    executor.shutdown(wait= False, cancel_futures= True)
+
+
+def runJobs(jobs: list[tuple[str, str, str, str, bool]], workers: int, fromEngine: str, toEngine: str, maxFilesPerWorker: int | None = None, timeout: float | None = None):
+    '''
+    Runs convertFile for every job in a pool of worker processes, yielding the results as they come in.
+    Each worker only gets one job at a time. If a worker dies, the pool breaks and the jobs that were in it are run again in a new pool, one at a time,
+    so the job that killed it is the only one recorded as failed. Jobs running longer than timeout seconds are failed, and their pool is restarted as well.
+    '''
+
+    queue = collections.deque((job, False) for job in jobs)
+    # ^ (job, whether it was in a pool that broke), suspected jobs run on their own
+    running: dict[concurrent.futures.Future, tuple[tuple, bool, float]] = {}
+    # ^ Key: future of a running job
+    # ^ Value: (the job, whether it's suspected, when it was submitted)
+    executor = createExecutor(workers, fromEngine, toEngine, maxFilesPerWorker)
+
+    try:
+        while len(queue) != 0 or len(running) != 0:
+            while len(queue) != 0 and len(running) < workers:
+                if len(running) != 0 and (queue[0][1] or any(suspect for _, suspect, _ in running.values())):
+                    break # suspected jobs don't share the pool
+                job, suspect = queue.popleft()
+                running[executor.submit(convertFile, job)] = (job, suspect, time.perf_counter())
+
+            wait = None
+            if timeout != None:
+                wait = max(0.0, min(started for _, _, started in running.values()) + timeout - time.perf_counter())
+            done, _ = concurrent.futures.wait(running, timeout= wait, return_when= concurrent.futures.FIRST_COMPLETED)
+
+            broken = False
+            for future in done:
+                job, suspect, started = running.pop(future)
+                try:
+                    yield future.result()
+                except concurrent.futures.process.BrokenProcessPool:
+                    broken = True
+                    if suspect:
+                        yield getFailedResult(job, time.perf_counter() - started, "BrokenProcessPool: the worker process died while converting this file")
+                    else:
+                        queue.appendleft((job, True))
+                except Exception as e: # e.g. a result that couldn't be sent back
+                    yield getFailedResult(job, time.perf_counter() - started, f"{type(e).__name__}: {e}")
+
+            now = time.perf_counter()
+            timedOut = [future for future, (_, _, started) in running.items() if timeout != None and now - started >= timeout]
+            for future in timedOut:
+                job, _, started = running.pop(future)
+                yield getFailedResult(job, now - started, f"TimeoutError: not converted after {timeout}s, the worker process was stopped")
+
+            if broken or len(timedOut) != 0:
+                for job, suspect, _ in running.values(): # lost with the pool, run them again
+                    queue.appendleft((job, suspect or broken))
+                running.clear()
+                stopExecutor(executor, terminate= len(timedOut) != 0)
+                executor = createExecutor(workers, fromEngine, toEngine, maxFilesPerWorker)
+    finally:
+        stopExecutor(executor, terminate= len(running) != 0)
+
+
+def printSummary(results: list[dict], wallSeconds: float):
+    '''
+    Prints the number of converted and failed files, the slowest files and every error.
+    '''
+
+    failed = [result for result in results if not result["ok"]]
+    print(f"\nNode converter batch: {len(results) - len(failed)}/{len(results)} file(s) converted in {wallSeconds:.1f}s")
+
+    if len(results) != 0:
+        print(f"Total time spent in workers: {sum(result['seconds'] for result in results):.1f}s")
+        print("Slowest files:")
+        for result in sorted(results, key= lambda r: r["seconds"], reverse= True)[:5]:
+            print(f"- {result['seconds']:.1f}s {result['file']}")
+
+    for result in failed:
+        print(f"! Failed: {result['file']}\n! - {result['error']}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description= "Converts the shading networks of Maya scene files from one render engine to another, using a pool of mayapy worker processes.")
+    parser.add_argument("files", nargs= "+", help= "scene files or glob patterns (quote them to let the script expand ** patterns)")
+    parser.add_argument("--from-engine", default= "Arnold", help= "engine to convert from (default: %(default)s)")
+    parser.add_argument("--to-engine", default= "RenderMan", help= "engine to convert to (default: %(default)s)")
+    parser.add_argument("--workers", type= int, default= os.cpu_count() or 1, help= "number of worker processes (default: number of cores)")
+    parser.add_argument("--output-dir", default= None, help= "save converted files here instead of next to the originals")
+    parser.add_argument("--suffix", default= None, help= "added to the name of converted files saved next to the originals (default: _<to-engine>)")
+    parser.add_argument("--max-files-per-worker", type= int, default= None, help= "restart workers after this many files, to keep memory in check (Python 3.11+, i.e. Maya 2025+)")
+    parser.add_argument("--timeout", type= float, default= None, help= "fail files that take longer than this many seconds, and restart their worker")
+    parser.add_argument("--batch-edits", action= "store_true", help= "apply the edits of every file at once, as a single MDGModifier")
+    parser.add_argument("--report", default= None, help= "write the per-file results and the summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    paths = expandPaths(args.files)
+    if len(paths) == 0:
+        print("! Node converter batch: No scene files matched.")
+        return 1
+
+    if args.max_files_per_worker != None and sys.version_info < (3, 11):
+        print("! Node converter batch: --max-files-per-worker needs Python 3.11 or newer (the mayapy of Maya 2025 or newer).")
+        return 1
+
+    suffix = args.suffix if args.suffix != None else f"_{args.to_engine}"
+    inputRoot = getInputRoot(paths)
+    jobs = [(path, getOutputPath(path, args.output_dir, suffix, inputRoot), args.from_engine, args.to_engine, args.batch_edits) for path in paths]
+
+    inputs: dict[str, str] = {}
+    # ^ Key: normalized output path
+    # ^ Value: the first file saved to it
+    for path, outputPath, *_ in jobs:
+        outputKey = os.path.normcase(outputPath)
+        if outputKey == os.path.normcase(path):
+            print(f"! Node converter batch: {path} would be overwritten by its converted version, use another --output-dir.")
+            return 1
+        if outputKey in inputs:
+            print(f"! Node converter batch: {inputs[outputKey]} and {path} would both be saved to {outputPath}.")
+            return 1
+        inputs[outputKey] = path
+
+    workers = max(1, min(args.workers, len(jobs)))
+
+    print(f"Node converter batch: converting {len(jobs)} file(s) with {workers} worker(s)")
+    results: list[dict] = []
+    start = time.perf_counter()
+
+    for result in runJobs(jobs, workers, args.from_engine, args.to_engine, args.max_files_per_worker, args.timeout):
+        results.append(result)
+        status = "ok" if result["ok"] else "FAILED"
+        print(f"[{len(results)}/{len(jobs)}] {status} {result['seconds']:.1f}s {result['file']}")
+
+    wallSeconds = time.perf_counter() - start
+    printSummary(results, wallSeconds)
+
+    if args.report != None:
+        with open(args.report, "w", encoding= "utf-8") as f:
+            json.dump({
+                "fromEngine": args.from_engine,
+                "toEngine": args.to_engine,
+                "workers": workers,
+                "wallSeconds": wallSeconds,
+                "converted": sum(1 for result in results if result["ok"]),
+                "failed": sum(1 for result in results if not result["ok"]),
+                "files": results,
+            }, f, indent= 1)
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+import argparse
+import contextlib
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import tracemalloc
+
+import MtoA_to_MtoRM
+from fake_scene import FakeSceneBackend, inferSchemas
+
+# Scalability benchmark of the converter on synthetic Arnold networks, run against an in-memory scene (see fake_scene.py), e.g.:
+#   python benchmark.py --output results.json
+#   python benchmark.py --output new.json --compare results.json
+# Every case builds a scene of one topology (see TOPOLOGIES) at one size, then runs a scene-wide conversion (MtoA_to_MtoRM.convertScene)
+# and takes the phases an Instrumentation records in it: crawling the networks, reading the values, converting the nodes, connecting them, etc.
+# A scene-wide conversion starts crawling from every convertible node, so it never crawls deep. The crawl main() does from a single selected
+# node (see SELECTEDROOTS), through the whole depth (deepChain) or width (hub) of the network it's a part of, is measured as a phase of its own
+# ("crawl from selection").
+# Wall time, peak memory (traced in a separate run, tracemalloc slows everything down) and the backend calls of every phase
+# are written to a JSON file, which later runs can be compared to.
+
+
+### {{{ CONSTANT definitions
+
+FROMENGINE = "Arnold"
+TOENGINE = "RenderMan"
+
+# Default number of nodes in the generated scenes. 100000 node scenes take minutes per topology, add them with --sizes when needed.
+SIZES = [10, 100, 1000, 10000]
+
+# Format of the results file, bumped when results of different versions can't be compared
+RESULTSFORMATVERSION = 2
+
+# Node the "crawl from selection" phase starts from, in every topology
+# Key: topology name
+# Value: the selected node: the material at the end of the chain for deepChain, the texture every material shares for hub
+SELECTEDROOTS = {
+    "single": "aiStandardSurface0",
+    "fanIn": "aiStandardSurface0",
+    "deepChain": "aiStandardSurface0",
+    "diamond": "aiStandardSurface0",
+    "hub": "file0",
+}
+
+# Inputs of aiStandardSurface that textures get connected to in the fan-in topology
+FANININPUTS = ["baseColor", "specularColor", "transmissionColor", "subsurfaceColor", "subsurfaceRadius", "sheenColor", "coatColor", "emissionColor", "thinFilmThickness", "specularRoughness", "base", "metalness", "opacity"]
+
+# A phase scales super-linearly if its time grows with the number of nodes by a higher power than this (1.0 = linear).
+# Measured between the two largest sizes of a topology, where fixed costs don't hide the growth anymore.
+SUPERLINEAREXPONENT = 1.3
+
+### }}}
+
+### {{{ class definitions
+
+class MemoryInstrumentation(MtoA_to_MtoRM.Instrumentation):
+    '''
+    Instrumentation that also records the peak memory of every phase, while tracemalloc is tracing.
+    '''
+    def __init__(self):
+        super().__init__(timeCalls= False, slowestNodes= 0)
+        self.baselines: dict[str, int] = {}
+        self.peaks: dict[str, int] = {}
+        # ^ Key: phase name
+        # ^ Value: its peak memory in bytes, above the memory in use when it started
+
+    def beginPhase(self, name: str) -> dict[str, int]:
+        tracemalloc.reset_peak()
+        self.baselines[name] = tracemalloc.get_traced_memory()[0]
+        return super().beginPhase(name)
+
+    def recordPhase(self, name: str, start: float, seconds: float, callsBefore: dict[str, int] | None = None):
+        peak = tracemalloc.get_traced_memory()[1] - self.baselines[name]
+        self.peaks[name] = max(self.peaks.get(name, 0), peak)
+        super().recordPhase(name, start, seconds, callsBefore)
+
+### }}}
+
+# {{{ topologies: every one of them builds a scene of about the given number of nodes
+def addMaterial(scene: FakeSceneBackend, index: int) -> str:
+    return scene.addNode(f"aiStandardSurface{index}", "aiStandardSurface", base= 0.9, baseColor= (0.5, 0.4, 0.3), specularRoughness= 0.35)
+
+def addTexture(scene: FakeSceneBackend, index: int) -> str:
+    return scene.addNode(f"file{index}", "file", fileTextureName= f"/textures/texture{index}.exr", colorSpace= "sRGB")
+
+def buildSingle(scene: FakeSceneBackend, nodes: int):
+    # separate materials, each with a texture on its base color that also drives a normal map
+    for i in range(max(1, nodes // 3)):
+        material, texture = addMaterial(scene, i), addTexture(scene, i)
+        normalMap = scene.addNode(f"aiNormalMap{i}", "aiNormalMap", strength= 0.5)
+        scene.connectAttr(f"{texture}.outColor", f"{material}.baseColor")
+        scene.connectAttr(f"{texture}.outColor", f"{normalMap}.input")
+        scene.connectAttr(f"{normalMap}.outValue", f"{material}.normalCamera")
+
+def buildFanIn(scene: FakeSceneBackend, nodes: int):
+    # materials with a texture on every input in FANININPUTS
+    surfaceSchema = scene.schemas["aiStandardSurface"]
+    inputs = [attr for attr in FANININPUTS if surfaceSchema.get(attr) != None]
+    textureIndex = 0
+    for i in range(max(1, nodes // (len(inputs) + 1))):
+        material = addMaterial(scene, i)
+        for attr in inputs:
+            texture = addTexture(scene, textureIndex)
+            textureIndex += 1
+            output = "outColor" if len(surfaceSchema.get(attr).children) != 0 else "outColorR"
+            scene.connectAttr(f"{texture}.{output}", f"{material}.{attr}")
+
+def buildDeepChain(scene: FakeSceneBackend, nodes: int):
+    # a single texture -> normal map -> normal map -> ... -> material chain, as deep as the scene is big
+    material, texture = addMaterial(scene, 0), addTexture(scene, 0)
+    previous = f"{texture}.outColor"
+    for i in range(max(1, nodes - 2)):
+        normalMap = scene.addNode(f"aiNormalMap{i}", "aiNormalMap")
+        scene.connectAttr(previous, f"{normalMap}.input")
+        previous = f"{normalMap}.outValue"
+    scene.connectAttr(previous, f"{material}.normalCamera")
+
+def buildDiamond(scene: FakeSceneBackend, nodes: int):
+    # materials sharing a small set of textures, every texture reaching its materials both directly and through a normal map
+    materials = max(1, nodes * 10 // 21)
+    textures = [addTexture(scene, i) for i in range(max(1, materials // 10))]
+    for i in range(materials):
+        material, texture = addMaterial(scene, i), textures[i % len(textures)]
+        normalMap = scene.addNode(f"aiNormalMap{i}", "aiNormalMap")
+        scene.connectAttr(f"{texture}.outColor", f"{material}.baseColor")
+        scene.connectAttr(f"{texture}.outColor", f"{normalMap}.input")
+        scene.connectAttr(f"{normalMap}.outValue", f"{material}.normalCamera")
+
+def buildHub(scene: FakeSceneBackend, nodes: int):
+    # a single texture driving every material, directly and through a normal map of its own
+    texture = addTexture(scene, 0)
+    for i in range(max(1, (nodes - 1) // 2)):
+        material = addMaterial(scene, i)
+        normalMap = scene.addNode(f"aiNormalMap{i}", "aiNormalMap")
+        scene.connectAttr(f"{texture}.outColor", f"{material}.baseColor")
+        scene.connectAttr(f"{texture}.outColor", f"{normalMap}.input")
+        scene.connectAttr(f"{normalMap}.outValue", f"{material}.normalCamera")
+# }}}
+
+# Key: topology name
+# Value: function that builds a scene of the topology
+TOPOLOGIES = {
+    "single": buildSingle,
+    "fanIn": buildFanIn,
+    "deepChain": buildDeepChain,
+    "diamond": buildDiamond,
+    "hub": buildHub,
+}
+
+
+def buildScene(topology: str, nodes: int, schemas: dict) -> FakeSceneBackend:
+    scene = FakeSceneBackend(schemas)
+    TOPOLOGIES[topology](scene, nodes)
+    return scene
+
+
+def convertScene(scene: FakeSceneBackend, instrumentation: MtoA_to_MtoRM.Instrumentation) -> MtoA_to_MtoRM.ConversionReport:
+    '''
+    Converts every network of the given scene with MtoA_to_MtoRM.convertScene (crawl, then convertNodeTree in a ConversionTransaction),
+    recording its phases in the given instrumentation. Returns the ConversionReport.
+    '''
+
+    previousBackend = MtoA_to_MtoRM.setBackend(scene)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), instrumentation:
+            return MtoA_to_MtoRM.convertScene(FROMENGINE, TOENGINE, recordUndo= False)
+    finally:
+        MtoA_to_MtoRM.setBackend(previousBackend)
+
+
+def runSelectedCrawl(scene: FakeSceneBackend, root: str) -> dict:
+    '''
+    Crawls the networks of the given node the way main() does: selected, upstream and downstream.
+    Returns the wall time and the backend calls of the crawl, and the number of nodes it found.
+    '''
+
+    instrumentation = MtoA_to_MtoRM.Instrumentation(timeCalls= False)
+    previousBackend = MtoA_to_MtoRM.setBackend(scene)
+    try:
+        scene.select([root])
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), instrumentation:
+            graph = MtoA_to_MtoRM.crawlNodeTree(MtoA_to_MtoRM.getSelected())
+    finally:
+        MtoA_to_MtoRM.setBackend(previousBackend)
+
+    calls = {command: count for command, (count, _) in instrumentation.calls.items()}
+    return {"seconds": instrumentation.seconds, "calls": calls, "totalCalls": sum(calls.values()), "crawledNodes": len(graph)}
+
+
+def runPhases(scene: FakeSceneBackend, selectedRoot: str) -> dict[str, dict]:
+    '''
+    Converts every network of the given scene (see convertScene). Returns the wall time and the backend calls of every phase
+    the Instrumentation of the conversion recorded, keyed by phase name, and the total of the whole conversion under "total".
+    The crawl from the given selected node (see runSelectedCrawl) is run first, on the scene as it was built, under "crawl from selection".
+    '''
+
+    selectedCrawl = runSelectedCrawl(scene, selectedRoot)
+    instrumentation = MtoA_to_MtoRM.Instrumentation(timeCalls= False) # counting only, timing every call would skew the phase times
+    report = convertScene(scene, instrumentation)
+
+    phases: dict[str, dict] = {"crawl from selection": selectedCrawl}
+    for name, (_, seconds) in instrumentation.phases.items():
+        calls = instrumentation.phaseCalls.get(name, {})
+        phases[name] = {"seconds": seconds, "calls": calls, "totalCalls": sum(calls.values())}
+
+    calls = {command: count for command, (count, _) in instrumentation.calls.items()}
+    phases["total"] = {"seconds": instrumentation.seconds, "calls": calls, "totalCalls": sum(calls.values()),
+                       "convertedNodes": report.convertedNodes, "writes": report.writes, "connections": report.connections}
+
+    return phases
+
+
+def measurePeakMemory(topology: str, nodes: int, schemas: dict) -> dict[str, int]:
+    '''
+    Returns the peak memory (in bytes, as traced by tracemalloc) of every phase of a conversion of a fresh scene, and of the whole conversion under "total".
+    '''
+
+    scene = buildScene(topology, nodes, schemas)
+    instrumentation = MemoryInstrumentation()
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        convertScene(scene, instrumentation)
+        total = max([tracemalloc.get_traced_memory()[1] - baseline, *instrumentation.peaks.values()]) # the peak gets reset at the start of every phase
+    finally:
+        tracemalloc.stop()
+
+    return {**instrumentation.peaks, "total": total}
+
+
+def runCase(topology: str, nodes: int, schemas: dict, repeat: int, memory: bool) -> dict:
+    '''
+    Returns the results of a topology at a size: the best wall time of every phase out of repeat runs,
+    their backend calls, and their peak memory if memory is True.
+    '''
+
+    best: dict[str, dict] | None = None
+    sceneNodes = 0
+    for _ in range(repeat):
+        scene = buildScene(topology, nodes, schemas)
+        sceneNodes = len(scene.nodeTypes)
+        gc.collect()
+        phases = runPhases(scene, SELECTEDROOTS[topology])
+        if best == None:
+            best = phases
+        else:
+            for name, phase in phases.items():
+                best[name]["seconds"] = min(best[name]["seconds"], phase["seconds"])
+
+    if memory:
+        for name, peak in measurePeakMemory(topology, nodes, schemas).items():
+            if name in best:
+                best[name]["peakBytes"] = peak
+
+    return {"topology": topology, "size": nodes, "nodes": sceneNodes, "phases": best, "seconds": best["total"]["seconds"]}
+
+
+def getScalingExponents(cases: list[dict]) -> dict[str, dict[str, float]]:
+    '''
+    Returns how the time of every phase grows with the number of nodes for every topology: the exponent k of time ~ nodes^k,
+    between the two largest sizes of the topology. Keyed by topology, then by phase.
+    '''
+
+    exponents: dict[str, dict[str, float]] = {}
+    for topology in dict.fromkeys(case["topology"] for case in cases):
+        topologyCases = sorted((case for case in cases if case["topology"] == topology), key= lambda case: case["nodes"])
+        if len(topologyCases) < 2:
+            continue
+        small, large = topologyCases[-2], topologyCases[-1]
+        if small["nodes"] == large["nodes"]:
+            continue
+        exponents[topology] = {}
+        for name in large["phases"]:
+            smallSeconds, largeSeconds = small["phases"][name]["seconds"], large["phases"][name]["seconds"]
+            if smallSeconds > 0 and largeSeconds > 0:
+                exponents[topology][name] = math.log(largeSeconds / smallSeconds) / math.log(large["nodes"] / small["nodes"])
+
+    return exponents
+
+
+def compareResults(results: dict, baseline: dict, threshold: float) -> list[str]:
+    '''
+    Returns the regressions of results compared to baseline: phases that got slower than threshold times their baseline time,
+    phases that make more backend calls or use more than threshold times their baseline peak memory, and phases that scale super-linearly.
+    '''
+
+    regressions: list[str] = []
+    baselineCases = {(case["topology"], case["size"]): case for case in baseline.get("cases", [])}
+
+    for case in results["cases"]:
+        previous = baselineCases.get((case["topology"], case["size"]))
+        if previous == None:
+            continue
+        for name, phase in case["phases"].items():
+            previousPhase = previous["phases"].get(name)
+            if previousPhase == None:
+                continue
+            label = f'{case["topology"]} ({case["nodes"]} nodes) {name}'
+            if phase["seconds"] > previousPhase["seconds"] * threshold and phase["seconds"] - previousPhase["seconds"] > 0.01: # tiny cases are all noise
+                regressions.append(f'{label}: {previousPhase["seconds"]:.3f}s -> {phase["seconds"]:.3f}s')
+            if phase["totalCalls"] > previousPhase["totalCalls"]:
+                regressions.append(f'{label}: {previousPhase["totalCalls"]} -> {phase["totalCalls"]} backend calls')
+            if "peakBytes" in phase and "peakBytes" in previousPhase and phase["peakBytes"] > previousPhase["peakBytes"] * threshold and phase["peakBytes"] - previousPhase["peakBytes"] > 1 << 20:
+                regressions.append(f'{label}: {previousPhase["peakBytes"] / (1 << 20):.1f}MB -> {phase["peakBytes"] / (1 << 20):.1f}MB peak memory')
+
+    for topology, phases in results["scaling"].items():
+        for name, exponent in phases.items():
+            if exponent > SUPERLINEAREXPONENT:
+                regressions.append(f"{topology} {name}: scales super-linearly (time ~ nodes^{exponent:.2f})")
+
+    return regressions
+
+
+def printCase(case: dict):
+    phases = "  ".join(f'{name} {phase["seconds"]:.3f}s/{phase["totalCalls"]} calls' + (f'/{phase["peakBytes"] / (1 << 20):.1f}MB' if "peakBytes" in phase else "") for name, phase in case["phases"].items())
+    print(f'{case["topology"]:>10} {case["nodes"]:>7} nodes  {case["seconds"]:8.3f}s  {phases}')
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description= "Measures how the converter scales on synthetic Arnold networks, without Maya.")
+    parser.add_argument("--topologies", default= ",".join(TOPOLOGIES), help= "comma separated topologies to run (default: %(default)s)")
+    parser.add_argument("--sizes", default= ",".join(str(size) for size in SIZES), help= "comma separated scene sizes in nodes (default: %(default)s)")
+    parser.add_argument("--repeat", type= int, default= 1, help= "runs per case, the fastest one counts (default: %(default)s)")
+    parser.add_argument("--no-memory", action= "store_true", help= "don't measure peak memory (it takes a second, slower run per case)")
+    parser.add_argument("--schema", action= "append", default= [], help= "schema snapshot to use instead of the schemas inferred from the conversion dicts (see MtoA_to_MtoRM.captureEngineSchemas)")
+    parser.add_argument("--output", default= None, help= "write the results to this JSON file")
+    parser.add_argument("--compare", default= None, help= "compare the results to the results file of a previous run, exit with 1 on regressions")
+    parser.add_argument("--threshold", type= float, default= 1.5, help= "a phase regressed if it takes this many times its previous time or memory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    topologies = [topology for topology in args.topologies.split(",") if topology != ""]
+    for topology in topologies:
+        if topology not in TOPOLOGIES:
+            parser.error(f"unknown topology: {topology}")
+    sizes = [int(size) for size in args.sizes.split(",") if size != ""]
+
+    # {{{ every schema is known up front, so no phase pays for capturing them
+    schemas: dict = {}
+    for engine in (FROMENGINE, TOENGINE):
+        MtoA_to_MtoRM.nodeSchemaCache[engine] = inferSchemas(engine)
+    for path in args.schema:
+        data = MtoA_to_MtoRM.readSchemaSnapshotFile(path)
+        if data == None:
+            parser.error(f"{path} isn't a usable schema snapshot")
+        MtoA_to_MtoRM.nodeSchemaCache[data["engine"]] = {nodeType: MtoA_to_MtoRM.NodeSchema.fromDict(nodeType, attributes) for nodeType, attributes in data["nodeTypes"].items()}
+    for engine in (FROMENGINE, TOENGINE):
+        schemas.update(MtoA_to_MtoRM.nodeSchemaCache[engine])
+    MtoA_to_MtoRM.conversionPlanCache.clear()
+    for nodeType in MtoA_to_MtoRM.ENGINECONVERSIONS[MtoA_to_MtoRM.FROMENGINES[FROMENGINE]]:
+        MtoA_to_MtoRM.getConversionPlan(FROMENGINE, TOENGINE, nodeType) # and neither for compiling the plans
+    # }}}
+
+    results: dict = {
+        "formatVersion": RESULTSFORMATVERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fromEngine": FROMENGINE,
+        "toEngine": TOENGINE,
+        "cases": [],
+    }
+
+    for topology in topologies:
+        for size in sizes:
+            case = runCase(topology, size, schemas, max(1, args.repeat), not args.no_memory)
+            results["cases"].append(case)
+            printCase(case)
+
+    results["scaling"] = getScalingExponents(results["cases"])
+    for topology, phases in results["scaling"].items():
+        print(f"{topology:>10} scaling: " + "  ".join(f"{name} nodes^{exponent:.2f}" for name, exponent in phases.items()))
+
+    if args.output != None:
+        with open(args.output, "w", encoding= "utf-8") as f:
+            json.dump(results, f, indent= 1)
+
+    if args.compare != None:
+        with open(args.compare, "r", encoding= "utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("formatVersion") != RESULTSFORMATVERSION:
+            print(f"! Node converter benchmark: {args.compare} was written by a different version of the benchmark, not comparing.")
+            return 1
+        regressions = compareResults(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"! Regression: {regression}")
+        if len(regressions) != 0:
+            return 1
+        print(f"No regressions compared to {args.compare}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
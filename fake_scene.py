@@ -0,0 +1,445 @@
+import os
+
+from MtoA_to_MtoRM import AttributeSchema, ENGINECONVERSIONS, ENGINEPLUGINS, FROMENGINES, NodeSchema, NUMERICCOMPOUNDTYPES, TOENGINES, getTargetField, readSchemaSnapshotFile, splitPlug
+
+# In-memory stand-in for a Maya scene, for running (and measuring) the converter without Maya, e.g.:
+#   import MtoA_to_MtoRM, fake_scene
+#   scene = fake_scene.FakeSceneBackend.fromSchemaSnapshots(["schemas/Arnold-5.4.0.json", "schemas/RenderMan-26.1.json"])
+#   scene.addNode("aiStandardSurface1", "aiStandardSurface", baseColor= (0.5, 0.5, 0.5))
+#   MtoA_to_MtoRM.setBackend(scene)
+#   MtoA_to_MtoRM.convertScene("Arnold", "RenderMan")
+# Node types are described by NodeSchemas (see MtoA_to_MtoRM.getNodeSchema), e.g.: the schema snapshots captured in Maya,
+# or, when there are none at hand, the ones inferSchemas makes up from the conversion dicts.
+
+
+### {{{ class definitions
+
+class FakeSceneBackend:
+    '''
+    Command backend (see MtoA_to_MtoRM.setBackend) that keeps a scene in memory and answers to the commands of the converter
+    with maya.cmds' flags and return values. Attributes that have never been set report the default of their schema.
+    Nodes can be of types without a schema, those have no attributes to get or set (other than the ones added with addAttr).
+    - schemas = NodeSchemas of the node types the scene knows about, keyed by node type
+    '''
+    def __init__(self, schemas: dict[str, NodeSchema] | None = None, pluginVersions: dict[str, str] | None = None):
+        self.schemas: dict[str, NodeSchema] = dict(schemas) if schemas != None else {}
+        self.pluginVersions: dict[str, str] = dict(pluginVersions) if pluginVersions != None else {}
+        # ^ Key: plugin name
+        # ^ Value: version reported by pluginInfo
+        self.nodeTypes: dict[str, str] = {}
+        # ^ Key: node name
+        # ^ Value: node type
+        self.values: dict[str, dict[str, object]] = {}
+        # ^ Key: node name
+        # ^ Value: values set on the node, keyed by attribute name. Only nodes that have any are in it.
+        self.dynamicAttrs: dict[str, dict[str, AttributeSchema]] = {}
+        # ^ Key: node name
+        # ^ Value: attributes added with addAttr, keyed by attribute name
+        self.inputs: dict[str, dict[str, str]] = {}
+        # ^ Key: node name
+        # ^ Value: source plug of every connected attribute of the node, keyed by attribute name
+        self.outputs: dict[str, list[tuple[str, str]]] = {}
+        # ^ Key: node name
+        # ^ Value: (source plug, destination plug) of every connection going out of the node
+        self.selection: list[str] = []
+        self.nameCounters: dict[str, int] = {}
+        self.workspaceRoot: str = os.getcwd() # root folder of the project, see workspace
+
+    @classmethod
+    def fromSchemaSnapshots(cls, paths: list[str]) -> "FakeSceneBackend":
+        '''
+        Returns an empty scene that knows the node types of the given schema snapshots (see MtoA_to_MtoRM.saveSchemaSnapshot),
+        and reports the plugin versions they were captured with.
+        '''
+
+        scene = cls()
+        for path in paths:
+            data = readSchemaSnapshotFile(path)
+            if data == None:
+                raise ValueError(f'! Node converter: "{path}" isn\'t a usable schema snapshot.')
+            scene.schemas.update({nodeType: NodeSchema.fromDict(nodeType, attributes) for nodeType, attributes in data["nodeTypes"].items()})
+            plugin = ENGINEPLUGINS.get(data["engine"])
+            if plugin != None:
+                scene.pluginVersions[plugin] = data["pluginVersion"]
+
+        return scene
+
+    @classmethod
+    def fromConversionDicts(cls, engines: list[str]) -> "FakeSceneBackend":
+        '''
+        Returns an empty scene that knows the node types of the given engines, with schemas made up by inferSchemas.
+        '''
+
+        scene = cls()
+        for engine in engines:
+            scene.schemas.update(inferSchemas(engine))
+
+        return scene
+
+    # {{{ building scenes
+    def addNode(self, name: str, nodeType: str, **values) -> str:
+        '''
+        Adds a node of the given type under the given name (if it's free, see createNode), with the given attribute values.
+        Returns the name of the node.
+        '''
+
+        nodeName = self.createNode(nodeType, name= name)
+        for attr, value in values.items():
+            if isinstance(value, (tuple, list)):
+                self.setAttr(f"{nodeName}.{attr}", *value)
+            else:
+                self.setAttr(f"{nodeName}.{attr}", value)
+
+        return nodeName
+
+    def select(self, nodeNames, replace: bool = True):
+        nodeNames = flatten([nodeNames])
+        self.selection = nodeNames if replace else self.selection + nodeNames
+    # }}}
+
+    # {{{ attribute lookup
+    def getAttributeSchema(self, nodeName: str, attr: str) -> AttributeSchema | None:
+        '''
+        Returns the schema of the given attribute (long or short name) of the given node, or None if the node has no such attribute.
+        '''
+
+        schema = self.schemas.get(self.nodeTypes.get(nodeName))
+        if schema != None:
+            attribute = schema.get(attr)
+            if attribute == None and attr in schema.shortNames:
+                attribute = schema.get(schema.shortNames[attr])
+            if attribute != None:
+                return attribute
+
+        dynamicAttrs = self.dynamicAttrs.get(nodeName)
+        if dynamicAttrs != None:
+            return dynamicAttrs.get(attr)
+        return None
+
+    def resolvePlug(self, plug: str) -> tuple[str, AttributeSchema]:
+        '''
+        Returns the node and the attribute schema of the given plug, raising the way maya.cmds does if it doesn't exist.
+        '''
+
+        nodeName, attr = splitPlug(plug)
+        attribute = self.getAttributeSchema(nodeName, attr) if nodeName in self.nodeTypes else None
+        if attribute == None:
+            raise ValueError(f"No object matches name: {plug}")
+
+        return nodeName, attribute
+
+    def resolveConnectionPlug(self, plug: str) -> tuple[str, str]:
+        '''
+        Returns the node and the long attribute name of the given plug. Nodes of types without a schema take connections
+        on any attribute, so the networks around them can still be crawled.
+        '''
+
+        nodeName, attr = splitPlug(plug)
+        if nodeName in self.nodeTypes and self.nodeTypes[nodeName] not in self.schemas and self.getAttributeSchema(nodeName, attr) == None:
+            return nodeName, attr
+
+        nodeName, attribute = self.resolvePlug(plug)
+        return nodeName, attribute.name
+
+    def getParentSchema(self, nodeName: str, attribute: AttributeSchema) -> AttributeSchema:
+        return self.getAttributeSchema(nodeName, attribute.parent)
+    # }}}
+
+    # {{{ nodes
+    def createNode(self, nodeType: str, name: str | None = None, n: str | None = None, skipSelect: bool = False, **kwargs) -> str:
+        name = name or n
+        if name == None or name in self.nodeTypes:
+            base = name if name != None else nodeType
+            counter = self.nameCounters.get(base, 0)
+            while True:
+                counter += 1
+                if f"{base}{counter}" not in self.nodeTypes:
+                    break
+            self.nameCounters[base] = counter
+            name = f"{base}{counter}"
+
+        self.nodeTypes[name] = nodeType
+        if not skipSelect:
+            self.selection = [name]
+
+        return name
+
+    def shadingNode(self, nodeType: str, asShader: bool = False, asTexture: bool = False, asUtility: bool = False, name: str | None = None, **kwargs) -> str:
+        return self.createNode(nodeType, name= name, skipSelect= True)
+
+    def delete(self, *nodeNames):
+        for nodeName in flatten(nodeNames):
+            if nodeName not in self.nodeTypes:
+                raise ValueError(f"No object matches name: {nodeName}")
+            for dstAttr, srcPlug in list(self.inputs.get(nodeName, {}).items()):
+                self.disconnectAttr(srcPlug, f"{nodeName}.{dstAttr}")
+            for srcPlug, dstPlug in list(self.outputs.get(nodeName, [])):
+                self.disconnectAttr(srcPlug, dstPlug)
+            for table in (self.nodeTypes, self.values, self.dynamicAttrs, self.inputs, self.outputs):
+                table.pop(nodeName, None)
+            self.nameCounters.pop(nodeName.rstrip("0123456789"), None) # like Maya, the next node of the name can take the freed number
+            if nodeName in self.selection:
+                self.selection.remove(nodeName)
+
+    def ls(self, *names, type: str | list[str] | None = None, long: bool = False, showType: bool = False, selection: bool = False, **kwargs) -> list[str]:
+        if selection:
+            nodeNames = [nodeName for nodeName in self.selection if nodeName in self.nodeTypes]
+        elif len(names) != 0:
+            nodeNames = list(dict.fromkeys(nodeName for nodeName in flatten(names) if nodeName in self.nodeTypes))
+        else:
+            nodeNames = list(self.nodeTypes)
+
+        if type != None:
+            types = {type} if isinstance(type, str) else set(type)
+            nodeNames = [nodeName for nodeName in nodeNames if self.nodeTypes[nodeName] in types]
+
+        if not showType:
+            return nodeNames
+        return [x for nodeName in nodeNames for x in (nodeName, self.nodeTypes[nodeName])]
+
+    def nodeType(self, nodeName: str) -> str:
+        if nodeName not in self.nodeTypes:
+            raise RuntimeError(f"No object matches name: {nodeName}")
+        return self.nodeTypes[nodeName]
+
+    def objExists(self, name: str) -> bool:
+        nodeName, attr = splitPlug(name)
+        if nodeName not in self.nodeTypes:
+            return False
+        return attr == "" or self.getAttributeSchema(nodeName, attr) != None
+    # }}}
+
+    # {{{ attributes
+    def listAttr(self, nodeName: str, **kwargs) -> list[str]:
+        schema = self.schemas.get(self.nodeType(nodeName))
+        attrs = list(schema.attributes) if schema != None else []
+        attrs.extend(self.dynamicAttrs.get(nodeName, {}))
+        return attrs
+
+    def attributeQuery(self, attr: str, node: str, listDefault: bool = False, shortName: bool = False, listChildren: bool = False, listParent: bool = False, exists: bool = False, **kwargs):
+        attribute = self.getAttributeSchema(node, attr)
+        if exists:
+            return attribute != None
+        if attribute == None:
+            raise RuntimeError(f"No attribute named {attr} on {node}")
+        if listDefault:
+            return list(attribute.default) if isinstance(attribute.default, tuple) else [attribute.default]
+        if shortName:
+            return attribute.shortName
+        if listChildren:
+            return list(attribute.children) if len(attribute.children) != 0 else None
+        if listParent:
+            return [attribute.parent] if attribute.parent != None else None
+        return None
+
+    def addAttr(self, nodeName: str, longName: str, shortName: str | None = None, dataType: str | None = None, attributeType: str | None = None, defaultValue=None, **kwargs):
+        if self.getAttributeSchema(nodeName, longName) != None:
+            raise RuntimeError(f"Found more than one attribute named {longName} on {nodeName}")
+        self.nodeType(nodeName) # raises if the node doesn't exist
+        self.dynamicAttrs.setdefault(nodeName, {})[longName] = AttributeSchema(name= longName, shortName= shortName or longName, type= dataType or attributeType or "double", default= defaultValue, children= (), parent= None)
+
+    def getAttr(self, plug: str, typ: bool = False, type: bool = False, **kwargs):
+        nodeName, attribute = self.resolvePlug(plug)
+        if typ or type:
+            return attribute.type
+
+        values = self.values.get(nodeName, {})
+        if len(attribute.children) != 0:
+            value = values.get(attribute.name)
+            if value == None:
+                value = tuple(self.getAttr(f"{nodeName}.{child}") for child in attribute.children)
+            return [tuple(value)] # compounds come back as [(x, y, z)]
+
+        if attribute.name in values:
+            return values[attribute.name]
+        if attribute.parent != None and attribute.parent in values:
+            parent = self.getParentSchema(nodeName, attribute)
+            return values[attribute.parent][parent.children.index(attribute.name)]
+        return coerceValue(attribute.default, attribute.type)
+
+    def setAttr(self, plug: str, *values, typ: str | None = None, type: str | None = None, **kwargs):
+        nodeName, attribute = self.resolvePlug(plug)
+        inputs = self.inputs.get(nodeName, {})
+        if attribute.name in inputs or attribute.parent in inputs or any(child in inputs for child in attribute.children): # like Maya, connected attributes (or compounds) can't be set
+            raise RuntimeError(f"setAttr: The attribute '{nodeName}.{attribute.name}' is locked or connected and cannot be modified.")
+        nodeValues = self.values.setdefault(nodeName, {})
+
+        if len(attribute.children) != 0:
+            if len(values) != len(attribute.children):
+                raise RuntimeError(f"Error while parsing arguments: {plug} takes {len(attribute.children)} values")
+            children = [self.getAttributeSchema(nodeName, child) for child in attribute.children]
+            nodeValues[attribute.name] = tuple(coerceValue(value, child.type) for value, child in zip(values, children))
+            for child in attribute.children:
+                nodeValues.pop(child, None)
+            return
+
+        if len(values) != 1:
+            raise RuntimeError(f"Error while parsing arguments: {plug} takes a single value")
+
+        value = coerceValue(values[0], attribute.type)
+        if attribute.parent != None and attribute.parent in nodeValues:
+            parent = self.getParentSchema(nodeName, attribute)
+            components = list(nodeValues[attribute.parent])
+            components[parent.children.index(attribute.name)] = value
+            nodeValues[attribute.parent] = tuple(components)
+        else:
+            nodeValues[attribute.name] = value
+    # }}}
+
+    # {{{ connections
+    def connectAttr(self, srcPlug: str, dstPlug: str, force: bool = False, **kwargs):
+        srcNode, srcAttr = self.resolveConnectionPlug(srcPlug)
+        dstNode, dstAttr = self.resolveConnectionPlug(dstPlug)
+        srcPlug = f"{srcNode}.{srcAttr}"
+        dstPlug = f"{dstNode}.{dstAttr}"
+
+        previous = self.inputs.get(dstNode, {}).get(dstAttr)
+        if previous == srcPlug:
+            raise RuntimeError(f"'{srcPlug}' is already connected to '{dstPlug}'.")
+        if previous != None:
+            if not force:
+                raise RuntimeError(f"'{dstPlug}' already has an incoming connection from '{previous}'.")
+            self.disconnectAttr(previous, dstPlug)
+
+        self.inputs.setdefault(dstNode, {})[dstAttr] = srcPlug
+        self.outputs.setdefault(srcNode, []).append((srcPlug, dstPlug))
+
+    def disconnectAttr(self, srcPlug: str, dstPlug: str, **kwargs):
+        srcNode, srcAttr = self.resolveConnectionPlug(srcPlug)
+        dstNode, dstAttr = self.resolveConnectionPlug(dstPlug)
+        srcPlug = f"{srcNode}.{srcAttr}"
+        dstPlug = f"{dstNode}.{dstAttr}"
+
+        if self.inputs.get(dstNode, {}).get(dstAttr) != srcPlug:
+            raise RuntimeError(f"There is no connection from '{srcPlug}' to '{dstPlug}' to disconnect")
+
+        del self.inputs[dstNode][dstAttr]
+        self.outputs[srcNode].remove((srcPlug, dstPlug))
+
+    def listConnections(self, items, c: bool = False, s: bool = True, d: bool = True, fnn: bool = False, plugs: bool = False, source: bool | None = None, destination: bool | None = None, **kwargs) -> list[str] | None:
+        s = source if source != None else s
+        d = destination if destination != None else d
+
+        result: list[str] = []
+        for item in flatten([items]):
+            nodeName, attr = splitPlug(item)
+            if nodeName not in self.nodeTypes:
+                raise ValueError(f"No object matches name: {item}")
+            if attr != "":
+                attr = self.resolveConnectionPlug(item)[1]
+
+            connections: list[tuple[str, str]] = []
+            # ^ (own plug, other plug)
+            if s:
+                connections.extend((f"{nodeName}.{dstAttr}", srcPlug) for dstAttr, srcPlug in self.inputs.get(nodeName, {}).items())
+            if d:
+                connections.extend(self.outputs.get(nodeName, []))
+
+            for ownPlug, otherPlug in connections:
+                if attr != "" and splitPlug(ownPlug)[1] != attr:
+                    continue
+                if c:
+                    result.append(ownPlug)
+                result.append(otherPlug if plugs else splitPlug(otherPlug)[0])
+
+        return result if len(result) != 0 else None
+    # }}}
+
+    # {{{ session
+    def workspace(self, query: bool = False, rootDirectory: bool = False, **kwargs) -> str | None:
+        if query and rootDirectory:
+            return self.workspaceRoot.replace(os.sep, "/").rstrip("/") + "/" # like Maya, with forward slashes and a trailing one
+        return None
+
+    def undoInfo(self, query: bool = False, state: bool = False, **kwargs):
+        return True if query else None # there is no undo queue, undo chunks have nothing to do
+
+    def pluginInfo(self, plugin: str, query: bool = False, version: bool = False, loaded: bool = False, **kwargs):
+        if loaded:
+            return plugin in self.pluginVersions
+        if plugin not in self.pluginVersions:
+            raise RuntimeError(f"Plug-in, \"{plugin}\", was not found")
+        return self.pluginVersions[plugin]
+    # }}}
+
+### }}}
+
+
+def flatten(items) -> list[str]:
+    '''
+    Returns the given names and lists of names as a single list, the way maya.cmds takes them.
+    '''
+
+    names: list[str] = []
+    for item in items:
+        if isinstance(item, (list, tuple)):
+            names.extend(flatten(item))
+        elif item != None:
+            names.append(item)
+
+    return names
+
+
+def coerceValue(value, attrType: str | None):
+    '''
+    Returns the given value as maya.cmds.getAttr would return it from an attribute of the given type.
+    '''
+
+    if value == None:
+        return None
+    if attrType == "bool":
+        return bool(value)
+    if attrType in ("enum", "long", "short", "byte"):
+        return int(value)
+    if attrType in ("float", "double", "doubleLinear", "doubleAngle", "time"):
+        return float(value)
+    if attrType in NUMERICCOMPOUNDTYPES and isinstance(value, (tuple, list)):
+        return tuple(value)
+    return value
+
+
+def inferNodeSchema(nodeType: str, attrs: dict[str, str]) -> NodeSchema:
+    '''
+    Returns a made up NodeSchema with the given attributes, see inferSchemas.
+    - attrs = Key: name of the attribute in the conversion dict (fromEngine or common name), Value: attribute name
+    '''
+
+    children: dict[str, tuple[str, ...]] = {}
+    for key, attr in attrs.items():
+        for suffixes in (("R", "G", "B"), ("X", "Y", "Z")):
+            if all(f"{key}{suffix}" in attrs for suffix in suffixes):
+                children[attr] = tuple(attrs[f"{key}{suffix}"] for suffix in suffixes)
+    parents = {child: parent for parent, childAttrs in children.items() for child in childAttrs}
+
+    attributes: dict[str, AttributeSchema] = {}
+    for attr in dict.fromkeys(attrs.values()):
+        if attr in children:
+            attrType, default = "float3", (0.0, 0.0, 0.0)
+        elif attr.lower().endswith("name") or attr == "colorSpace":
+            attrType, default = "string", None
+        else:
+            attrType, default = "float", 0.0
+        attributes[attr] = AttributeSchema(name= attr, shortName= attr, type= attrType, default= default, children= children.get(attr, ()), parent= parents.get(attr))
+
+    return NodeSchema(nodeType, attributes)
+
+
+def inferSchemas(engine: str) -> dict[str, NodeSchema]:
+    '''
+    Returns NodeSchemas of the given engine's node types, made up from its conversion dicts for when no schema snapshot is at hand:
+    attributes whose R, G, B (or X, Y, Z) children are in the dicts too are float3 compounds, names and color spaces are strings,
+    everything else is a float. Good enough for running and measuring conversions, not for converting real scenes.
+    '''
+
+    schemas: dict[str, NodeSchema] = {}
+
+    for nodeType, nodeFields in ENGINECONVERSIONS.get(FROMENGINES.get(engine), {}).items():
+        schemas[nodeType] = inferNodeSchema(nodeType, {attr: attr for attr in nodeFields if attr != "nodeTypeName"})
+
+    for toFields in ENGINECONVERSIONS.get(TOENGINES.get(engine), {}).values():
+        attrs = {commonName: getTargetField(field)[0] for commonName, field in toFields.items() if commonName != "nodeTypeName"}
+        if toFields["nodeTypeName"] in schemas: # the node type is in the fromEngine dicts too
+            attrs.update({attr: attr for attr in schemas[toFields["nodeTypeName"]].attributes})
+        schemas[toFields["nodeTypeName"]] = inferNodeSchema(toFields["nodeTypeName"], attrs)
+
+    return schemas
@@ -0,0 +1,339 @@
+import argparse
+import mmap
+import os
+import re
+import sys
+import time
+
+import MtoA_to_MtoRM
+from fake_scene import FakeSceneBackend
+from MtoA_to_MtoRM import NodeSchema, splitPlug
+
+# Maya-free converter for Maya ASCII (.ma) scene files.
+# Run it with Python 3.10 or newer, e.g.:
+#   python ma_convert.py scene.ma --schema schemas/Arnold-5.4.0.json --schema schemas/RenderMan-26.1.json
+# The file is scanned once, statement by statement, through a memory map, and only the shading nodes the conversion dicts
+# know about (and the connections into them) are kept in memory. The regular conversion (see MtoA_to_MtoRM.convertScene)
+# then runs against that shading graph (see fake_scene.FakeSceneBackend) in emitter mode (see MtoA_to_MtoRM.ConversionEmitter),
+# and the converted nodes are written after a streamed copy of the original file.
+# Without Maya there is nothing to capture node schemas from, they come from schema snapshots instead:
+# set MtoA_to_MtoRM.SCHEMASNAPSHOTDIR and run MtoA_to_MtoRM.captureEngineSchemas(engine) for both engines inside Maya once.
+
+
+### {{{ CONSTANT definitions
+
+# One MEL statement: leading whitespace and comments, the command ("command" group) and its arguments ("args" group) up to the closing semicolon.
+# Semicolons inside strings and comments don't end a statement. The loops are unrolled and the leading space and the arguments are matched
+# atomically (a lookahead, then a backreference to it), so a statement that never ends (e.g.: the comment at the end of the file) fails in linear time.
+STATEMENTPATTERN = re.compile(rb'(?=(?P<space>\s*(?://[^\n]*\n?\s*)*))(?P=space)(?P<command>\w+)\b'
+                              rb'(?=(?P<args>[^";/]*(?:(?:"[^"\\]*(?:\\.[^"\\]*)*"|//[^\n]*\n|/(?!/))[^";/]*)*))(?P=args);')
+
+# One argument of a statement: a quoted string (group 1) or a bare word (group 2)
+TOKENPATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+
+# MEL string escapes
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+# Booleans the way Maya writes them into .ma files
+BOOLWORDS = {"yes": True, "on": True, "true": True, "no": False, "off": False, "false": False}
+
+# Number of bytes copied from the original file at a time
+COPYCHUNKSIZE = 1 << 24
+
+### }}}
+
+### {{{ class definitions
+
+class MayaAsciiScene:
+    '''
+    The shading graph of a .ma file, loaded into a FakeSceneBackend (see parse): every node with its type,
+    and the attribute values and incoming connections of the nodes that have a fromEngine conversion dict.
+    - schemas = fromEngine NodeSchemas of the convertible node types, keyed by node type
+    '''
+    def __init__(self, path: str, schemas: dict[str, NodeSchema]):
+        self.path: str = path
+        self.backend: FakeSceneBackend = FakeSceneBackend(schemas)
+        self.requiredPlugins: set[str] = set()
+        self.requiresEnd: int = 0 # offset right after the last requires statement, where new ones can be inserted
+
+    def isConvertible(self, nodeName: str | None) -> bool:
+        return self.backend.nodeTypes.get(nodeName) in self.backend.schemas
+
+    def parse(self) -> "MayaAsciiScene":
+        '''
+        Scans the file for the statements that make up its shading graph. Returns the scene itself.
+        '''
+
+        currentNode: str | None = None
+        connections: list[tuple[str, str]] = []
+        # ^ (source plug, destination plug) of the connections going into convertible nodes, made once every node is known
+
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access= mmap.ACCESS_READ) as mm:
+            for match in STATEMENTPATTERN.finditer(mm):
+                command = match["command"]
+
+                if command == b"createNode":
+                    tokens = tokenize(match["args"])
+                    nodeType, nodeName = tokens[0][0], getFlagValue(tokens, "-n")
+                    parent = getFlagValue(tokens, "-p")
+                    if nodeName == None:
+                        currentNode = None
+                        continue
+                    if parent != None: # DAG nodes aren't shading nodes, but keep their names unique anyway
+                        nodeName = f"{parent}|{nodeName}"
+                    self.backend.createNode(nodeType, name= nodeName, skipSelect= True)
+                    currentNode = nodeName if self.isConvertible(nodeName) else None
+
+                elif command == b"setAttr":
+                    if currentNode != None:
+                        self.parseSetAttr(currentNode, tokenize(match["args"]))
+
+                elif command == b"select":
+                    tokens = tokenize(match["args"])
+                    nodeName = tokens[-1][0] if len(tokens) != 0 else None
+                    currentNode = nodeName if self.isConvertible(nodeName) else None
+
+                elif command == b"connectAttr":
+                    plugs = [text for text, quoted in tokenize(match["args"]) if quoted]
+                    if len(plugs) >= 2 and self.isConvertible(splitPlug(plugs[1])[0]):
+                        connections.append((plugs[0], plugs[1]))
+
+                elif command == b"requires":
+                    tokens = tokenize(match["args"])
+                    self.requiredPlugins.add(tokens[-2][0] if len(tokens) >= 2 else "")
+                    self.requiresEnd = match.end()
+
+        for srcPlug, dstPlug in connections:
+            if splitPlug(srcPlug)[0] in self.backend.nodeTypes: # Maya's default nodes (e.g.: ":time1") aren't created in the file, but can't lead to convertible nodes either
+                try:
+                    self.backend.connectAttr(srcPlug, dstPlug, force= True)
+                except (ValueError, RuntimeError): # attributes the schema snapshot doesn't know (e.g.: added by the user)
+                    pass
+
+        return self
+
+    def parseSetAttr(self, nodeName: str, tokens: list[tuple[str, bool]]):
+        '''
+        Sets the value of a setAttr statement on the given node.
+        Statements that set multi attributes, array sizes or non-numeric data (other than strings) are ignored, the conversion dicts don't use them.
+        '''
+
+        attrIndex = next((i for i, (text, quoted) in enumerate(tokens) if quoted), None)
+        if attrIndex == None:
+            return
+
+        plug = tokens[attrIndex][0]
+        if not plug.startswith("."):
+            nodeName, plug = splitPlug(plug)
+            if not self.isConvertible(nodeName):
+                return
+        attr = plug.lstrip(".")
+        if "[" in attr or "." in attr:
+            return
+
+        valueType: str | None = None
+        values: list[tuple[str, bool]] = []
+        rest = tokens[attrIndex+1:]
+        i = 0
+        while i < len(rest):
+            text, quoted = rest[i]
+            if text == "-type" and not quoted and i + 1 < len(rest):
+                valueType = rest[i+1][0]
+                i += 2
+                continue
+            if not quoted and text.startswith("-") and not isNumber(text):
+                i += 1
+                continue
+            values.append(rest[i])
+            i += 1
+
+        if len(values) == 0:
+            return
+
+        try:
+            if valueType == "string":
+                self.backend.setAttr(f"{nodeName}.{attr}", values[0][0], typ= "string")
+            else:
+                self.backend.setAttr(f"{nodeName}.{attr}", *(parseNumber(text) for text, quoted in values))
+        except (ValueError, RuntimeError): # matrices, component lists, attributes the schema snapshot doesn't know and such
+            pass
+
+### }}}
+
+
+def tokenize(data: bytes) -> list[tuple[str, bool]]:
+    '''
+    Returns the arguments of a statement as (text, quoted) pairs, with the escapes of quoted strings resolved.
+    '''
+
+    tokens: list[tuple[str, bool]] = []
+    for match in TOKENPATTERN.finditer(data.decode("utf-8", errors= "surrogateescape")):
+        if match.group(1) != None:
+            tokens.append((re.sub(r'\\(.)', lambda m: ESCAPES.get(m.group(1), m.group(1)), match.group(1)), True))
+        else:
+            tokens.append((match.group(2), False))
+
+    return tokens
+
+
+def getFlagValue(tokens: list[tuple[str, bool]], flag: str) -> str | None:
+    '''
+    Returns the argument following the given flag, or None if the flag isn't there.
+    '''
+
+    for i in range(len(tokens) - 1):
+        if tokens[i] == (flag, False):
+            return tokens[i+1][0]
+    return None
+
+
+def isNumber(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def parseNumber(text: str) -> int | float | bool:
+    '''
+    Returns the value of a bare setAttr argument: a bool (see BOOLWORDS), an int or a float.
+    '''
+
+    if text in BOOLWORDS:
+        return BOOLWORDS[text]
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def loadSchemas(paths: list[str]) -> dict[str, dict]:
+    '''
+    Reads the given schema snapshot files (see MtoA_to_MtoRM.saveSchemaSnapshot) into MtoA_to_MtoRM.nodeSchemaCache,
+    so the conversion never tries to capture schemas from Maya. Returns the contents of the files keyed by engine.
+    '''
+
+    snapshots: dict[str, dict] = {}
+    for path in paths:
+        data = MtoA_to_MtoRM.readSchemaSnapshotFile(path)
+        if data == None:
+            raise SystemExit(f'! Node converter: "{path}" isn\'t a usable schema snapshot.')
+        snapshots[data["engine"]] = data
+        MtoA_to_MtoRM.nodeSchemaCache[data["engine"]] = {nodeType: NodeSchema.fromDict(nodeType, attributes) for nodeType, attributes in data["nodeTypes"].items()}
+
+    return snapshots
+
+
+def getMissingSchemas(scene: MayaAsciiScene, fromEngine: str, toEngine: str) -> list[str]:
+    '''
+    Returns the node types that the conversion of the scene needs, but that have no schema in the loaded snapshots:
+    fromEngine types of the scene's nodes and the toEngine types they convert to.
+    '''
+
+    conversionFromDict = MtoA_to_MtoRM.ENGINECONVERSIONS.get(MtoA_to_MtoRM.FROMENGINES.get(fromEngine), {})
+    conversionToDict = MtoA_to_MtoRM.ENGINECONVERSIONS.get(MtoA_to_MtoRM.TOENGINES.get(toEngine), {})
+    sourceSchemas = MtoA_to_MtoRM.nodeSchemaCache.get(fromEngine, {})
+    targetSchemas = MtoA_to_MtoRM.nodeSchemaCache.get(toEngine, {})
+
+    missing: list[str] = []
+    for nodeType in set(scene.backend.nodeTypes.values()):
+        if nodeType not in conversionFromDict:
+            continue
+        if nodeType not in sourceSchemas:
+            missing.append(f"{nodeType} ({fromEngine})")
+        toFields = conversionToDict.get(conversionFromDict[nodeType]["nodeTypeName"][0].commonName)
+        if toFields != None and toFields["nodeTypeName"] not in targetSchemas and f"{toFields['nodeTypeName']} ({toEngine})" not in missing:
+            missing.append(f"{toFields['nodeTypeName']} ({toEngine})")
+
+    return missing
+
+
+def writeConvertedFile(scene: MayaAsciiScene, emitter: MtoA_to_MtoRM.ConversionEmitter, outputPath: str, requires: str | None):
+    '''
+    Writes a copy of the scene's file with the statements of the conversion appended,
+    and the given requires statement inserted after the file's own ones.
+    '''
+
+    tempPath = f"{outputPath}.tmp"
+    with open(scene.path, "rb") as f, mmap.mmap(f.fileno(), 0, access= mmap.ACCESS_READ) as mm, open(tempPath, "wb") as out:
+        insertAt = scene.requiresEnd if requires != None else len(mm)
+        for start in range(0, insertAt, COPYCHUNKSIZE):
+            out.write(mm[start:min(start + COPYCHUNKSIZE, insertAt)])
+        if requires != None:
+            out.write(f"\n{requires}".encode("utf-8"))
+        for start in range(insertAt, len(mm), COPYCHUNKSIZE):
+            out.write(mm[start:start + COPYCHUNKSIZE])
+
+        out.write(b"\n// Converted shading networks\n")
+        for statement in emitter.getMayaAsciiStatements():
+            out.write(statement.encode("utf-8", errors= "surrogateescape") + b"\n")
+
+    os.replace(tempPath, outputPath)
+
+
+def convertFile(path: str, outputPath: str, fromEngine: str, toEngine: str, snapshots: dict[str, dict]) -> MtoA_to_MtoRM.ConversionReport:
+    '''
+    Converts every network of the given .ma file with the regular conversion (see MtoA_to_MtoRM.convertScene) and writes the result to outputPath.
+    Returns the ConversionReport of the conversion.
+    '''
+
+    sourceSchemas = MtoA_to_MtoRM.nodeSchemaCache.get(fromEngine, {})
+    convertibleTypes = MtoA_to_MtoRM.ENGINECONVERSIONS.get(MtoA_to_MtoRM.FROMENGINES.get(fromEngine), {})
+    scene = MayaAsciiScene(path, {nodeType: schema for nodeType, schema in sourceSchemas.items() if nodeType in convertibleTypes}).parse()
+
+    missing = getMissingSchemas(scene, fromEngine, toEngine)
+    if len(missing) != 0:
+        raise SystemExit(f'! Node converter: The schema snapshots have no schema for: {", ".join(missing)}.')
+
+    emitter = MtoA_to_MtoRM.ConversionEmitter(scene.backend)
+    backend = MtoA_to_MtoRM.setBackend(emitter)
+    try:
+        report = MtoA_to_MtoRM.convertScene(fromEngine, toEngine, recordUndo= False, incremental= False)
+    finally:
+        MtoA_to_MtoRM.setBackend(backend)
+
+    plugin = MtoA_to_MtoRM.ENGINEPLUGINS.get(toEngine)
+    requires: str | None = None
+    if plugin != None and plugin not in scene.requiredPlugins and len(emitter.createdNodes) != 0:
+        requires = f'requires "{plugin}" "{snapshots.get(toEngine, {}).get("pluginVersion", "unknown")}";'
+
+    writeConvertedFile(scene, emitter, outputPath, requires)
+
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description= "Converts the shading networks of Maya ASCII files from one render engine to another, without Maya.")
+    parser.add_argument("files", nargs= "+", help= ".ma files to convert")
+    parser.add_argument("--schema", action= "append", required= True, help= "schema snapshot of an engine (see MtoA_to_MtoRM.captureEngineSchemas), one for each engine")
+    parser.add_argument("--from-engine", default= "Arnold", help= "engine to convert from (default: %(default)s)")
+    parser.add_argument("--to-engine", default= "RenderMan", help= "engine to convert to (default: %(default)s)")
+    parser.add_argument("--output-dir", default= None, help= "save converted files here instead of next to the originals")
+    parser.add_argument("--suffix", default= None, help= "added to the name of converted files saved next to the originals (default: _<to-engine>)")
+    args = parser.parse_args(argv)
+
+    snapshots = loadSchemas(args.schema)
+    for engine in (args.from_engine, args.to_engine):
+        if engine not in snapshots:
+            print(f"! Node converter: No schema snapshot was given for {engine}.")
+            return 1
+
+    suffix = args.suffix if args.suffix != None else f"_{args.to_engine}"
+    for path in args.files:
+        if args.output_dir != None:
+            os.makedirs(args.output_dir, exist_ok= True)
+            outputPath = os.path.join(args.output_dir, os.path.basename(path))
+        else:
+            root, ext = os.path.splitext(path)
+            outputPath = f"{root}{suffix}{ext}"
+
+        start = time.perf_counter()
+        convertFile(path, outputPath, args.from_engine, args.to_engine, snapshots)
+        print(f"Node converter: {path} -> {outputPath} ({time.perf_counter() - start:.1f}s)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
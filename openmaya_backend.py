@@ -0,0 +1,420 @@
+import sys
+import types
+
+import maya.api.OpenMaya as om
+from maya import cmds
+
+import MtoA_to_MtoRM
+from MtoA_to_MtoRM import ConversionEmitter, ConversionReport, NodeGraph
+
+# Command backend that answers the queries of the converter through the Maya Python API 2.0 instead of maya.cmds, e.g.:
+#   import MtoA_to_MtoRM, openmaya_backend
+#   MtoA_to_MtoRM.setBackend(openmaya_backend.OpenMayaBackend())
+#   MtoA_to_MtoRM.main()
+# Crawling the networks and reading their values is mostly ls, listConnections, nodeType and getAttr calls, each of which parses
+# its plug paths and builds its result lists in MEL. Here nodes are resolved once and kept as MObjectHandles, connections are read
+# with MPlug.connectedTo and values with the typed MPlug getters. Every query it can't answer the same way maya.cmds would
+# (flags it doesn't handle, attribute types it doesn't read) and every edit goes to maya.cmds.
+#
+# ModifierBackend does the edits of a conversion through the API too: it records them the way emitter mode does (see
+# MtoA_to_MtoRM.ConversionEmitter), then queues every create, set and connect on one MDGModifier and applies it with a single doIt(),
+# e.g. MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", batchEdits= True). The modifier runs inside a command this file registers
+# when Maya loads it as a plugin (see applyModifier), so the whole conversion is undone and redone as one step.
+
+maya_useNewAPI = True # this file is also the plugin of ApplyModifierCommand, which uses the Python API 2.0
+
+
+### {{{ CONSTANT definitions
+
+# Attribute types of numeric attributes, as cmds.getAttr(typ= True) reports them
+NUMERICTYPES = {
+    om.MFnNumericData.kBoolean: "bool",
+    om.MFnNumericData.kByte: "byte",
+    om.MFnNumericData.kChar: "char",
+    om.MFnNumericData.kShort: "short",
+    om.MFnNumericData.k2Short: "short2",
+    om.MFnNumericData.k3Short: "short3",
+    om.MFnNumericData.kInt: "long",
+    om.MFnNumericData.k2Int: "long2",
+    om.MFnNumericData.k3Int: "long3",
+    om.MFnNumericData.kFloat: "float",
+    om.MFnNumericData.k2Float: "float2",
+    om.MFnNumericData.k3Float: "float3",
+    om.MFnNumericData.kDouble: "double",
+    om.MFnNumericData.k2Double: "double2",
+    om.MFnNumericData.k3Double: "double3",
+}
+
+# Flags of the queries that OpenMayaBackend answers itself, calls with any other flag go to maya.cmds
+LSFLAGS = {"long", "selection", "showType"}
+LISTCONNECTIONSFLAGS = {"c", "connections", "s", "source", "d", "destination", "fnn", "fullNodeName", "p", "plugs"}
+GETATTRFLAGS = {"typ", "type"}
+
+APPLYMODIFIERCOMMAND = "nodeNetworkConverterApplyModifier"
+
+# Hands the modifier from applyModifier to ApplyModifierCommand. Maya imports its own copy of this file when it loads it as a plugin,
+# so the modifier is passed through a module both copies find in sys.modules.
+SHAREDSTATE = sys.modules.setdefault("nodeNetworkConverterSharedState", types.ModuleType("nodeNetworkConverterSharedState"))
+SHAREDSTATE.__dict__.setdefault("pendingModifier", None)
+
+### }}}
+
+### {{{ class definitions
+
+class OpenMayaBackend:
+    '''
+    Command backend (see MtoA_to_MtoRM.setBackend) that answers ls, listConnections, nodeType, objExists and getAttr with the Maya
+    Python API 2.0, returning what maya.cmds would. Anything else goes to maya.cmds (or the given commands).
+    '''
+    def __init__(self, commands = None):
+        self.commands = commands if commands != None else cmds
+        self.nodes: dict[str, om.MObjectHandle] = {}
+        # ^ Key: node name as the converter asked for it
+        # ^ Value: handle of the node, see getNode
+
+    def __getattr__(self, name: str):
+        return getattr(self.commands, name)
+
+    # {{{ resolving names
+    def getNode(self, nodeName: str) -> om.MObject:
+        '''
+        Returns the MObject of the given node. Raises RuntimeError if there's no such node.
+        Nodes are looked up by name once; as long as the node exists under the same name, its handle is reused.
+        '''
+
+        handle = self.nodes.get(nodeName)
+        if handle != None and handle.isValid() and om.MFnDependencyNode(handle.object()).name() == nodeName.rsplit("|", 1)[-1]:
+            return handle.object()
+
+        selection = om.MSelectionList()
+        selection.add(nodeName)
+        node = selection.getDependNode(0)
+        self.nodes[nodeName] = om.MObjectHandle(node)
+        return node
+
+    def getPlug(self, plug: str) -> om.MPlug:
+        '''
+        Returns the MPlug of the given "node.attribute" plug. Raises RuntimeError if there's no such plug.
+        '''
+
+        nodeName, attr = plug.split(".", 1)
+        if attr.isidentifier(): # a plain attribute name, found on the node without parsing the plug path
+            return om.MFnDependencyNode(self.getNode(nodeName)).findPlug(attr, False)
+
+        selection = om.MSelectionList()
+        selection.add(plug)
+        return selection.getPlug(0)
+
+    def getNodeName(self, node: om.MObject, long: bool = False) -> str:
+        if long and node.hasFn(om.MFn.kDagNode):
+            return om.MFnDagNode(node).fullPathName()
+        return om.MFnDependencyNode(node).name()
+
+    def getPlugName(self, plug: om.MPlug, long: bool = False) -> str:
+        return f"{self.getNodeName(plug.node(), long)}.{plug.partialName(includeNonMandatoryIndices= True, includeInstancedIndices= True, useLongNames= True)}"
+    # }}}
+
+    # {{{ reading attributes
+    def getAttributeType(self, plug: om.MPlug) -> str | None:
+        '''
+        Returns the type of the plug's attribute as cmds.getAttr(typ= True) reports it,
+        or None if it's not one that readPlug reads.
+        '''
+
+        attribute = plug.attribute()
+        if attribute.hasFn(om.MFn.kEnumAttribute):
+            return "enum"
+        if attribute.hasFn(om.MFn.kNumericAttribute):
+            return NUMERICTYPES.get(om.MFnNumericAttribute(attribute).numericType())
+        if attribute.hasFn(om.MFn.kTypedAttribute) and om.MFnTypedAttribute(attribute).attrType() == om.MFnData.kString:
+            return "string"
+        return None
+
+    def readPlug(self, plug: om.MPlug, attrType: str):
+        '''
+        Returns the value of the plug the way cmds.getAttr does: numeric compounds as [(x, y, z)], everything else as a single value.
+        '''
+
+        if attrType[-1] in "23": # numeric compound
+            childType = attrType[:-1]
+            return [tuple(self.readPlug(plug.child(i), childType) for i in range(plug.numChildren()))]
+        if attrType == "float":
+            return plug.asFloat()
+        if attrType == "double":
+            return plug.asDouble()
+        if attrType == "bool":
+            return plug.asBool()
+        if attrType == "string":
+            return plug.asString()
+        return plug.asInt() # enum, byte, char, short, long
+    # }}}
+
+    # {{{ queries
+    def ls(self, *args, **kwargs):
+        selected = kwargs.get("selection", False)
+        if not LSFLAGS.issuperset(kwargs) or selected == (len(args) != 0): # listing every node, or the selected ones among the given names, is left to Maya
+            return self.commands.ls(*args, **kwargs)
+
+        if selected:
+            selection = om.MGlobal.getActiveSelectionList()
+        else:
+            nodeNames = [args[0]] if isinstance(args[0], str) else list(args[0])
+            if any(character in nodeName for nodeName in nodeNames for character in "*?.["): # patterns, plugs and components are left to Maya
+                return self.commands.ls(*args, **kwargs)
+            selection = om.MSelectionList()
+            for nodeName in nodeNames:
+                try:
+                    selection.add(nodeName)
+                except RuntimeError: # ls leaves out the names that don't exist
+                    pass
+
+        result: list[str] = []
+        for i in range(selection.length()):
+            node = selection.getDependNode(i)
+            result.append(self.getNodeName(node, kwargs.get("long", False)))
+            if kwargs.get("showType", False):
+                result.append(om.MFnDependencyNode(node).typeName)
+
+        return result
+
+    def listConnections(self, *args, **kwargs):
+        if len(args) == 0 or not LISTCONNECTIONSFLAGS.issuperset(kwargs):
+            return self.commands.listConnections(*args, **kwargs)
+
+        nodeNames = [args[0]] if isinstance(args[0], str) else list(args[0])
+        if any("." in nodeName for nodeName in nodeNames): # connections of plugs (and their children and elements) are left to Maya
+            return self.commands.listConnections(*args, **kwargs)
+
+        connections = kwargs.get("c", kwargs.get("connections", False))
+        upstream = kwargs.get("s", kwargs.get("source", True))
+        downstream = kwargs.get("d", kwargs.get("destination", True))
+        fullNodeNames = kwargs.get("fnn", kwargs.get("fullNodeName", False))
+        plugs = kwargs.get("p", kwargs.get("plugs", False))
+
+        try:
+            nodes = [self.getNode(nodeName) for nodeName in nodeNames]
+        except RuntimeError: # letting Maya raise the error it raises
+            return self.commands.listConnections(*args, **kwargs)
+
+        result: list[str] = []
+        for node in nodes:
+            for plug in om.MFnDependencyNode(node).getConnections():
+                for otherPlug in plug.connectedTo(upstream, downstream): # as destination: its sources, as source: its destinations
+                    if connections:
+                        result.append(self.getPlugName(plug, fullNodeNames))
+                    result.append(self.getPlugName(otherPlug, fullNodeNames) if plugs else self.getNodeName(otherPlug.node(), fullNodeNames))
+
+        return result if len(result) != 0 else None
+
+    def nodeType(self, nodeName: str, **kwargs):
+        if len(kwargs) != 0 or "." in nodeName:
+            return self.commands.nodeType(nodeName, **kwargs)
+
+        try:
+            return om.MFnDependencyNode(self.getNode(nodeName)).typeName
+        except RuntimeError: # letting Maya raise the error it raises
+            return self.commands.nodeType(nodeName, **kwargs)
+
+    def objExists(self, name: str) -> bool:
+        try:
+            if "." in name:
+                self.getPlug(name)
+            else:
+                self.getNode(name)
+        except RuntimeError:
+            return False
+        return True
+
+    def getAttr(self, plug: str, **kwargs):
+        if not GETATTRFLAGS.issuperset(kwargs):
+            return self.commands.getAttr(plug, **kwargs)
+
+        try:
+            mPlug = self.getPlug(plug)
+        except RuntimeError: # letting Maya raise the error it raises
+            return self.commands.getAttr(plug, **kwargs)
+
+        attrType = self.getAttributeType(mPlug) if not mPlug.isArray else None
+        if attrType == None:
+            return self.commands.getAttr(plug, **kwargs)
+        if kwargs.get("typ", kwargs.get("type", False)):
+            return attrType
+        return self.readPlug(mPlug, attrType)
+    # }}}
+
+class ModifierBackend(ConversionEmitter):
+    '''
+    Command backend (see MtoA_to_MtoRM.setBackend) that records the nodes, values and connections a conversion creates like emitter mode
+    does, and applies them to the scene all at once (see doIt). Queries go to an OpenMayaBackend over the given commands.
+    Like in emitter mode, only nodes created by the conversion can be edited.
+    '''
+    def __init__(self, commands = None):
+        super().__init__(commands if isinstance(commands, OpenMayaBackend) else OpenMayaBackend(commands))
+
+    def findPlug(self, createdNodes: dict[str, om.MObject], plug: str) -> om.MPlug | None:
+        '''
+        Returns the MPlug of the given "node.attribute" plug, or None if it can't be found before the modifier runs
+        (a child or element of an attribute of a node that's only queued for creation, or a plug that doesn't exist).
+        - createdNodes = name: MObject pairs of the nodes queued for creation
+        '''
+
+        nodeName, _, attr = plug.partition(".")
+        try:
+            if nodeName in createdNodes:
+                return om.MFnDependencyNode(createdNodes[nodeName]).findPlug(attr, False) if attr.isidentifier() else None
+            return self.commands.getPlug(plug)
+        except RuntimeError:
+            return None
+
+    def queuePlugValue(self, modifier: om.MDGModifier, plug: om.MPlug, values: tuple, typ: str | None) -> bool:
+        '''
+        Queues the values of a recorded setAttr call on the modifier. Returns False, with nothing queued,
+        if the plug's attribute isn't one that OpenMayaBackend reads.
+        '''
+
+        attrType = self.commands.getAttributeType(plug)
+        if attrType == None or (typ == "string") != (attrType == "string"):
+            return False
+
+        if attrType[-1] in "23": # numeric compound, one value per child
+            if len(values) != plug.numChildren():
+                return False
+            plugValues = [(plug.child(i), attrType[:-1], value) for i, value in enumerate(values)]
+        elif len(values) == 1:
+            plugValues = [(plug, attrType, values[0])]
+        else:
+            return False
+
+        for valuePlug, valueType, value in plugValues:
+            if valueType == "float":
+                modifier.newPlugValueFloat(valuePlug, float(value))
+            elif valueType == "double":
+                modifier.newPlugValueDouble(valuePlug, float(value))
+            elif valueType == "bool":
+                modifier.newPlugValueBool(valuePlug, bool(value))
+            elif valueType == "string":
+                modifier.newPlugValueString(valuePlug, value)
+            else: # enum, byte, char, short, long
+                modifier.newPlugValueInt(valuePlug, int(value))
+
+        return True
+
+    def getModifier(self) -> om.MDGModifier:
+        '''
+        Returns an MDGModifier with every recorded edit queued on it, in the order emitter mode writes them (see getMayaAsciiStatements):
+        the nodes with their names and values, their hypershade listing, then the connections.
+        Edits the API can't queue before the nodes exist (plugs of children and elements, attribute types readPlug doesn't read)
+        are queued as the equivalent MEL commands, which the modifier runs in the same order.
+        '''
+
+        modifier = om.MDGModifier()
+        createdNodes: dict[str, om.MObject] = {}
+        # ^ Key: name of a node created by the conversion
+        # ^ Value: its MObject, queued for creation
+
+        for nodeName, nodeType in self.createdNodes.items():
+            node = modifier.createNode(nodeType)
+            modifier.renameNode(node, nodeName)
+            createdNodes[nodeName] = node
+            for attr, values, typ in self.values[nodeName]:
+                plug = self.findPlug(createdNodes, f"{nodeName}.{attr}")
+                if plug == None or not self.queuePlugValue(modifier, plug, values, typ):
+                    modifier.commandToExecute(self.formatSetAttr(f"{nodeName}.{attr}", values, typ))
+
+        if len(createdNodes) != 0: # shadingNode(asShader= True) lists every created node in the hypershade
+            shaderList = self.commands.getPlug("defaultShaderList1.shaders")
+            nextIndex = max(shaderList.getExistingArrayAttributeIndices(), default= -1) + 1
+            for i, node in enumerate(createdNodes.values()):
+                modifier.connect(om.MFnDependencyNode(node).findPlug("message", False), shaderList.elementByLogicalIndex(nextIndex + i))
+
+        for srcPlug, dstPlug in self.connections:
+            source = self.findPlug(createdNodes, srcPlug)
+            destination = self.findPlug(createdNodes, dstPlug)
+            if source != None and destination != None:
+                modifier.connect(source, destination)
+            else:
+                modifier.commandToExecute(f'connectAttr "{srcPlug}" "{dstPlug}";')
+
+        return modifier
+
+    def doIt(self):
+        '''
+        Applies every recorded edit to the scene as a single undoable operation (see applyModifier).
+        '''
+
+        if len(self.createdNodes) != 0:
+            applyModifier(self.getModifier())
+
+class ApplyModifierCommand(om.MPxCommand):
+    '''
+    Runs the MDGModifier handed to it by applyModifier. Being a command, it's undone and redone with the rest of Maya's undo queue.
+    If the modifier fails half way, whatever it did is undone, so it either applies every edit or none.
+    '''
+    def __init__(self):
+        super().__init__()
+        self.modifier: om.MDGModifier | None = None
+
+    @staticmethod
+    def creator() -> "ApplyModifierCommand":
+        return ApplyModifierCommand()
+
+    def isUndoable(self) -> bool:
+        return True
+
+    def doIt(self, args):
+        self.modifier = SHAREDSTATE.pendingModifier
+        SHAREDSTATE.pendingModifier = None
+        if self.modifier == None:
+            raise RuntimeError(f"! Node converter: {APPLYMODIFIERCOMMAND} only runs modifiers handed to it by openmaya_backend.applyModifier.")
+        self.redoIt()
+
+    def redoIt(self):
+        try:
+            self.modifier.doIt()
+        except RuntimeError:
+            self.modifier.undoIt()
+            raise
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+### }}}
+
+# {{{ plugin
+def initializePlugin(plugin: om.MObject):
+    om.MFnPlugin(plugin).registerCommand(APPLYMODIFIERCOMMAND, ApplyModifierCommand.creator)
+
+def uninitializePlugin(plugin: om.MObject):
+    om.MFnPlugin(plugin).deregisterCommand(APPLYMODIFIERCOMMAND)
+# }}}
+
+
+def applyModifier(modifier: om.MDGModifier):
+    '''
+    Runs the given MDGModifier with ApplyModifierCommand, as a single step of Maya's undo queue.
+    Loads this file as a plugin first, if the command isn't registered yet.
+    '''
+
+    if not hasattr(cmds, APPLYMODIFIERCOMMAND):
+        cmds.loadPlugin(__file__, quiet= True)
+
+    SHAREDSTATE.pendingModifier = modifier
+    try:
+        getattr(cmds, APPLYMODIFIERCOMMAND)()
+    finally:
+        SHAREDSTATE.pendingModifier = None
+
+
+def applyConversion(graph: NodeGraph, fromEngine: str, toEngine: str) -> ConversionReport:
+    '''
+    Converts the given NodeGraph with a ModifierBackend (over the current backend) standing in for cmd,
+    then applies all of its edits to the scene in one go. Returns a ConversionReport of the run.
+    '''
+
+    backend = ModifierBackend(MtoA_to_MtoRM.cmd)
+    report = MtoA_to_MtoRM.recordConversion(graph, fromEngine, toEngine, backend)
+
+    with MtoA_to_MtoRM.timePhase("apply"):
+        backend.doIt()
+
+    return report
@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # the scripts live in the repository's root
+
+import MtoA_to_MtoRM
+from fake_scene import FakeSceneBackend, inferSchemas
+
+ENGINES = ("Arnold", "RenderMan")
+
+
+@pytest.fixture
+def scene(monkeypatch) -> FakeSceneBackend:
+    '''
+    An empty in-memory scene that knows the node types of both engines (schemas made up by inferSchemas), set as the converter's backend.
+    '''
+
+    for engine in ENGINES:
+        monkeypatch.setitem(MtoA_to_MtoRM.nodeSchemaCache, engine, inferSchemas(engine))
+    scene = FakeSceneBackend({nodeType: schema for engine in ENGINES for nodeType, schema in MtoA_to_MtoRM.nodeSchemaCache[engine].items()})
+
+    previousBackend = MtoA_to_MtoRM.setBackend(scene)
+    yield scene
+    MtoA_to_MtoRM.setBackend(previousBackend)
+    assert MtoA_to_MtoRM.ConversionTransaction.active == None
+
+
+def addNetwork(scene: FakeSceneBackend, index: int) -> str:
+    '''
+    Adds an Arnold network to the scene: a material with a texture on its base color that also drives a normal map. Returns the material.
+    '''
+
+    material = scene.addNode(f"aiStandardSurface{index}", "aiStandardSurface", base= 0.9, baseColor= (0.5, 0.4, 0.3), specularRoughness= 0.35)
+    texture = scene.addNode(f"file{index}", "file", fileTextureName= f"/textures/texture{index}.exr")
+    normalMap = scene.addNode(f"aiNormalMap{index}", "aiNormalMap", strength= 0.5)
+    scene.connectAttr(f"{texture}.outColor", f"{material}.baseColor")
+    scene.connectAttr(f"{texture}.outColor", f"{normalMap}.input")
+    scene.connectAttr(f"{normalMap}.outValue", f"{material}.normalCamera")
+    return material
+
+
+def getSceneState(scene: FakeSceneBackend) -> dict:
+    '''
+    Returns everything about the scene that a conversion can change: its nodes, the value of every attribute of them and its connections.
+    It's a copy made through JSON, so later changes of the scene don't change it, and tuples and lists of the same values compare equal.
+    '''
+
+    values = {nodeName: {attr: scene.getAttr(f"{nodeName}.{attr}") for attr in scene.schemas[nodeType].attributes} if nodeType in scene.schemas else {}
+              for nodeName, nodeType in scene.nodeTypes.items()}
+    connections = {nodeName: inputs for nodeName, inputs in scene.inputs.items() if len(inputs) != 0}
+    return json.loads(json.dumps({"nodeTypes": scene.nodeTypes, "values": values, "connections": connections}, default= repr))
+
+
+def getNodesOfType(scene: FakeSceneBackend, nodeType: str) -> list[str]:
+    return [nodeName for nodeName, otherType in scene.nodeTypes.items() if otherType == nodeType]
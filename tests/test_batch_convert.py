@@ -0,0 +1,58 @@
+import os
+
+import batch_convert
+
+
+def test_expand_paths_keeps_the_order_without_repeats(tmp_path):
+    for name in ("b.ma", "a.ma", "c.mb"):
+        (tmp_path / name).write_text("")
+
+    paths = batch_convert.expandPaths([str(tmp_path / "c.mb"), str(tmp_path / "*.ma"), str(tmp_path / "a.ma"), os.path.relpath(tmp_path / "b.ma")])
+
+    assert paths == [str(tmp_path / name) for name in ("c.mb", "a.ma", "b.ma")]
+
+
+def test_expand_paths_of_a_large_glob(tmp_path):
+    for i in range(2000):
+        (tmp_path / f"scene{i:04}.ma").write_text("")
+
+    paths = batch_convert.expandPaths([str(tmp_path / "*.ma"), str(tmp_path / "**" / "*.ma")])
+
+    assert paths == sorted(str(path) for path in tmp_path.iterdir())
+
+
+def test_output_paths_of_files_with_the_same_name_dont_collide(tmp_path):
+    paths = [str(tmp_path / "assets" / "a" / "scene.ma"), str(tmp_path / "assets" / "b" / "scene.ma")]
+    inputRoot = batch_convert.getInputRoot(paths)
+
+    outputs = [batch_convert.getOutputPath(path, str(tmp_path / "out"), "_RenderMan", inputRoot) for path in paths]
+
+    assert inputRoot == str(tmp_path / "assets")
+    assert outputs == [str(tmp_path / "out" / "a" / "scene.ma"), str(tmp_path / "out" / "b" / "scene.ma")]
+
+
+def test_output_paths_next_to_the_originals(tmp_path):
+    path = str(tmp_path / "scene.mb")
+
+    assert batch_convert.getOutputPath(path, None, "_RenderMan") == str(tmp_path / "scene_RenderMan.mb")
+
+
+def test_stopping_a_pool_without_its_private_process_list():
+    class Pool:
+        shutDown = False
+        def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+            self.shutDown = True
+
+    pool = Pool()
+    batch_convert.stopExecutor(pool, terminate= True)
+
+    assert pool.shutDown
+
+
+def test_jobs_of_dead_workers_are_failed_one_by_one(tmp_path):
+    jobs = [(str(tmp_path / f"scene{i}.ma"), str(tmp_path / f"scene{i}_RenderMan.ma"), "Arnold", "RenderMan", False) for i in range(3)]
+
+    results = list(batch_convert.runJobs(jobs, 2, "Arnold", "RenderMan", timeout= 60)) # without Maya every worker dies starting up
+
+    assert sorted(result["file"] for result in results) == sorted(job[0] for job in jobs)
+    assert all(not result["ok"] and result["error"].startswith("BrokenProcessPool") for result in results)
@@ -0,0 +1,164 @@
+import pytest
+
+import MtoA_to_MtoRM
+from conftest import addNetwork, getNodesOfType, getSceneState
+
+
+def test_main_converts_the_selected_network(scene):
+    material = addNetwork(scene, 1)
+    scene.select([material])
+
+    MtoA_to_MtoRM.main()
+
+    [surface] = getNodesOfType(scene, "PxrSurface")
+    [texture] = getNodesOfType(scene, "PxrTexture")
+    [normalMap] = getNodesOfType(scene, "PxrNormalMap")
+    assert scene.getAttr(f"{surface}.diffuseGain") == pytest.approx(0.9)
+    assert scene.getAttr(f"{texture}.filename") == "/textures/texture1.exr"
+    assert scene.inputs[surface] == {"diffuseColor": f"{texture}.resultRGB", "bumpNormal": f"{normalMap}.resultN"}
+    assert scene.inputs[normalMap] == {"inputRGB": f"{texture}.resultRGB"}
+
+
+def test_round_trip_keeps_values_and_connections(scene):
+    addNetwork(scene, 1)
+
+    toRenderMan = MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+    toArnold = MtoA_to_MtoRM.convertScene("RenderMan", "Arnold", recordUndo= False)
+
+    assert toRenderMan.convertedNodes == toArnold.convertedNodes == 3
+    [_, material] = getNodesOfType(scene, "aiStandardSurface")
+    [_, texture] = getNodesOfType(scene, "file")
+    [_, normalMap] = getNodesOfType(scene, "aiNormalMap")
+    assert scene.getAttr(f"{material}.base") == pytest.approx(0.9)
+    assert scene.getAttr(f"{material}.specularRoughness") == pytest.approx(0.35)
+    assert scene.getAttr(f"{texture}.fileTextureName") == "/textures/texture1.exr"
+    assert scene.getAttr(f"{normalMap}.strength") == pytest.approx(0.5)
+    assert scene.inputs[material] == {"baseColor": f"{texture}.outColor", "normalCamera": f"{normalMap}.outValue"}
+    assert scene.inputs[normalMap] == {"input": f"{texture}.outColor"}
+
+
+def test_incremental_rerun_updates_the_previous_conversion(scene):
+    materials = [addNetwork(scene, i) for i in range(3)]
+    MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+    surfaces = getNodesOfType(scene, "PxrSurface")
+
+    scene.setAttr(f"{materials[0]}.base", 0.2)
+    scene.delete(materials[2])
+    addNetwork(scene, 3)
+    report = MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+
+    assert report.reusedNodes == 8 # every previously converted node but the one of the deleted material
+    assert report.convertedNodes == 3
+    assert report.removedNodes == 1
+    assert len(getNodesOfType(scene, "PxrSurface")) == 3
+    assert scene.getAttr(f"{surfaces[0]}.diffuseGain") == pytest.approx(0.2)
+    assert not scene.objExists(surfaces[2])
+
+    unchanged = getSceneState(scene)
+    report = MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+    assert report.writes == report.connections == report.convertedNodes == 0
+    assert getSceneState(scene) == unchanged
+
+
+def test_connected_attributes_cant_be_set(scene):
+    material = addNetwork(scene, 1) # the conversion tests rely on the fake scene failing like Maya does
+
+    for plug, values in ((f"{material}.baseColor", (1, 1, 1)), (f"{material}.baseColorR", (1,)), ("aiNormalMap1.input", (1, 1, 1))):
+        with pytest.raises(RuntimeError, match= "locked or connected"):
+            scene.setAttr(plug, *values)
+
+    scene.disconnectAttr("file1.outColor", f"{material}.baseColor")
+    scene.setAttr(f"{material}.baseColorR", 1)
+    assert scene.getAttr(f"{material}.baseColor") == [pytest.approx((1, 0.4, 0.3))]
+
+
+def test_rerun_after_a_disconnect_writes_the_freed_attribute(scene):
+    material = addNetwork(scene, 1)
+    MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+    [surface] = getNodesOfType(scene, "PxrSurface")
+
+    scene.disconnectAttr("file1.outColor", f"{material}.baseColor")
+    report = MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+
+    assert report.removedConnections == 1
+    assert "diffuseColor" not in scene.inputs[surface]
+    assert scene.getAttr(f"{surface}.diffuseColor") == [pytest.approx((0.5, 0.4, 0.3))]
+
+    scene.connectAttr("file1.outColor", f"{material}.baseColor")
+    report = MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+
+    assert report.connections == 1
+    assert scene.inputs[surface]["diffuseColor"] == "PxrTexture1.resultRGB"
+
+
+def changeConvertedScene(scene, materials: list[str]):
+    '''
+    Makes changes to the originals of a converted scene that a re-conversion updates in place: values, connections and deleted nodes.
+    '''
+
+    for material in materials[:2]:
+        scene.setAttr(f"{material}.base", 0.2)
+    scene.disconnectAttr("file0.outColor", f"{materials[0]}.baseColor")
+    scene.delete(materials[3])
+
+
+def test_failed_incremental_run_is_rolled_back(scene, monkeypatch):
+    materials = [addNetwork(scene, i) for i in range(4)]
+    MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+    changeConvertedScene(scene, materials)
+    before = getSceneState(scene)
+
+    def failingSave(self):
+        raise RuntimeError("injected failure")
+    monkeypatch.setattr(MtoA_to_MtoRM.ConversionMap, "save", failingSave)
+
+    with pytest.raises(RuntimeError, match= "injected failure"):
+        MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+
+    assert getSceneState(scene) == before
+
+
+def test_cancelled_scheduler_reverts_everything(scene, monkeypatch):
+    materials = [addNetwork(scene, i) for i in range(40)]
+    MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+    changeConvertedScene(scene, materials)
+    before = getSceneState(scene)
+
+    openChunks = []
+    undoInfo = scene.undoInfo
+    def recordingUndoInfo(**kwargs):
+        if kwargs.get("openChunk"):
+            openChunks.append(kwargs.get("chunkName"))
+        if kwargs.get("closeChunk"):
+            openChunks.pop()
+        return undoInfo(**kwargs)
+    monkeypatch.setattr(scene, "undoInfo", recordingUndoInfo)
+
+    phases = []
+    def progress(current: MtoA_to_MtoRM.ConversionProgress) -> bool:
+        phases.append(current.phase)
+        return current.phase == "connect"
+
+    scheduler = MtoA_to_MtoRM.ConversionScheduler("Arnold", "RenderMan", MtoA_to_MtoRM.getSceneRoots("Arnold"), budget= 0.0, progress= progress)
+    scheduler.begin()
+    while scheduler.tick():
+        assert openChunks == [] # no undo chunk is left open while Maya has control
+        assert MtoA_to_MtoRM.ConversionTransaction.active == None
+
+    assert scheduler.state == "cancelled"
+    assert phases[-1] == "cancelled" and "convert nodes" in phases
+    assert openChunks == []
+    assert getSceneState(scene) == before
+
+
+def test_cancelled_first_conversion_removes_its_nodes(scene):
+    for i in range(10):
+        addNetwork(scene, i)
+    before = getSceneState(scene)
+
+    scheduler = MtoA_to_MtoRM.ConversionScheduler("Arnold", "RenderMan", MtoA_to_MtoRM.getSceneRoots("Arnold"), budget= 0.0,
+                                                  progress= lambda current: current.phase == "convert nodes")
+    scheduler.run()
+
+    assert scheduler.state == "cancelled"
+    assert getSceneState(scene) == before
@@ -0,0 +1,82 @@
+import MtoA_to_MtoRM
+from conftest import addNetwork
+
+
+def crawl(scene, nodeNames: list[str], downstream: bool = True) -> tuple[MtoA_to_MtoRM.NodeGraph, dict[str, int]]:
+    '''
+    Crawls from the given nodes as main() does from the selection. Returns the NodeGraph and the number of backend calls of every command.
+    '''
+
+    scene.select(nodeNames)
+    with MtoA_to_MtoRM.Instrumentation(timeCalls= False) as instrumentation:
+        graph = MtoA_to_MtoRM.crawlNodeTree(MtoA_to_MtoRM.getSelected(), downstream)
+    return graph, {command: count for command, (count, _) in instrumentation.calls.items()}
+
+
+def getEdges(graph: MtoA_to_MtoRM.NodeGraph) -> set[str]:
+    return {f"{edge.srcNode}.{edge.srcAttr} -> {edge.dstNode}.{edge.dstAttr}" for edge in graph.edges}
+
+
+def test_diamond_nodes_and_edges_are_found_once(scene):
+    material = addNetwork(scene, 1) # the texture reaches the material directly and through the normal map
+
+    graph, _ = crawl(scene, [material])
+
+    assert sorted(node.name for node in graph) == ["aiNormalMap1", "aiStandardSurface1", "file1"]
+    assert len(graph.edges) == 3
+    assert getEdges(graph) == {"file1.outColor -> aiStandardSurface1.baseColor", "file1.outColor -> aiNormalMap1.input", "aiNormalMap1.outValue -> aiStandardSurface1.normalCamera"}
+
+
+def test_cycles_end_the_crawl(scene):
+    material = scene.addNode("aiStandardSurface1", "aiStandardSurface")
+    for i in (1, 2):
+        scene.addNode(f"aiNormalMap{i}", "aiNormalMap")
+    scene.connectAttr("aiNormalMap1.outValue", "aiNormalMap2.input")
+    scene.connectAttr("aiNormalMap2.outValue", "aiNormalMap1.input")
+    scene.connectAttr("aiNormalMap1.outValue", f"{material}.normalCamera")
+
+    graph, _ = crawl(scene, [material])
+
+    assert sorted(node.name for node in graph) == ["aiNormalMap1", "aiNormalMap2", "aiStandardSurface1"]
+    assert getEdges(graph) == {"aiNormalMap1.outValue -> aiNormalMap2.input", "aiNormalMap2.outValue -> aiNormalMap1.input", "aiNormalMap1.outValue -> aiStandardSurface1.normalCamera"}
+
+
+def test_calls_grow_with_the_depth_not_the_width(scene):
+    material = scene.addNode("aiStandardSurface1", "aiStandardSurface")
+    for i, attr in enumerate(("baseColor", "specularColor", "coatColor", "sheenColor", "emissionColor")):
+        texture = scene.addNode(f"file{i}", "file")
+        scene.connectAttr(f"{texture}.outColor", f"{material}.{attr}")
+    wide, wideCalls = crawl(scene, [material])
+
+    chain = scene.addNode("aiStandardSurface2", "aiStandardSurface")
+    previous = f"{chain}.normalCamera"
+    for i in range(5):
+        normalMap = scene.addNode(f"aiNormalMap{i}", "aiNormalMap")
+        scene.connectAttr(f"{normalMap}.outValue", previous)
+        previous = f"{normalMap}.input"
+    deep, deepCalls = crawl(scene, [chain])
+
+    assert len(wide) == len(deep) == 6
+    assert wideCalls["listConnections"] == 3 # the selection both ways, then the textures
+    assert deepCalls["listConnections"] == 7 # the selection both ways, then every level of the chain
+
+
+def test_crawling_stops_at_utility_nodes(scene):
+    material = addNetwork(scene, 1)
+    scene.addNode("place2dTexture1", "place2dTexture")
+    scene.addAttr("file1", longName= "uvCoord", attributeType= "float2") # not among the attributes the conversion dicts know of
+    scene.connectAttr("place2dTexture1.message", "file1.uvCoord")
+
+    graph, _ = crawl(scene, [material])
+
+    assert "place2dTexture1" not in graph
+
+
+def test_downstream_nodes_of_the_selection(scene):
+    addNetwork(scene, 1)
+
+    upstreamOnly, _ = crawl(scene, ["file1"], downstream= False)
+    both, _ = crawl(scene, ["file1"])
+
+    assert [node.name for node in upstreamOnly] == ["file1"]
+    assert sorted(node.name for node in both) == ["aiNormalMap1", "aiStandardSurface1", "file1"]
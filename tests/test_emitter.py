@@ -0,0 +1,51 @@
+import pytest
+
+import MtoA_to_MtoRM
+from conftest import addNetwork
+
+
+def emitScene(path: str) -> MtoA_to_MtoRM.ConversionEmitter:
+    graph = MtoA_to_MtoRM.crawlNodeTree(MtoA_to_MtoRM.getSceneRoots("Arnold"), downstream= False)
+    emitter = MtoA_to_MtoRM.ConversionEmitter(MtoA_to_MtoRM.cmd)
+    MtoA_to_MtoRM.recordConversion(graph, "Arnold", "RenderMan", emitter)
+    with open(path, "w", encoding= "utf-8") as f:
+        f.write(emitter.toMayaAscii())
+    return emitter
+
+
+def test_emitter_leaves_the_scene_as_it_is(scene, tmp_path):
+    addNetwork(scene, 1)
+    before = dict(scene.nodeTypes)
+
+    emitter = emitScene(str(tmp_path / "conversion.ma"))
+
+    assert scene.nodeTypes == before
+    assert emitter.createdNodes == {"PxrSurface1": "PxrSurface", "PxrTexture1": "PxrTexture", "PxrNormalMap1": "PxrNormalMap"}
+    assert ("PxrTexture1.resultRGB", "PxrSurface1.diffuseColor") in emitter.connections
+    content = (tmp_path / "conversion.ma").read_text()
+    assert 'createNode PxrSurface -n "PxrSurface1";' in content
+    assert 'connectAttr "PxrTexture1.resultRGB" "PxrSurface1.diffuseColor";' in content
+
+
+def test_emitter_deletes_the_nodes_schemas_are_captured_from(scene, tmp_path, monkeypatch):
+    monkeypatch.setattr(MtoA_to_MtoRM, "SCHEMASNAPSHOTDIR", None)
+    monkeypatch.setitem(MtoA_to_MtoRM.nodeSchemaCache, "RenderMan", {}) # every RenderMan schema gets captured from a temporary node
+    addNetwork(scene, 1)
+    before = dict(scene.nodeTypes)
+
+    emitter = emitScene(str(tmp_path / "conversion.ma"))
+
+    assert scene.nodeTypes == before
+    assert set(MtoA_to_MtoRM.nodeSchemaCache["RenderMan"]) == {"PxrSurface", "PxrTexture", "PxrNormalMap"}
+    assert sorted(emitter.createdNodes) == ["PxrNormalMap1", "PxrSurface1", "PxrTexture1"]
+
+
+def test_emitter_only_edits_its_own_nodes(scene):
+    material = addNetwork(scene, 1)
+    emitter = MtoA_to_MtoRM.ConversionEmitter(scene)
+
+    with pytest.raises(RuntimeError, match= "Only nodes created by the conversion"):
+        emitter.setAttr(f"{material}.base", 0.5)
+    emitter.delete(material)
+
+    assert scene.objExists(material)
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+import MtoA_to_MtoRM
+import ma_convert
+from fake_scene import inferSchemas
+
+SCENE = '''//Maya ASCII 2025 scene
+//Name: scene.ma
+requires maya "2025";
+requires "mtoa" "5.4.0";
+currentUnit -l centimeter -a degree -t film;
+fileInfo "note" "semi;colon \\"quoted\\"";
+createNode transform -n "pCube1";
+createNode mesh -n "pCubeShape1" -p "pCube1";
+	setAttr -s 8 ".vt[0:7]"  -0.5 -0.5 0.5 0.5 -0.5 0.5 -0.5 0.5 0.5 0.5 0.5 0.5
+		 -0.5 0.5 -0.5 0.5 0.5 -0.5 -0.5 -0.5 -0.5 0.5 -0.5 -0.5;
+createNode aiStandardSurface -n "aiStandardSurface1";
+	setAttr ".base" 0.9;
+	setAttr ".specularRoughness" 0.5;
+createNode shadingEngine -n "SG1";
+createNode file -n "file1";
+	setAttr ".fileTextureName" -type "string" "/textures/a.exr"; // a comment; with a semicolon
+createNode aiNormalMap -n "aiNormalMap1";
+	setAttr ".strength" 0.5;
+connectAttr "file1.outColor" "aiStandardSurface1.baseColor";
+connectAttr "file1.outColor" "aiNormalMap1.input";
+connectAttr "aiNormalMap1.outValue" "aiStandardSurface1.normalCamera";
+connectAttr "aiStandardSurface1.outColor" "SG1.surfaceShader";
+// End of scene.ma
+'''
+
+
+@pytest.fixture
+def schemaPaths(tmp_path, monkeypatch) -> list[str]:
+    '''
+    Schema snapshot files of both engines, with the schemas made up by inferSchemas. ma_convert loads them into a nodeSchemaCache of the test's own.
+    '''
+
+    monkeypatch.setattr(MtoA_to_MtoRM, "nodeSchemaCache", {})
+    paths = []
+    for engine in ("Arnold", "RenderMan"):
+        path = tmp_path / f"{engine}-1.0.json"
+        path.write_text(json.dumps({"formatVersion": MtoA_to_MtoRM.SCHEMAFORMATVERSION, "engine": engine, "pluginVersion": "1.0",
+                                    "nodeTypes": {nodeType: schema.toDict() for nodeType, schema in inferSchemas(engine).items()}}))
+        paths.append(str(path))
+    return paths
+
+
+def test_converted_file_keeps_the_scene_and_adds_the_networks(tmp_path, schemaPaths):
+    (tmp_path / "scene.ma").write_text(SCENE)
+
+    assert ma_convert.main([str(tmp_path / "scene.ma"), "--schema", schemaPaths[0], "--schema", schemaPaths[1]]) == 0
+
+    converted = (tmp_path / "scene_RenderMan.ma").read_text()
+    original, _, added = converted.partition("\n// Converted shading networks\n")
+    assert original == SCENE.replace('requires "mtoa" "5.4.0";', 'requires "mtoa" "5.4.0";\nrequires "RenderMan_for_Maya" "1.0";')
+    assert 'createNode PxrSurface -n "PxrSurface1";' in added
+    assert 'setAttr ".filename" -type "string" "/textures/a.exr";' in added
+    assert 'connectAttr "PxrTexture1.resultRGB" "PxrSurface1.diffuseColor";' in added
+    assert 'connectAttr "PxrNormalMap1.resultN" "PxrSurface1.bumpNormal";' in added
+    assert 'connectAttr "PxrTexture1.resultRGB" "PxrNormalMap1.inputRGB";' in added
+
+
+def test_missing_schema_snapshot_is_an_error(tmp_path, schemaPaths):
+    (tmp_path / "scene.ma").write_text(SCENE)
+
+    assert ma_convert.main([str(tmp_path / "scene.ma"), "--schema", schemaPaths[0]]) == 1
+    assert not (tmp_path / "scene_RenderMan.ma").exists()
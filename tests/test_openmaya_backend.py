@@ -0,0 +1,53 @@
+import pytest
+
+standalone = pytest.importorskip("maya.standalone", reason= "needs Maya's Python (mayapy)")
+
+import MtoA_to_MtoRM
+
+
+@pytest.fixture(scope= "module")
+def cmds():
+    standalone.initialize(name= "python")
+    from maya import cmds
+    yield cmds
+    standalone.uninitialize()
+
+
+@pytest.fixture
+def openmaya_backend(cmds, monkeypatch):
+    cmds.file(new= True, force= True)
+    monkeypatch.setattr(MtoA_to_MtoRM, "SCHEMASNAPSHOTDIR", None)
+    import openmaya_backend
+    return openmaya_backend
+
+
+def test_modifier_backend_deletes_the_nodes_schemas_are_captured_from(cmds, openmaya_backend):
+    before = set(cmds.ls())
+    backend = openmaya_backend.ModifierBackend()
+
+    previousBackend = MtoA_to_MtoRM.setBackend(backend)
+    try:
+        schema = MtoA_to_MtoRM.captureNodeSchema("lambert")
+    finally:
+        MtoA_to_MtoRM.setBackend(previousBackend)
+
+    assert "color" in schema.attributes
+    assert set(cmds.ls()) == before
+    assert backend.createdNodes == {}
+
+
+def test_batch_edits_only_add_the_converted_nodes(cmds, openmaya_backend, monkeypatch):
+    for plugin in (MtoA_to_MtoRM.ENGINEPLUGINS["Arnold"], MtoA_to_MtoRM.ENGINEPLUGINS["RenderMan"]):
+        try:
+            cmds.loadPlugin(plugin, quiet= True)
+        except RuntimeError:
+            pytest.skip(f"needs the {plugin} plugin")
+    monkeypatch.setitem(MtoA_to_MtoRM.nodeSchemaCache, "RenderMan", {}) # every RenderMan schema gets captured from a temporary node
+    material = cmds.shadingNode("aiStandardSurface", asShader= True)
+    texture = cmds.shadingNode("file", asTexture= True)
+    cmds.connectAttr(f"{texture}.outColor", f"{material}.baseColor")
+    before = set(cmds.ls())
+
+    MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", batchEdits= True)
+
+    assert sorted(cmds.nodeType(nodeName) for nodeName in set(cmds.ls()) - before) == ["PxrSurface", "PxrTexture"]
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import MtoA_to_MtoRM
+
+
+@pytest.fixture
+def snapshots(scene, tmp_path, monkeypatch):
+    '''
+    Empty schema caches of both engines, with their snapshots written to a temporary directory.
+    '''
+
+    monkeypatch.setattr(MtoA_to_MtoRM, "nodeSchemaCache", {})
+    monkeypatch.setattr(MtoA_to_MtoRM, "SCHEMASNAPSHOTDIR", str(tmp_path))
+    scene.pluginVersions = {"mtoa": "5.4.1", "RenderMan_for_Maya": "26.1"}
+    return tmp_path
+
+
+def test_captured_schemas_match_the_scene(scene):
+    sample = scene.addNode("aiStandardSurface1", "aiStandardSurface")
+
+    captured = MtoA_to_MtoRM.captureNodeSchema("aiStandardSurface", sample)
+    temporary = MtoA_to_MtoRM.captureNodeSchema("PxrSurface")
+
+    assert captured.toDict() == scene.schemas["aiStandardSurface"].toDict()
+    assert temporary.toDict() == scene.schemas["PxrSurface"].toDict()
+    assert list(scene.nodeTypes) == [sample] # the temporary PxrSurface is gone again
+
+
+def test_schemas_round_trip_through_json(scene):
+    schema = scene.schemas["aiStandardSurface"]
+
+    restored = MtoA_to_MtoRM.NodeSchema.fromDict("aiStandardSurface", json.loads(json.dumps(schema.toDict())))
+
+    assert restored.attributes == schema.attributes
+    assert restored.shortNames == schema.shortNames
+
+
+def test_captured_schemas_are_written_and_read_back(scene, snapshots):
+    captured = MtoA_to_MtoRM.getNodeSchema("RenderMan", "PxrSurface")
+    path = snapshots / "RenderMan-26.1.json"
+    assert path.is_file()
+
+    MtoA_to_MtoRM.nodeSchemaCache.clear()
+    with MtoA_to_MtoRM.Instrumentation(timeCalls= False) as instrumentation:
+        loaded = MtoA_to_MtoRM.getNodeSchema("RenderMan", "PxrSurface")
+
+    assert loaded.attributes == captured.attributes
+    assert "createNode" not in instrumentation.calls and "listAttr" not in instrumentation.calls
+
+
+def test_snapshots_are_kept_per_plugin_version(scene, snapshots):
+    MtoA_to_MtoRM.getNodeSchema("RenderMan", "PxrSurface")
+
+    MtoA_to_MtoRM.nodeSchemaCache.clear()
+    scene.pluginVersions["RenderMan_for_Maya"] = "27.0"
+    with MtoA_to_MtoRM.Instrumentation(timeCalls= False) as instrumentation:
+        MtoA_to_MtoRM.getNodeSchema("RenderMan", "PxrSurface")
+
+    assert instrumentation.calls["createNode"][0] == 1 # captured again for the new version
+    assert sorted(path.name for path in snapshots.iterdir()) == ["RenderMan-26.1.json", "RenderMan-27.0.json"]
+
+
+@pytest.mark.parametrize("contents", ['{"formatVersion": 0, "nodeTypes": {}}', '{"formatVersion": 1, "nodeTy'])
+def test_unusable_snapshots_are_ignored(scene, snapshots, contents):
+    path = snapshots / "RenderMan-26.1.json"
+    path.write_text(contents)
+
+    assert MtoA_to_MtoRM.readSchemaSnapshotFile(str(path)) == None
+    assert MtoA_to_MtoRM.loadSchemaSnapshot("RenderMan") == {}
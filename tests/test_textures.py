@@ -0,0 +1,107 @@
+import pytest
+
+import MtoA_to_MtoRM
+
+
+@pytest.fixture(autouse= True)
+def textureResolver():
+    MtoA_to_MtoRM.textureResolver.clear() # directory listings are kept between conversions, the tests make new files
+    yield MtoA_to_MtoRM.textureResolver
+    MtoA_to_MtoRM.textureResolver.clear()
+
+
+def addTextureFile(path) -> str:
+    path.parent.mkdir(parents= True, exist_ok= True)
+    path.write_bytes(path.name.encode("utf-8"))
+    return str(path)
+
+
+def test_relative_texture_paths_are_found_in_the_project(scene, tmp_path):
+    addTextureFile(tmp_path / "sourceimages" / "found.exr")
+    scene.workspaceRoot = str(tmp_path)
+    scene.addNode("file1", "file", fileTextureName= "sourceimages/found.exr")
+    scene.addNode("file2", "file", fileTextureName= "sourceimages/missing.exr")
+
+    report = MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+
+    assert report.missingTextures == {"file2": "sourceimages/missing.exr"}
+
+
+def test_absolute_texture_paths_ignore_the_project(scene, tmp_path, monkeypatch):
+    monkeypatch.setenv("TEXTURES", str(tmp_path / "textures"))
+    scene.workspaceRoot = str(tmp_path / "project")
+    scene.addNode("file1", "file", fileTextureName= addTextureFile(tmp_path / "textures" / "a.exr"))
+    scene.addNode("file2", "file", fileTextureName= "$TEXTURES/a.exr")
+    scene.addNode("file3", "file", fileTextureName= "$TEXTURES/b.exr")
+
+    report = MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+
+    assert report.missingTextures == {"file3": "$TEXTURES/b.exr"}
+
+
+class CopyConverter(MtoA_to_MtoRM.TextureConverter):
+    '''
+    Stands in for txmake: the prepared file is a copy of the source, and every conversion is counted.
+    '''
+    extension = ".tex"
+
+    def __init__(self):
+        self.sources: list[str] = []
+
+    def convert(self, sourcePath: str, outputPath: str):
+        self.sources.append(sourcePath)
+        with open(sourcePath, "rb") as source, open(outputPath, "wb") as output:
+            output.write(source.read())
+
+
+def test_texture_converters_have_to_convert():
+    class Unfinished(MtoA_to_MtoRM.TextureConverter):
+        pass
+
+    with pytest.raises(TypeError):
+        Unfinished()
+
+
+def test_prepared_textures_replace_the_paths(scene, tmp_path):
+    source = addTextureFile(tmp_path / "sourceimages" / "wood.exr")
+    scene.workspaceRoot = str(tmp_path)
+    scene.addNode("file1", "file", fileTextureName= "sourceimages/wood.exr")
+    scene.addNode("file2", "file", fileTextureName= source) # the same file, prepared once
+    converter = CopyConverter()
+
+    with MtoA_to_MtoRM.TexturePreparation(str(tmp_path / "cache"), converter, workers= 2):
+        MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+
+    [first, second] = [scene.getAttr(f"{texture}.filename") for texture in ("PxrTexture1", "PxrTexture2")]
+    assert first == second and first.startswith(str(tmp_path / "cache")) and first.endswith(".tex")
+    assert open(first, "rb").read() == b"wood.exr"
+    assert converter.sources == [source]
+
+
+def test_every_tile_is_prepared(scene, tmp_path):
+    for tile in (1001, 1002, 1011):
+        addTextureFile(tmp_path / "textures" / f"body.{tile}.exr")
+    scene.addNode("file1", "file", fileTextureName= str(tmp_path / "textures" / "body.<UDIM>.exr"))
+    scene.addNode("file2", "file", fileTextureName= str(tmp_path / "textures" / "frame.<f>.exr"))
+    addTextureFile(tmp_path / "textures" / "frame.1.exr")
+
+    with MtoA_to_MtoRM.TexturePreparation(str(tmp_path / "cache"), CopyConverter()) as preparation:
+        report = MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False)
+
+    prepared = scene.getAttr("PxrTexture1.filename")
+    assert prepared.endswith(".<UDIM>.tex")
+    assert sorted(MtoA_to_MtoRM.textureResolver.getTiles(prepared)) == [1001, 1002, 1011]
+    assert report.skippedTextures == {"file2": str(tmp_path / "textures" / "frame.<f>.exr")}
+    assert preparation.convertedCount == 3
+
+
+def test_prepared_textures_are_cached(scene, tmp_path):
+    scene.addNode("file1", "file", fileTextureName= addTextureFile(tmp_path / "wood.exr"))
+    converters = [CopyConverter(), CopyConverter()]
+
+    for converter in converters:
+        with MtoA_to_MtoRM.TexturePreparation(str(tmp_path / "cache"), converter):
+            MtoA_to_MtoRM.convertScene("Arnold", "RenderMan", recordUndo= False, incremental= False)
+
+    assert [len(converter.sources) for converter in converters] == [1, 0]
+    assert scene.getAttr("PxrTexture1.filename") == scene.getAttr("PxrTexture2.filename")
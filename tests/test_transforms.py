@@ -0,0 +1,65 @@
+import pytest
+
+import MtoA_to_MtoRM
+from MtoA_to_MtoRM import FieldTransform
+
+pytest.importorskip("numpy") # without it, applyBatch transforms values one by one anyway
+
+COUNT = 2 * MtoA_to_MtoRM.BATCHTRANSFORMMINIMUM
+
+VALUES = {
+    "floats": [i / COUNT for i in range(COUNT)],
+    "ints": [i % 3 for i in range(COUNT)],
+    "bools": [i % 2 == 0 for i in range(COUNT)],
+    "strings": [("a", "b", "c")[i % 3] for i in range(COUNT)],
+    "compounds": [[(i / COUNT, 0.5, float(i % 2))] for i in range(COUNT)],
+    "int compounds": [[(i % 3, 1, 0)] for i in range(COUNT)],
+    "mixed numbers": [i if i % 2 else i / COUNT for i in range(COUNT)],
+    "mixed kinds": [i if i % 2 else str(i) for i in range(COUNT)],
+}
+
+TRANSFORMS = {
+    "oneMinus": FieldTransform("oneMinus"),
+    "addBelow": FieldTransform("addBelow", 0.1, 1),
+    "addBelow int": FieldTransform("addBelow", 1, 2),
+    "equals": FieldTransform("equals", 1),
+    "remap": FieldTransform("remap", [[0, 2], [1, 3]]),
+    "remap strings": FieldTransform("remap", [["a", "x"], ["b", "y"]]),
+    "chain": FieldTransform("oneMinus").then(FieldTransform("addBelow", 0.1, 0.5)),
+}
+
+
+def describe(values) -> list:
+    '''
+    Returns the values with the type of every one of them (and of every component of compounds), so equal values of other types don't compare equal.
+    '''
+
+    return [tuple((type(x), x) for x in value) if isinstance(value, tuple) else (type(value), value) for value in values]
+
+
+def applyOneByOne(transform: FieldTransform, values: list):
+    try:
+        return describe([transform(value) for value in values])
+    except TypeError as error:
+        return type(error)
+
+
+@pytest.mark.parametrize("valuesName", VALUES)
+@pytest.mark.parametrize("transformName", TRANSFORMS)
+def test_batch_matches_one_by_one(transformName, valuesName):
+    transform, values = TRANSFORMS[transformName], VALUES[valuesName]
+
+    expected = applyOneByOne(transform, values)
+
+    if isinstance(expected, type):
+        with pytest.raises(expected):
+            transform.applyBatch(values)
+    else:
+        assert describe(transform.applyBatch(values)) == expected
+
+
+def test_batch_without_numpy_transforms_one_by_one(monkeypatch):
+    monkeypatch.setattr(MtoA_to_MtoRM, "numpy", None)
+
+    values = VALUES["compounds"]
+    assert describe(TRANSFORMS["chain"].applyBatch(values)) == applyOneByOne(TRANSFORMS["chain"], values)